@@ -3,6 +3,9 @@ import hashlib
 from functools import wraps
 from app.utils.database import execute_query
 from app.utils.upload import save_avatar, delete_avatar, get_default_avatar
+from app.services.destinatarios_alerta import (
+    SEVERIDADES, buscar_assinaturas_gestor, invalidar_destinatarios, salvar_assinaturas_gestor
+)
 
 bp = Blueprint('auth', __name__)
 
@@ -125,15 +128,15 @@ def editar_perfil():
             flash('E-mail já está sendo usado por outro usuário!', 'error')
             return redirect(url_for('auth.editar_perfil'))
         
-        # Processar configurações de alertas (apenas para gestores)
-        alerta_time_is_money = False
-        alerta_servidor_nuvem = False
-        alerta_alterdata = False
+        # Processar assinaturas de alertas (apenas para gestores): produto -> severidade mínima
+        assinaturas = None
         
         if session.get('user_type') == 'gestor':
-            alerta_time_is_money = 'alerta_time_is_money' in request.form
-            alerta_servidor_nuvem = 'alerta_servidor_nuvem' in request.form
-            alerta_alterdata = 'alerta_alterdata' in request.form
+            assinaturas = {}
+            for campo in request.form:
+                sufixo = campo[len('alerta_produto_'):]
+                if campo.startswith('alerta_produto_') and sufixo.isdigit():
+                    assinaturas[int(sufixo)] = request.form.get(f'severidade_produto_{sufixo}')
         
         # Processar upload de foto
         foto_url = None
@@ -166,24 +169,32 @@ def editar_perfil():
             query_update = """
             UPDATE usuarios 
             SET nome = %s, email = %s, foto_url = %s, 
-                alerta_time_is_money = %s, alerta_servidor_nuvem = %s, alerta_alterdata = %s,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = %s
             """
-            params = (nome, email, foto_url, alerta_time_is_money, alerta_servidor_nuvem, alerta_alterdata, user_id)
+            params = (nome, email, foto_url, user_id)
         else:
             query_update = """
             UPDATE usuarios 
             SET nome = %s, email = %s, 
-                alerta_time_is_money = %s, alerta_servidor_nuvem = %s, alerta_alterdata = %s,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = %s
             """
-            params = (nome, email, alerta_time_is_money, alerta_servidor_nuvem, alerta_alterdata, user_id)
+            params = (nome, email, user_id)
 
         result = execute_query(query_update, params)
         
+        if result and assinaturas is not None:
+            try:
+                salvar_assinaturas_gestor(user_id, assinaturas, request.form.get('modo_alerta'))
+            except Exception as e:
+                flash(f'Perfil salvo, mas houve erro ao salvar os alertas: {str(e)}', 'error')
+                return redirect(url_for('auth.editar_perfil'))
+        
         if result:
+            # Nome/email dos destinatários de alertas
+            invalidar_destinatarios()
+            
             # Atualizar sessão
             session['user_name'] = nome
             session['user_email'] = email
@@ -195,10 +206,9 @@ def editar_perfil():
         else:
             flash('Erro ao atualizar perfil!', 'error')
     
-    # Buscar dados atuais (incluindo alertas)
+    # Buscar dados atuais
     query = """
-    SELECT id, nome, email, foto_url, tipo_usuario, created_at, updated_at,
-           alerta_time_is_money, alerta_servidor_nuvem, alerta_alterdata
+    SELECT id, nome, email, foto_url, tipo_usuario, created_at, updated_at, modo_alerta
     FROM usuarios 
     WHERE id = %s
     """
@@ -213,7 +223,17 @@ def editar_perfil():
     if not usuario['foto_url']:
         usuario['foto_url'] = get_default_avatar()
     
-    return render_template('auth/editar_perfil.html', usuario=usuario)
+    # Produtos disponíveis e assinaturas de alertas do gestor
+    produtos = []
+    assinaturas = {}
+    if usuario['tipo_usuario'] == 'gestor':
+        produtos = execute_query(
+            "SELECT id, nome FROM tipos_produtos WHERE ativo = TRUE ORDER BY nome", fetch=True
+        ) or []
+        assinaturas = buscar_assinaturas_gestor(user_id)
+    
+    return render_template('auth/editar_perfil.html', usuario=usuario, produtos=produtos,
+                           assinaturas=assinaturas, severidades=SEVERIDADES)
 
 @bp.route('/alterar-senha', methods=['GET', 'POST'])
 @login_required
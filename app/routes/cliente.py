@@ -1,6 +1,8 @@
 from flask import Blueprint, render_template, request
 from datetime import datetime
-from app.utils.database import execute_query
+from app.utils.database import execute_query, transacao
+from app.services.perguntas import perguntas_cache
+from app.services.processamento_pesquisa import enfileirar_analise_pesquisa, tipo_resposta_texto
 
 bp = Blueprint('cliente', __name__)
 
@@ -94,17 +96,10 @@ def enviar_resposta(pesquisa_uuid):
                 pergunta_id = campo.replace('pergunta_', '')
                 print(f"   📋 Pergunta ID: {pergunta_id}")
                 
-                # Buscar informações da pergunta
-                query_pergunta = """
-                SELECT p.*, tp.nome as tipo_nome
-                FROM perguntas p
-                LEFT JOIN tipos_perguntas tp ON p.tipo_pergunta_id = tp.id
-                WHERE p.id = %s
-                """
-                pergunta_info = execute_query(query_pergunta, (pergunta_id,), fetch=True)
+                # Buscar informações da pergunta (cache do processo)
+                pergunta_data = perguntas_cache.obter(pergunta_id)
                 
-                if pergunta_info:
-                    pergunta_data = pergunta_info[0]
+                if pergunta_data:
                     print(f"   📄 Pergunta: {pergunta_data['texto']}")
                     print(f"   🏷️ Tipo: {pergunta_data['tipo_pergunta_id']}")
                     
@@ -118,11 +113,11 @@ def enviar_resposta(pesquisa_uuid):
                         valor_numerico = float(valor.replace(',', '.'))
                         params = (pesquisa_id, pergunta_id, valor_numerico)
                         
-                        respostas_processamento.append({
+                        resposta_ia = {
                             'tipo': 'escala_numerica',
                             'valor': str(valor_numerico),
                             'pergunta': pergunta_data['texto']
-                        })
+                        }
                         
                         print(f"   📊 Salvando como numérica: {valor_numerico}")
                         
@@ -134,26 +129,29 @@ def enviar_resposta(pesquisa_uuid):
                         """
                         params = (pesquisa_id, pergunta_id, valor)
                         
-                        # Classificar tipo de texto para IA
-                        tipo_pergunta = pergunta_data.get('tipo_nome', '').lower()
-                        
-                        if valor in ['Muito Satisfeito', 'Satisfeito', 'Neutro', 'Insatisfeito', 'Muito Insatisfeito']:
-                            tipo_resposta = 'escala_satisfacao'
-                        elif valor.lower() in ['sim', 'não', 'yes', 'no']:
-                            tipo_resposta = 'sim_nao'
-                        else:
-                            tipo_resposta = 'texto_livre'
+                        # Classificar tipo de texto para IA (pelo tipo da pergunta)
+                        tipo_pergunta = (pergunta_data.get('tipo_nome') or '').lower()
+                        tipo_resposta = tipo_resposta_texto(tipo_pergunta, valor)
                         
-                        respostas_processamento.append({
+                        resposta_ia = {
                             'tipo': tipo_resposta,
                             'valor': valor,
-                            'pergunta': pergunta_data['texto']
-                        })
+                            'pergunta': pergunta_data['texto'],
+                            'polaridade': pergunta_data.get('polaridade_sim_nao')
+                        }
                         
                         print(f"   📝 Salvando como texto ({tipo_resposta}): {valor}")
                     
-                    # Executar INSERT
-                    execute_query(query_resposta, params)
+                    # Executar INSERT (o ID liga a resposta à sua análise em analises_respostas)
+                    try:
+                        with transacao() as cursor:
+                            cursor.execute(query_resposta, params)
+                            resposta_ia['resposta_id'] = cursor.lastrowid
+                    except Exception as e:
+                        print(f"   ❌ Erro ao salvar resposta: {str(e)}")
+                        continue
+                    
+                    respostas_processamento.append(resposta_ia)
                     respostas_salvas += 1
                     print(f"   ✅ Resposta salva no banco!")
                     
@@ -176,90 +174,16 @@ def enviar_resposta(pesquisa_uuid):
         execute_query(query_update, (ip_cliente, pesquisa_id))
         print(f"✅ Pesquisa {pesquisa_id} marcada como respondida")
         
-        # === ANÁLISE DE IA ===
+        # === ANÁLISE DE IA (EM SEGUNDO PLANO) ===
         if respostas_processamento:
-            print(f"🤖 === INICIANDO ANÁLISE DE IA ===")
-            print(f"📋 Dados para análise: {respostas_processamento}")
+            # A análise de IA e o envio de alertas rodam no worker (scripts/worker_jobs.py)
+            job_id = enfileirar_analise_pesquisa(pesquisa_id, respostas_processamento)
             
-            try:
-                from app.services.sentiment_analyzer import SentimentAnalyzer
-                from app.services.email_service import EmailService
-                
-                # Processar com IA
-                analyzer = SentimentAnalyzer()
-                resultado_analise = analyzer.calcular_pontuacao_hibrida(respostas_processamento)
-                
-                print(f"🎯 === RESULTADO DA IA ===")
-                print(f"   Sentimento: {resultado_analise['sentimento_geral']}")
-                print(f"   Pontuação: {resultado_analise.get('pontuacao_hibrida', 0)}")
-                print(f"   Confiança: {resultado_analise.get('confianca_geral', 0.5)}")
-                print(f"   Deve alertar: {resultado_analise.get('deve_alertar', False)}")
-                print(f"   Motivo: {resultado_analise.get('motivo_insatisfacao', 'N/A')}")
-                
-                # Salvar análise no banco
-                query_analise = """
-                INSERT INTO analises_sentimento 
-                (pesquisa_id, resposta_consolidada, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-                
-                execute_query(query_analise, (
-                    pesquisa_id,
-                    resultado_analise.get('texto_consolidado', '')[:1000],
-                    resultado_analise['sentimento_geral'],
-                    resultado_analise.get('confianca_geral', 0.5),
-                    resultado_analise.get('pontuacao_hibrida', 0),
-                    resultado_analise.get('motivo_insatisfacao', '')
-                ))
-                
-                print(f"✅ Análise IA salva no banco")
-                # NOVA LINHA: Marcar como processada pela IA
-                execute_query("UPDATE pesquisas SET ia_processada = TRUE WHERE id = %s", (pesquisa_id,))
-                print(f"✅ Status IA atualizado para pesquisa {pesquisa_id}")
-                
-                # === ENVIO DE EMAIL SE NECESSÁRIO ===
-                if resultado_analise.get('deve_alertar', False):
-                    print(f"🚨 === INSATISFAÇÃO DETECTADA! ===")
-                    
-                    try:
-                        email_service = EmailService()
-                        resultado_email = email_service.enviar_alerta_insatisfacao(
-                            pesquisa_id, 
-                            resultado_analise
-                        )
-                        
-                        if resultado_email.get('sucesso', False):
-                            print(f"📧 ✅ {resultado_email.get('emails_enviados', 0)} email(s) enviado(s)!")
-                        else:
-                            print(f"📧 ❌ Erro no envio: {resultado_email.get('erro', 'Erro desconhecido')}")
-                            
-                    except Exception as e:
-                        print(f"📧 ⚠️ Erro no serviço de email: {str(e)}")
-                        
-                else:
-                    print(f"✅ Cliente satisfeito - nenhum alerta necessário")
-                    
-            except Exception as e:
-                print(f"🤖 ⚠️ Erro na IA: {str(e)}")
-                
-                # Salvar erro no banco para auditoria
-                try:
-                    error_query = """
-                    INSERT INTO analises_sentimento 
-                    (pesquisa_id, resposta_consolidada, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """
-                    execute_query(error_query, (
-                        pesquisa_id,
-                        f"Erro na análise: {str(e)}",
-                        'neutral',
-                        0.0,
-                        0,
-                        f"Erro no processamento: {str(e)}"
-                    ))
-                    print(f"📋 Erro registrado no banco para auditoria")
-                except:
-                    print(f"📋 ⚠️ Não foi possível registrar o erro no banco")
+            if job_id:
+                print(f"📥 Análise de IA enfileirada (job {job_id})")
+            else:
+                # ia_processada continua FALSE: o script de reprocessamento recupera depois
+                print(f"🤖 ⚠️ Não foi possível enfileirar a análise - ficará para reprocessamento")
         else:
             print(f"🤖 ⚠️ Nenhuma resposta para analisar - IA não executada")
             
@@ -6,6 +6,11 @@ import hashlib
 import json
 from app.utils.upload import save_avatar, delete_avatar, get_default_avatar
 from app.utils.pagination import Paginator
+from app.services.perguntas import definir_polaridade, perguntas_cache
+from app.services.telemetria_sentimento import resumo_diario
+from app.services.analise_respostas import buscar_detalhes_respostas
+from app.services.destinatarios_alerta import invalidar_destinatarios
+from app.services.lembretes import JANELA_CRITICA_HORAS, INTERVALO_LEMBRETE_HORAS
 
 bp = Blueprint('gestor', __name__)
 
@@ -365,7 +370,11 @@ def detalhes(pesquisa_id):
     
     respostas = execute_query(query_respostas, (pesquisa_id,), fetch=True) or []
     
-    return render_template('gestor/detalhes.html', pesquisa=pesquisa, respostas=respostas)
+    # Sentimento/pontos de cada resposta gravados na análise (sem nova chamada à IA)
+    analises_respostas = buscar_detalhes_respostas(pesquisa_id)
+    
+    return render_template('gestor/detalhes.html', pesquisa=pesquisa, respostas=respostas,
+                           analises_respostas=analises_respostas)
 
 # ===== ROTAS DE GERENCIAMENTO DE PERGUNTAS =====
 
@@ -432,19 +441,24 @@ def nova_pergunta():
             except:
                 opcoes = None
         
+        # Polaridade Sim/Não: escolhida pelo gestor ou inferida do texto
+        polaridade, polaridade_manual = definir_polaridade(texto, request.form.get('polaridade_sim_nao'))
+        
         # Inserir pergunta
         query = """
         INSERT INTO perguntas 
-        (tipo_produto_id, tipo_pergunta_id, texto, ordem, obrigatoria, ativa, opcoes)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        (tipo_produto_id, tipo_pergunta_id, texto, ordem, obrigatoria, ativa, opcoes,
+         polaridade_sim_nao, polaridade_manual)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
         result = execute_query(query, (
             tipo_produto_id, tipo_pergunta_id, texto, ordem, 
-            obrigatoria, ativa, opcoes
+            obrigatoria, ativa, opcoes, polaridade, polaridade_manual
         ))
         
         if result:
+            perguntas_cache.invalidar()
             flash('Pergunta criada com sucesso!', 'success')
         else:
             flash('Erro ao criar pergunta!', 'error')
@@ -474,6 +488,7 @@ def alterar_status_pergunta(pergunta_id):
         resultado = execute_query(query_update, (novo_status, pergunta_id))
         
         if resultado:
+            perguntas_cache.invalidar()
             return jsonify({'success': True, 'novo_status': novo_status})
         else:
             return jsonify({'success': False, 'error': 'Erro ao atualizar'})
@@ -514,6 +529,7 @@ def excluir_pergunta(pergunta_id):
         print(f"Resultado da exclusão: {resultado}")  # Debug
         
         if resultado:
+            perguntas_cache.invalidar()
             return jsonify({'success': True, 'message': 'Pergunta excluída com sucesso'})
         else:
             return jsonify({'success': False, 'error': 'Erro ao excluir pergunta'})
@@ -534,9 +550,14 @@ def editar_pergunta(pergunta_id):
     
     if request.method == 'POST':
         try:
+            # Polaridade Sim/Não: escolhida pelo gestor ou inferida do texto
+            polaridade, polaridade_manual = definir_polaridade(
+                request.form['texto'], request.form.get('polaridade_sim_nao')
+            )
+            
             # Se já tem respostas, permitir apenas alterações "seguras"
             if total_respostas > 0:
-                # Permitir apenas alteração de: ordem, obrigatória, ativa
+                # Permitir apenas alteração de: ordem, obrigatória, ativa, polaridade
                 ordem = request.form['ordem']
                 obrigatoria = 'obrigatoria' in request.form
                 ativa = 'ativa' in request.form
@@ -544,13 +565,17 @@ def editar_pergunta(pergunta_id):
                 query = """
                 UPDATE perguntas 
                 SET ordem = %s, obrigatoria = %s, ativa = %s,
+                    polaridade_sim_nao = %s, polaridade_manual = %s,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = %s
                 """
                 
-                result = execute_query(query, (ordem, obrigatoria, ativa, pergunta_id))
+                result = execute_query(query, (
+                    ordem, obrigatoria, ativa, polaridade, polaridade_manual, pergunta_id
+                ))
                 
                 if result:
+                    perguntas_cache.invalidar()
                     flash('Pergunta atualizada com sucesso! (Apenas campos seguros foram alterados devido às respostas existentes)', 'success')
                     return redirect(url_for('gestor.perguntas'))
                 else:
@@ -577,16 +602,18 @@ def editar_pergunta(pergunta_id):
                 UPDATE perguntas 
                 SET tipo_produto_id = %s, tipo_pergunta_id = %s, texto = %s, 
                     ordem = %s, obrigatoria = %s, ativa = %s, opcoes = %s,
+                    polaridade_sim_nao = %s, polaridade_manual = %s,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = %s
                 """
                 
                 result = execute_query(query, (
                     tipo_produto_id, tipo_pergunta_id, texto, ordem, 
-                    obrigatoria, ativa, opcoes, pergunta_id
+                    obrigatoria, ativa, opcoes, polaridade, polaridade_manual, pergunta_id
                 ))
                 
                 if result:
+                    perguntas_cache.invalidar()
                     flash('Pergunta atualizada com sucesso!', 'success')
                     return redirect(url_for('gestor.perguntas'))
                 else:
@@ -679,6 +706,7 @@ def novo_usuario():
         result = execute_query(query_insert, (nome, email, senha_hash, tipo_usuario))
         
         if result:
+            invalidar_destinatarios()
             flash('Usuário criado com sucesso!', 'success')
             return redirect(url_for('gestor.usuarios'))
         else:
@@ -750,6 +778,8 @@ def editar_usuario(user_id):
             result = execute_query(query_update, params)
             
             if result:
+                # Nome, email, tipo ou ativo mudam quem recebe os alertas
+                invalidar_destinatarios()
                 flash('Usuário atualizado com sucesso!', 'success')
                 return redirect(url_for('gestor.usuarios'))
             else:
@@ -1027,33 +1057,39 @@ def enviar_lembrete(pesquisa_id):
         
         pesquisa = result[0]
         
-        # Verificar se é realmente crítica (menos de 6 horas)
-        if pesquisa['horas_restantes'] > 6:
+        # Verificar se é realmente crítica (mesma janela dos lembretes automáticos)
+        if pesquisa['horas_restantes'] > JANELA_CRITICA_HORAS:
             return jsonify({
                 'success': False,
-                'error': 'Pesquisa não está em estado crítico (>6h restantes)'
+                'error': f'Pesquisa não está em estado crítico (>{JANELA_CRITICA_HORAS}h restantes)'
             })
         
-        # Verificar se já foi enviado lembrete nas últimas 2 horas
+        # Verificar se já foi enviado lembrete (manual ou automático) recentemente
         query_check = """
         SELECT created_at FROM log_lembretes 
         WHERE pesquisa_id = %s 
-        AND created_at > DATE_SUB(NOW(), INTERVAL 2 HOUR)
+        AND created_at > DATE_SUB(NOW(), INTERVAL %s HOUR)
         ORDER BY created_at DESC LIMIT 1
         """
         
-        lembrete_recente = execute_query(query_check, (pesquisa_id,), fetch=True)
+        lembrete_recente = execute_query(query_check, (pesquisa_id, INTERVALO_LEMBRETE_HORAS), fetch=True)
         
         if lembrete_recente:
             return jsonify({
                 'success': False,
-                'error': 'Lembrete já enviado nas últimas 2 horas'
+                'error': f'Lembrete já enviado nas últimas {INTERVALO_LEMBRETE_HORAS} horas'
             })
         
-        # TODO: Implementar envio real de email
-        # Por enquanto, apenas simular o envio
+        from flask import session
+        from app.services.email_service import EmailService
         
-        sucesso_envio = True  # Simular sucesso
+        # Email pela caixa de saída (o worker de emails faz o envio SMTP)
+        try:
+            resultado_envio = EmailService().enviar_lembrete_agente(pesquisa, session.get('user_name', 'Gestor'))
+        except ValueError as e:
+            resultado_envio = {'sucesso': False, 'erro': str(e)}
+        
+        sucesso_envio = resultado_envio['sucesso']
         
         if sucesso_envio:
             # Registrar no log
@@ -1063,7 +1099,6 @@ def enviar_lembrete(pesquisa_id):
             VALUES (%s, %s, %s, %s, %s)
             """
             
-            from flask import session
             execute_query(query_log, (
                 pesquisa_id,
                 pesquisa['agente_id'],
@@ -1081,7 +1116,7 @@ def enviar_lembrete(pesquisa_id):
         else:
             return jsonify({
                 'success': False,
-                'error': 'Falha no envio do email'
+                'error': f"Falha no envio do email: {resultado_envio.get('erro')}"
             })
             
     except Exception as e:
@@ -1089,4 +1124,16 @@ def enviar_lembrete(pesquisa_id):
         return jsonify({
             'success': False,
             'error': str(e)
-        })
\ No newline at end of file
+        })
+
+@bp.route('/telemetria-ia', methods=['GET'])
+@gestor_required
+def telemetria_ia():
+    """Latência p50/p95, taxa de fallback, cache e tokens da análise de IA por dia"""
+    dias = request.args.get('dias', 30, type=int)
+
+    resumo = resumo_diario(min(max(dias, 1), 365))
+    if resumo is None:
+        return jsonify({'success': False, 'error': 'Erro ao consultar a telemetria'})
+
+    return jsonify({'success': True, 'dias': resumo})
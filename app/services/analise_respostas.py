@@ -0,0 +1,128 @@
+# app/services/analise_respostas.py
+"""
+Análise por resposta (tabela analises_respostas, chave resposta.id)
+Guarda o sentimento/pontos de cada resposta calculados por calcular_pontuacao_hibrida,
+para que telas e alertas leiam o detalhamento sem nova chamada à IA.
+"""
+
+from typing import Dict, Optional
+from app.utils.database import execute_query
+
+# Listas de detalhes_completos -> tipo gravado em analises_respostas
+TIPOS_DETALHES = {
+    'respostas_texto': 'texto_livre',
+    'respostas_numericas': 'escala_numerica',
+    'respostas_satisfacao': 'escala_satisfacao',
+    'respostas_sim_nao': 'sim_nao',
+}
+
+
+def salvar_detalhes_respostas(cursor, pesquisa_id: int, resultado_analise: Dict) -> int:
+    """
+    Grava (ou substitui) a análise de cada resposta com resposta_id
+    Usa o cursor da transação de salvar_analise
+
+    Returns:
+        int: respostas gravadas
+    """
+    detalhes = resultado_analise.get('detalhes_completos', {})
+    telemetria = resultado_analise.get('telemetria', {})
+
+    linhas = []
+    for lista, tipo in TIPOS_DETALHES.items():
+        for resposta in detalhes.get(lista, []):
+            if not resposta.get('resposta_id'):
+                continue
+            linhas.append((
+                resposta['resposta_id'],
+                pesquisa_id,
+                tipo,
+                resposta.get('sentimento'),
+                resposta.get('confianca'),
+                resposta.get('pontos', 0),
+                resposta.get('metodo'),
+                telemetria.get('modelo_usado'),
+                telemetria.get('prompt_versao')
+            ))
+
+    if linhas:
+        cursor.executemany("""
+        INSERT INTO analises_respostas
+        (resposta_id, pesquisa_id, tipo, sentimento, confianca, pontos, metodo, modelo_usado, prompt_versao)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            tipo = VALUES(tipo), sentimento = VALUES(sentimento), confianca = VALUES(confianca),
+            pontos = VALUES(pontos), metodo = VALUES(metodo), modelo_usado = VALUES(modelo_usado),
+            prompt_versao = VALUES(prompt_versao), analisado_em = NOW()
+        """, linhas)
+
+    return len(linhas)
+
+
+def buscar_detalhes_respostas(pesquisa_id: int) -> Dict[int, Dict]:
+    """Análise gravada de cada resposta da pesquisa: {resposta_id: linha}"""
+    linhas = execute_query("""
+    SELECT resposta_id, tipo, sentimento, confianca, pontos, metodo, modelo_usado, prompt_versao
+    FROM analises_respostas
+    WHERE pesquisa_id = %s
+    """, (pesquisa_id,), fetch=True)
+
+    return {linha['resposta_id']: linha for linha in (linhas or [])}
+
+
+def carregar_analise(pesquisa_id: int) -> Optional[Dict]:
+    """
+    Remonta a análise gravada da pesquisa no formato de calcular_pontuacao_hibrida
+    (sem chamar a IA); None se a pesquisa ainda não foi analisada
+    """
+    analise = execute_query("""
+    SELECT resposta_consolidada, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao
+    FROM analises_sentimento
+    WHERE pesquisa_id = %s
+    ORDER BY id DESC
+    LIMIT 1
+    """, (pesquisa_id,), fetch=True)
+
+    if not analise:
+        return None
+    analise = analise[0]
+
+    respostas = execute_query("""
+    SELECT r.id, r.resposta_texto, r.resposta_numerica, pg.texto as pergunta,
+           ar.tipo, ar.sentimento, ar.confianca, ar.pontos, ar.metodo
+    FROM respostas r
+    JOIN analises_respostas ar ON ar.resposta_id = r.id
+    LEFT JOIN perguntas pg ON r.pergunta_id = pg.id
+    WHERE r.pesquisa_id = %s
+    ORDER BY pg.ordem
+    """, (pesquisa_id,), fetch=True) or []
+
+    detalhes = {lista: [] for lista in TIPOS_DETALHES}
+    listas = {tipo: lista for lista, tipo in TIPOS_DETALHES.items()}
+
+    for resposta in respostas:
+        item = {'resposta_id': resposta['id'], 'pergunta': resposta['pergunta'], 'pontos': resposta['pontos']}
+
+        if resposta['tipo'] == 'texto_livre':
+            item.update({
+                'texto': resposta['resposta_texto'],
+                'sentimento': resposta['sentimento'],
+                'confianca': float(resposta['confianca'] or 0),
+                'metodo': resposta['metodo']
+            })
+        elif resposta['tipo'] == 'escala_numerica':
+            item['nota'] = float(resposta['resposta_numerica'])
+        else:
+            item['resposta'] = resposta['resposta_texto']
+
+        detalhes[listas.get(resposta['tipo'], 'respostas_texto')].append(item)
+
+    return {
+        'sentimento_geral': analise['sentimento'],
+        'confianca_geral': float(analise['confianca'] or 0),
+        'pontuacao_hibrida': analise['pontuacao_hibrida'],
+        'texto_consolidado': analise['resposta_consolidada'],
+        'motivo_insatisfacao': analise['motivo_insatisfacao'],
+        'detalhes_completos': detalhes
+    }
+
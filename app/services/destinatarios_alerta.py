@@ -0,0 +1,161 @@
+# app/services/destinatarios_alerta.py
+"""
+Roteamento dos alertas de insatisfação (tabela assinaturas_alerta)
+Cada gestor assina os produtos, o canal e a severidade mínima que quer receber.
+As assinaturas ficam num índice em memória por produto: rotear um alerta é uma
+consulta a dicionário, sem ir ao banco.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List
+from app.utils.database import execute_query, transacao
+from app.services.digest_alertas import MODOS_ALERTA
+
+# Níveis de alerta do email (do menos ao mais grave)
+SEVERIDADES = ('MÉDIO', 'ALTO', 'CRÍTICO')
+_ORDEM_SEVERIDADE = {nivel: posicao for posicao, nivel in enumerate(SEVERIDADES)}
+
+
+class IndiceDestinatarios:
+    """
+    Índice em memória: tipo_produto_id -> assinaturas de gestores ativos
+
+    As rotas que alteram usuários ou assinaturas invalidam o índice do próprio
+    processo; o TTL garante que alterações feitas em outro processo (ou direto
+    no banco) apareçam em pouco tempo.
+    """
+
+    def __init__(self, ttl_segundos: float = None):
+        self.ttl_segundos = ttl_segundos if ttl_segundos is not None else float(
+            os.getenv('DESTINATARIOS_CACHE_TTL_SEGUNDOS', 300)
+        )
+        self._por_produto = {}
+        self._carregado_em = None
+        self._lock = threading.Lock()
+
+    def _carregar(self) -> None:
+        """Carrega todas as assinaturas em uma consulta (chamar com lock)"""
+        query = """
+        SELECT a.tipo_produto_id, a.canal, a.severidade_minima,
+               u.id, u.nome, u.email, u.modo_alerta
+        FROM assinaturas_alerta a
+        JOIN usuarios u ON a.gestor_id = u.id
+        WHERE u.tipo_usuario = 'gestor'
+        AND u.ativo = TRUE
+        ORDER BY u.nome
+        """
+        linhas = execute_query(query, fetch=True)
+        if linhas is None:
+            # Banco indisponível: manter o índice anterior e tentar de novo no próximo alerta
+            return
+
+        self.indexar(linhas)
+        print(f"📇 Índice de destinatários carregado: {len(linhas)} assinatura(s) em {len(self._por_produto)} produto(s)")
+
+    def indexar(self, linhas: List[Dict]) -> None:
+        """Monta o índice a partir das linhas de assinatura (também usado pelo benchmark, sem banco)"""
+        por_produto = {}
+        for linha in linhas:
+            por_produto.setdefault(linha['tipo_produto_id'], []).append({
+                'id': linha['id'],
+                'nome': linha['nome'],
+                'email': linha['email'],
+                'modo_alerta': linha['modo_alerta'],
+                'canal': linha['canal'],
+                'severidade_minima': _ORDEM_SEVERIDADE.get(linha['severidade_minima'], 0)
+            })
+
+        self._por_produto = por_produto
+        self._carregado_em = time.monotonic()
+
+    def destinatarios(self, tipo_produto_id: int, nivel_alerta: str, canal: str = 'email') -> List[Dict]:
+        """
+        Gestores que assinaram o produto no canal com severidade mínima <= nível do alerta
+
+        Returns:
+            list: dicts com id, nome, email e modo_alerta
+        """
+        severidade = _ORDEM_SEVERIDADE.get(nivel_alerta, len(SEVERIDADES) - 1)
+
+        with self._lock:
+            if self._carregado_em is None or time.monotonic() - self._carregado_em > self.ttl_segundos:
+                self._carregar()
+            assinaturas = self._por_produto.get(tipo_produto_id, [])
+
+        return [
+            {'id': a['id'], 'nome': a['nome'], 'email': a['email'], 'modo_alerta': a['modo_alerta']}
+            for a in assinaturas
+            if a['canal'] == canal and a['severidade_minima'] <= severidade
+        ]
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._carregado_em = None
+
+
+# Instância compartilhada do processo
+indice_destinatarios = IndiceDestinatarios()
+
+
+def _resetar_apos_fork() -> None:
+    """No processo filho, descartar o lock herdado do pai e recarregar no próximo uso"""
+    indice_destinatarios._lock = threading.Lock()
+    indice_destinatarios._carregado_em = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetar_apos_fork)
+
+
+def buscar_assinaturas_gestor(gestor_id: int) -> Dict[int, Dict]:
+    """Assinaturas do gestor por tipo_produto_id (canal email), para o formulário de perfil"""
+    query = """
+    SELECT tipo_produto_id, canal, severidade_minima
+    FROM assinaturas_alerta
+    WHERE gestor_id = %s AND canal = 'email'
+    """
+    result = execute_query(query, (gestor_id,), fetch=True) or []
+    return {linha['tipo_produto_id']: linha for linha in result}
+
+
+def salvar_assinaturas_gestor(gestor_id: int, assinaturas: Dict[int, str], modo_alerta: str = None,
+                              canal: str = 'email') -> None:
+    """
+    Substitui as assinaturas do gestor no canal e invalida o índice
+
+    Args:
+        assinaturas: tipo_produto_id -> severidade mínima
+        modo_alerta: 'imediato', 'horario' ou 'diario' (None mantém o atual)
+
+    Raises:
+        ConnectionError: banco indisponível (nada foi alterado)
+    """
+    linhas = [
+        (gestor_id, tipo_produto_id, canal, severidade if severidade in SEVERIDADES else SEVERIDADES[0])
+        for tipo_produto_id, severidade in assinaturas.items()
+    ]
+
+    with transacao() as cursor:
+        cursor.execute("DELETE FROM assinaturas_alerta WHERE gestor_id = %s AND canal = %s",
+                       (gestor_id, canal))
+        if linhas:
+            cursor.executemany("""
+            INSERT INTO assinaturas_alerta (gestor_id, tipo_produto_id, canal, severidade_minima)
+            VALUES (%s, %s, %s, %s)
+            """, linhas)
+        if modo_alerta in MODOS_ALERTA:
+            cursor.execute("UPDATE usuarios SET modo_alerta = %s WHERE id = %s", (modo_alerta, gestor_id))
+
+    invalidar_destinatarios()
+
+
+def destinatarios_alerta(tipo_produto_id: int, nivel_alerta: str, canal: str = 'email') -> List[Dict]:
+    """Gestores que devem receber o alerta (ver IndiceDestinatarios.destinatarios)"""
+    return indice_destinatarios.destinatarios(tipo_produto_id, nivel_alerta, canal)
+
+
+def invalidar_destinatarios() -> None:
+    """Chamar depois de alterar usuários ou assinaturas"""
+    indice_destinatarios.invalidar()
@@ -0,0 +1,122 @@
+# app/services/digest_alertas.py
+"""
+Resumo (digest) dos alertas de insatisfação
+Gestores em modo 'horario' ou 'diario' não recebem um email por pesquisa: os
+alertas ficam em alertas_digest e, ao fechar a janela, viram um único email
+na caixa de saída. Alertas CRÍTICOS sempre saem na hora.
+O resultado do envio é registrado em log_emails_enviados para cada pesquisa
+do resumo (ver email_outbox.concluir_lote).
+"""
+
+import json
+import os
+from typing import Dict, List, Tuple
+from app.utils.database import transacao
+from app.services.email_outbox import TIPO_RESUMO_ALERTAS, inserir_email
+
+MODOS_ALERTA = ('imediato', 'horario', 'diario')
+
+# Nível que ignora o resumo e sai na hora
+NIVEL_IMEDIATO = 'CRÍTICO'
+
+# Hora do dia (0-23) em que o resumo diário é enviado
+HORA_RESUMO_DIARIO = int(os.getenv('DIGEST_HORA_DIARIO', 8))
+
+
+def separar_por_modo(gestores: List[Dict], nivel_alerta: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Separa os gestores entre envio imediato e resumo
+
+    Returns:
+        tuple: (imediatos, resumo)
+    """
+    if nivel_alerta == NIVEL_IMEDIATO:
+        return gestores, []
+
+    imediatos = [g for g in gestores if g.get('modo_alerta', 'imediato') not in ('horario', 'diario')]
+    resumo = [g for g in gestores if g.get('modo_alerta') in ('horario', 'diario')]
+    return imediatos, resumo
+
+
+def acumular_alertas(pesquisa_id: int, gestores: List[Dict], dados_alerta: Dict) -> int:
+    """
+    Guarda o alerta para o próximo resumo de cada gestor
+    Idempotente: o mesmo alerta não entra duas vezes no resumo do gestor
+
+    Raises:
+        ConnectionError: banco indisponível (nada foi gravado)
+    """
+    if not gestores:
+        return 0
+
+    dados = json.dumps(dados_alerta, ensure_ascii=False, default=str)
+    linhas = [(g['id'], pesquisa_id, g['modo_alerta'], dados_alerta['nivel_alerta'], dados)
+              for g in gestores]
+
+    with transacao() as cursor:
+        cursor.executemany("""
+        INSERT IGNORE INTO alertas_digest (gestor_id, pesquisa_id, modo, nivel_alerta, dados)
+        VALUES (%s, %s, %s, %s, %s)
+        """, linhas)
+
+    return len(linhas)
+
+
+def enfileirar_resumos_vencidos(email_service, limite: int = 500) -> int:
+    """
+    Converte os alertas cuja janela fechou em um email de resumo por gestor
+    (uma transação: email na caixa de saída e alertas marcados juntos)
+
+    Args:
+        email_service: EmailService (monta remetente e corpos do resumo)
+        limite: alertas reservados por chamada
+
+    Returns:
+        int: resumos enfileirados
+    """
+    with transacao() as cursor:
+        # Janela atual começa na hora cheia (horário) ou na HORA_RESUMO_DIARIO de hoje ou ontem
+        # (diário); calculada no banco, no mesmo fuso do created_at
+        cursor.execute("""
+        SELECT d.id, d.gestor_id, d.modo, d.dados, u.nome, u.email, u.ativo
+        FROM alertas_digest d
+        JOIN usuarios u ON d.gestor_id = u.id
+        WHERE d.outbox_id IS NULL
+        AND (
+            (d.modo = 'horario' AND d.created_at < DATE_FORMAT(NOW(), %s))
+            OR (d.modo = 'diario' AND d.created_at <
+                (CURDATE() + INTERVAL %s HOUR) - INTERVAL (NOW() < CURDATE() + INTERVAL %s HOUR) DAY)
+        )
+        ORDER BY d.gestor_id, d.created_at
+        LIMIT %s
+        FOR UPDATE OF d SKIP LOCKED
+        """, ('%Y-%m-%d %H:00:00', HORA_RESUMO_DIARIO, HORA_RESUMO_DIARIO, limite))
+        linhas = cursor.fetchall()
+        if not linhas:
+            return 0
+
+        por_gestor = {}
+        for linha in linhas:
+            por_gestor.setdefault(linha['gestor_id'], []).append(linha)
+
+        resumos = 0
+        for alertas in por_gestor.values():
+            gestor = alertas[0]
+            ids = [alerta['id'] for alerta in alertas]
+            marcadores = ', '.join(['%s'] * len(ids))
+
+            if not gestor['ativo']:
+                # Gestor desativado depois de acumular: descartar
+                cursor.execute(f"DELETE FROM alertas_digest WHERE id IN ({marcadores})", ids)
+                continue
+
+            itens = [json.loads(alerta['dados']) for alerta in alertas]
+            email = email_service.montar_resumo_alertas(gestor, gestor['modo'], itens)
+            outbox_id = inserir_email(cursor, dict(email, tipo=TIPO_RESUMO_ALERTAS))
+            cursor.execute(f"UPDATE alertas_digest SET outbox_id = %s WHERE id IN ({marcadores})",
+                           [outbox_id] + ids)
+            resumos += 1
+
+    if resumos:
+        print(f"🗞️ {resumos} resumo(s) de alertas na caixa de saída ({len(linhas)} alerta(s))")
+    return resumos
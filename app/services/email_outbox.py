@@ -0,0 +1,241 @@
+# app/services/email_outbox.py
+"""
+Caixa de saída de emails (tabela email_outbox)
+Quem gera o email só grava a mensagem já renderizada; o envio SMTP fica com
+scripts/worker_emails.py, que envia em lotes pela sessão reaproveitada,
+com retentativas e backoff, e registra o resultado em log_emails_enviados.
+"""
+
+import os
+from typing import Dict, List, Tuple
+from app.utils.database import execute_query, transacao
+from app.services.job_queue import calcular_backoff
+
+LEASE_SEGUNDOS = int(os.getenv('EMAIL_OUTBOX_LEASE_SEGUNDOS', 300))
+MAX_TENTATIVAS = int(os.getenv('EMAIL_OUTBOX_MAX_TENTATIVAS', 5))
+
+TIPO_ALERTA = 'alerta_insatisfacao'
+
+# Tipo das mensagens de resumo de alertas (ver app/services/digest_alertas.py)
+TIPO_RESUMO_ALERTAS = 'alerta_digest'
+
+TIPO_SENHA_TEMPORARIA = 'senha_temporaria'
+
+# Tipos cujo corpo tem segredo (senha em texto claro): apagado quando a mensagem
+# chega ao estado final (enviado ou morto)
+TIPOS_CORPO_SENSIVEL = (TIPO_SENHA_TEMPORARIA,)
+
+# Mensagens finalizadas ficam na tabela por N dias (ver purgar_emails_finalizados)
+RETENCAO_DIAS = int(os.getenv('EMAIL_OUTBOX_RETENCAO_DIAS', 30))
+
+# Colunas de uma mensagem renderizada (chaves dos dicts de enfileirar_emails)
+COLUNAS_MENSAGEM = ('tipo', 'pesquisa_id', 'remetente', 'destinatario', 'nome_destinatario',
+                    'assunto', 'corpo_html', 'corpo_texto')
+
+
+def enfileirar_emails(emails: List[Dict]) -> int:
+    """
+    Grava as mensagens renderizadas na caixa de saída (um único INSERT)
+
+    Returns:
+        int: mensagens enfileiradas
+
+    Raises:
+        ConnectionError: banco indisponível (nada foi gravado)
+    """
+    if not emails:
+        return 0
+
+    with transacao() as cursor:
+        inserir_emails(cursor, emails)
+
+    return len(emails)
+
+
+def inserir_emails(cursor, emails: List[Dict]) -> None:
+    """Grava várias mensagens (um único INSERT) dentro de uma transação já aberta"""
+    if not emails:
+        return
+
+    marcadores = '(' + ', '.join(['%s'] * (len(COLUNAS_MENSAGEM) + 1)) + ')'
+    params = []
+    for email in emails:
+        params.extend(email.get(coluna) for coluna in COLUNAS_MENSAGEM)
+        params.append(MAX_TENTATIVAS)
+
+    cursor.execute(f"""
+    INSERT INTO email_outbox ({', '.join(COLUNAS_MENSAGEM)}, max_tentativas)
+    VALUES {', '.join([marcadores] * len(emails))}
+    """, params)
+
+
+def inserir_email(cursor, email: Dict) -> int:
+    """Grava uma mensagem dentro de uma transação já aberta e retorna o ID"""
+    cursor.execute(f"""
+    INSERT INTO email_outbox ({', '.join(COLUNAS_MENSAGEM)}, max_tentativas)
+    VALUES ({', '.join(['%s'] * (len(COLUNAS_MENSAGEM) + 1))})
+    """, [email.get(coluna) for coluna in COLUNAS_MENSAGEM] + [MAX_TENTATIVAS])
+    return cursor.lastrowid
+
+
+def reservar_emails(worker_id: str, limite: int = 20) -> List[Dict]:
+    """
+    Reserva (lease) mensagens prontas para envio
+    Inclui mensagens 'enviando' cujo lease expirou (worker morreu no meio)
+    """
+    with transacao() as cursor:
+        cursor.execute("""
+        SELECT id, tipo, pesquisa_id, remetente, destinatario, nome_destinatario,
+               assunto, corpo_html, corpo_texto, tentativas, max_tentativas
+        FROM email_outbox
+        WHERE (
+            (status = 'pendente' AND disponivel_em <= NOW())
+            OR (status = 'enviando' AND lease_ate < NOW())
+        )
+        ORDER BY disponivel_em ASC
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+        """, (limite,))
+
+        emails = cursor.fetchall()
+        if not emails:
+            return []
+
+        ids = [email['id'] for email in emails]
+        cursor.execute(f"""
+        UPDATE email_outbox
+        SET status = 'enviando',
+            tentativas = tentativas + 1,
+            lease_ate = DATE_ADD(NOW(), INTERVAL %s SECOND),
+            worker_id = %s
+        WHERE id IN ({', '.join(['%s'] * len(ids))})
+        """, [LEASE_SEGUNDOS, worker_id] + ids)
+
+    for email in emails:
+        email['tentativas'] += 1
+
+    return emails
+
+
+def concluir_lote(enviados: List[Dict], falhas: List[Tuple[Dict, str, bool]]) -> None:
+    """
+    Grava o resultado do lote numa transação: status das mensagens e
+    log_emails_enviados (resultado final dos alertas: enviado ou desistência)
+    Mensagens finalizadas de TIPOS_CORPO_SENSIVEL têm o corpo apagado
+
+    Args:
+        enviados: mensagens aceitas pelo servidor
+        falhas: (mensagem, erro, definitiva) - definitiva = não adianta tentar de novo
+    """
+    reagendar = []
+    mortos = []
+    sensiveis = [email['id'] for email in enviados if email['tipo'] in TIPOS_CORPO_SENSIVEL]
+    # log_emails_enviados registra só alertas (é o que o reprocessamento consulta para não repetir)
+    logs = [(email['pesquisa_id'], email['destinatario'], email['assunto'], True, None)
+            for email in enviados if email['tipo'] == TIPO_ALERTA]
+    # Resumos (digest) não têm pesquisa_id: o log sai por pesquisa incluída no resumo
+    logs_resumo = [(True, None, email['id'])
+                   for email in enviados if email['tipo'] == TIPO_RESUMO_ALERTAS]
+
+    for email, erro, definitiva in falhas:
+        if definitiva or email['tentativas'] >= email['max_tentativas']:
+            mortos.append((erro[:5000], email['id']))
+            if email['tipo'] in TIPOS_CORPO_SENSIVEL:
+                sensiveis.append(email['id'])
+            if email['tipo'] == TIPO_ALERTA:
+                logs.append((email['pesquisa_id'], email['destinatario'], email['assunto'], False, erro))
+            elif email['tipo'] == TIPO_RESUMO_ALERTAS:
+                logs_resumo.append((False, erro, email['id']))
+        else:
+            reagendar.append((erro[:5000], calcular_backoff(email['tentativas']), email['id']))
+
+    with transacao() as cursor:
+        if enviados:
+            ids = [email['id'] for email in enviados]
+            cursor.execute(f"""
+            UPDATE email_outbox
+            SET status = 'enviado', lease_ate = NULL, enviado_em = NOW(), ultimo_erro = NULL
+            WHERE id IN ({', '.join(['%s'] * len(ids))})
+            """, ids)
+
+        if reagendar:
+            cursor.executemany("""
+            UPDATE email_outbox
+            SET status = 'pendente', lease_ate = NULL, ultimo_erro = %s,
+                disponivel_em = DATE_ADD(NOW(), INTERVAL %s SECOND)
+            WHERE id = %s
+            """, reagendar)
+
+        if mortos:
+            cursor.executemany("""
+            UPDATE email_outbox
+            SET status = 'morto', lease_ate = NULL, ultimo_erro = %s
+            WHERE id = %s
+            """, mortos)
+
+        if sensiveis:
+            cursor.execute(f"""
+            UPDATE email_outbox
+            SET corpo_html = NULL, corpo_texto = NULL
+            WHERE id IN ({', '.join(['%s'] * len(sensiveis))})
+            """, sensiveis)
+
+        if logs:
+            cursor.executemany("""
+            INSERT INTO log_emails_enviados
+            (pesquisa_id, email_destinatario, assunto, enviado_com_sucesso, erro_envio)
+            VALUES (%s, %s, %s, %s, %s)
+            """, logs)
+
+        if logs_resumo:
+            cursor.executemany("""
+            INSERT INTO log_emails_enviados
+            (pesquisa_id, email_destinatario, assunto, enviado_com_sucesso, erro_envio)
+            SELECT d.pesquisa_id, o.destinatario, o.assunto, %s, %s
+            FROM alertas_digest d
+            JOIN email_outbox o ON o.id = d.outbox_id
+            WHERE d.outbox_id = %s
+            """, logs_resumo)
+
+    for email, erro, _ in falhas:
+        print(f"🔄 Email {email['id']} para {email['destinatario']}: {erro} "
+              f"(tentativa {email['tentativas']}/{email['max_tentativas']})")
+    if mortos:
+        print(f"☠️ {len(mortos)} email(s) movido(s) para dead-letter")
+
+
+def contar_pendentes() -> int:
+    """Mensagens aguardando envio (informativo)"""
+    result = execute_query(
+        "SELECT COUNT(*) as total FROM email_outbox WHERE status IN ('pendente', 'enviando')",
+        fetch=True
+    )
+    return result[0]['total'] if result else 0
+
+
+def purgar_emails_finalizados(dias: int = None, limite: int = 5000) -> int:
+    """
+    Remove mensagens enviadas ou mortas há mais de `dias` dias (DELETE em blocos)
+    O resultado dos alertas continua em log_emails_enviados
+
+    Returns:
+        int: mensagens removidas
+    """
+    dias = dias if dias is not None else RETENCAO_DIAS
+    total = 0
+    while True:
+        removidas = execute_query("""
+        DELETE FROM email_outbox
+        WHERE status IN ('enviado', 'morto')
+        AND updated_at < NOW() - INTERVAL %s DAY
+        LIMIT %s
+        """, (dias, limite))
+        if not removidas:
+            break
+        total += removidas
+        if removidas < limite:
+            break
+
+    if total:
+        print(f"🧹 Caixa de saída: {total} email(s) finalizado(s) com mais de {dias} dia(s) removido(s)")
+    return total
@@ -6,9 +6,16 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 import os
+import socket
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from app.utils.database import execute_query
+from app.services.palavras_chave import correspondente_palavras
+from app.services.sessao_smtp import get_sessao_smtp
+from app.services.email_outbox import enfileirar_emails, TIPO_SENHA_TEMPORARIA
+from app.services.templates_email import renderizar_email
+from app.services.destinatarios_alerta import destinatarios_alerta
+from app.services.digest_alertas import acumular_alertas, separar_por_modo
 import ssl
 
 class EmailService:
@@ -46,7 +53,8 @@ class EmailService:
 
     def enviar_alerta_insatisfacao(self, pesquisa_id: int, analise_sentimento: Dict) -> Dict:
         """
-        Envia alerta de insatisfação para gestores configurados
+        Enfileira o alerta de insatisfação para os gestores configurados
+        (um INSERT em email_outbox; o envio é feito por scripts/worker_emails.py)
         
         Args:
             pesquisa_id (int): ID da pesquisa
@@ -66,93 +74,96 @@ class EmailService:
                 return {
                     'sucesso': False,
                     'erro': 'Pesquisa não encontrada',
-                    'emails_enviados': 0
+                    'emails_enfileirados': 0
                 }
             
             print(f"✅ [DEBUG] Pesquisa encontrada: {dados_pesquisa['nome_cliente']} - Produto: {dados_pesquisa['tipo_produto']}")
             
-            # Buscar gestores que devem receber o alerta
-            gestores = self._buscar_gestores_para_alerta(dados_pesquisa['tipo_produto'])
+            # Preparar dados do email (o nível do alerta define quem recebe)
+            dados_email = self._gerar_corpo_email(dados_pesquisa, analise_sentimento)
+
+            # Gestores que assinaram o produto com severidade mínima atendida (índice em memória)
+            gestores = destinatarios_alerta(dados_pesquisa['tipo_produto_id'], dados_email['nivel_alerta'])
             if not gestores:
-                print(f"⚠️ [DEBUG] Nenhum gestor configurado para produto: {dados_pesquisa['tipo_produto']}")
+                print(f"⚠️ [DEBUG] Nenhum gestor assinou alertas {dados_email['nivel_alerta']} para produto: {dados_pesquisa['tipo_produto']}")
                 return {
                     'sucesso': True,
-                    'mensagem': 'Nenhum gestor configurado para receber alertas deste produto',
-                    'emails_enviados': 0
+                    'mensagem': 'Nenhum gestor configurado para receber alertas deste produto neste nível',
+                    'emails_enfileirados': 0
                 }
             
             print(f"👥 [DEBUG] {len(gestores)} gestor(es) encontrado(s)")
             
-            # Preparar dados do email
+            # Gestores em modo horário/diário recebem no próximo resumo (críticos sempre na hora).
+            # Acumular antes de enfileirar: é idempotente, então uma nova tentativa do job não duplica
+            gestores, gestores_resumo = separar_por_modo(gestores, dados_email['nivel_alerta'])
+            try:
+                alertas_acumulados = acumular_alertas(pesquisa_id, gestores_resumo, {
+                    'nivel_alerta': dados_email['nivel_alerta'],
+                    'cor_nivel': dados_email['cor_nivel'],
+                    'cliente': dados_email['cliente'],
+                    'resumo_ia': dados_email['analise']['resumo_ia'],
+                    'link_detalhes': dados_email['link_detalhes']
+                })
+            except Exception as e:
+                print(f"❌ [DEBUG] Falha ao acumular alertas para o resumo: {str(e)}")
+                return {
+                    'sucesso': False,
+                    'erro': f"Falha ao acumular alertas para o resumo: {str(e)}",
+                    'emails_enfileirados': 0
+                }
+            
+            if not gestores:
+                print(f"🗞️ [DEBUG] Alerta guardado para o resumo de {alertas_acumulados} gestor(es)")
+                return {
+                    'sucesso': True,
+                    'mensagem': f"Alerta guardado para o resumo de {alertas_acumulados} gestor(es)",
+                    'emails_enfileirados': 0,
+                    'alertas_acumulados': alertas_acumulados
+                }
+            
             assunto = self._gerar_assunto(dados_pesquisa, analise_sentimento)
-            dados_email = self._gerar_corpo_email(dados_pesquisa, analise_sentimento)
-
             
             print(f"📝 [DEBUG] Assunto: {assunto}")
             
-            emails_enviados = 0
-            erros = []
+            # Mesmo conteúdo para todos os gestores; o envio fica com o worker da caixa de saída
+            renderizado = self._renderizar_email(
+                destinatario=gestores[0]['email'],
+                nome_destinatario=gestores[0]['nome'],
+                assunto=assunto,
+                dados_email=dados_email
+            )
+            if not renderizado['sucesso']:
+                return {
+                    'sucesso': False,
+                    'erro': renderizado['erro'],
+                    'emails_enfileirados': 0
+                }
+            
+            emails = [
+                dict(renderizado['email'],
+                     tipo='alerta_insatisfacao',
+                     pesquisa_id=pesquisa_id,
+                     destinatario=gestor['email'],
+                     nome_destinatario=gestor['nome'])
+                for gestor in gestores
+            ]
             
-            # Enviar para cada gestor
-            for i, gestor in enumerate(gestores, 1):
-                try:
-                    print(f"📮 [DEBUG] Enviando email {i}/{len(gestores)} para: {gestor['email']}")
-                    
-                    resultado_envio = self._enviar_email(
-                        destinatario=gestor['email'],
-                        nome_destinatario=gestor['nome'],
-                        assunto=assunto,
-                        dados_email=dados_email
-                    )
-                    
-                    if resultado_envio['sucesso']:
-                        emails_enviados += 1
-                        print(f"✅ [DEBUG] Email enviado com sucesso para {gestor['email']}")
-                        
-                        # Registrar no log
-                        self._registrar_log_email(
-                            pesquisa_id=pesquisa_id,
-                            email_destinatario=gestor['email'],
-                            assunto=assunto,
-                            sucesso=True,
-                            erro=None,
-                            analise_sentimento_id=None
-                        )
-                    else:
-                        erro_msg = f"{gestor['email']}: {resultado_envio['erro']}"
-                        erros.append(erro_msg)
-                        print(f"❌ [DEBUG] Falha no envio para {gestor['email']}: {resultado_envio['erro']}")
-                        
-                        # Registrar erro no log
-                        self._registrar_log_email(
-                            pesquisa_id=pesquisa_id,
-                            email_destinatario=gestor['email'],
-                            assunto=assunto,
-                            sucesso=False,
-                            erro=resultado_envio['erro'],
-                            analise_sentimento_id=None
-                        )
-                        
-                except Exception as e:
-                    erro_msg = f"Erro ao enviar para {gestor['email']}: {str(e)}"
-                    erros.append(erro_msg)
-                    print(f"💥 [DEBUG] Exceção no envio para {gestor['email']}: {str(e)}")
-                    
-                    # Registrar erro no log
-                    self._registrar_log_email(
-                        pesquisa_id=pesquisa_id,
-                        email_destinatario=gestor['email'],
-                        assunto=assunto,
-                        sucesso=False,
-                        erro=str(e),
-                        analise_sentimento_id=None
-                    )
+            try:
+                emails_enfileirados = enfileirar_emails(emails)
+            except Exception as e:
+                print(f"❌ [DEBUG] Falha ao enfileirar os emails: {str(e)}")
+                return {
+                    'sucesso': False,
+                    'erro': f"Falha ao enfileirar os emails: {str(e)}",
+                    'emails_enfileirados': 0
+                }
             
             resultado_final = {
-                'sucesso': emails_enviados > 0,
-                'emails_enviados': emails_enviados,
-                'total_gestores': len(gestores),
-                'erros': erros if erros else None
+                'sucesso': True,
+                'emails_enfileirados': emails_enfileirados,
+                'alertas_acumulados': alertas_acumulados,
+                'total_gestores': len(gestores) + len(gestores_resumo)
             }
             
             print(f"🎯 [DEBUG] Resultado final: {resultado_final}")
@@ -164,14 +175,43 @@ class EmailService:
             return {
                 'sucesso': False,
                 'erro': f"Erro geral no envio: {str(e)}",
-                'emails_enviados': 0
+                'emails_enfileirados': 0
             }
 
 
+    def montar_resumo_alertas(self, gestor: Dict, modo: str, alertas: List[Dict]) -> Dict:
+        """
+        Monta o email de resumo dos alertas acumulados de um gestor (ver digest_alertas)
+        
+        Args:
+            gestor (dict): nome e email do gestor
+            modo (str): 'horario' ou 'diario'
+            alertas (list): resumos gravados por enviar_alerta_insatisfacao
+            
+        Returns:
+            dict: mensagem com as colunas de email_outbox (sem tipo)
+        """
+        periodo = 'na última hora' if modo == 'horario' else 'nas últimas 24 horas'
+        corpo_html, corpo_texto = renderizar_email(
+            'alerta_digest',
+            gestor_nome=gestor['nome'],
+            periodo=periodo,
+            alertas=alertas
+        )
+        
+        return {
+            'remetente': f"Sistema de Pesquisa <{self.email_remetente}>",
+            'destinatario': gestor['email'],
+            'nome_destinatario': gestor['nome'],
+            'assunto': f"Resumo de alertas: {len(alertas)} cliente(s) insatisfeito(s) {periodo}",
+            'corpo_html': corpo_html,
+            'corpo_texto': corpo_texto
+        }
+
     def enviar_senha_temporaria(self, nome_usuario: str, email_destinatario: str, 
                           senha_temporaria: str, gestor_nome: str) -> Dict:
         """
-        Envia email com senha temporária para usuário
+        Enfileira email com senha temporária para usuário (email_outbox)
         
         Args:
             nome_usuario (str): Nome do usuário que terá a senha resetada
@@ -190,91 +230,18 @@ class EmailService:
             
             assunto = f"Nova Senha Temporária - Sistema de Pesquisa"
             
-            # Versão HTML
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .header {{ background-color: #f8f9fa; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                    .content {{ background-color: white; padding: 30px; border: 1px solid #dee2e6; }}
-                    .password-box {{ background-color: #e9ecef; padding: 15px; border-radius: 5px; text-align: center; margin: 20px 0; }}
-                    .password {{ font-size: 24px; font-weight: bold; color: #007bff; letter-spacing: 2px; }}
-                    .alert {{ background-color: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                    .footer {{ background-color: #f8f9fa; padding: 15px; text-align: center; font-size: 12px; color: #6c757d; border-radius: 0 0 8px 8px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>🔑 Nova Senha Temporária</h1>
-                    </div>
-                    
-                    <div class="content">
-                        <p>Olá <strong>{nome_usuario}</strong>,</p>
-                        
-                        <p>Sua senha foi resetada pelo gestor <strong>{gestor_nome}</strong> no Sistema de Pesquisa de Satisfação.</p>
-                        
-                        <div class="password-box">
-                            <p><strong>Sua nova senha temporária é:</strong></p>
-                            <div class="password">{senha_temporaria}</div>
-                        </div>
-                        
-                        <div class="alert">
-                            <strong>⚠️ IMPORTANTE:</strong>
-                            <ul>
-                                <li>Esta é uma senha temporária</li>
-                                <li>Altere sua senha após o primeiro login</li>
-                                <li>Esta senha expira em 30 dias</li>
-                                <li>Use as credenciais: <strong>{email_destinatario}</strong> e a senha acima</li>
-                            </ul>
-                        </div>
-                        
-                        <p>Para acessar o sistema: <a href="{self.app_url}/auth/login">{self.app_url}/auth/login</a></p>
-                        
-                        <p>Se você não solicitou esta alteração, entre em contato com o administrador imediatamente.</p>
-                    </div>
-                    
-                    <div class="footer">
-                        Sistema de Pesquisa de Satisfação<br>
-                        Email enviado automaticamente em {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            # Versão texto simples
-            texto_content = f"""
-            Nova Senha Temporária - Sistema de Pesquisa
-            
-            Olá {nome_usuario},
-            
-            Sua senha foi resetada pelo gestor {gestor_nome} no Sistema de Pesquisa de Satisfação.
-            
-            Sua nova senha temporária é: {senha_temporaria}
-            
-            IMPORTANTE:
-            - Esta é uma senha temporária
-            - Altere sua senha após o primeiro login  
-            - Esta senha expira em 30 dias
-            - Use as credenciais: {email_destinatario} e a senha acima
-            
-            Para acessar o sistema: {self.app_url}/auth/login
-            
-            Se você não solicitou esta alteração, entre em contato com o administrador imediatamente.
-            
-            ────────────────────────────────────────
-            Sistema de Pesquisa de Satisfação
-            Email enviado automaticamente em {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}
-            """
+            html_content, texto_content = renderizar_email(
+                'senha_temporaria',
+                nome_usuario=nome_usuario,
+                gestor_nome=gestor_nome,
+                senha_temporaria=senha_temporaria,
+                email_destinatario=email_destinatario,
+                app_url=self.app_url
+            )
             
-            # === ENVIAR EMAIL ===
+            # === ENFILEIRAR EMAIL (envio pelo worker da caixa de saída) ===
             
-            resultado_envio = self._enviar_email(
+            renderizado = self._renderizar_email(
                 destinatario=email_destinatario,
                 nome_destinatario=nome_usuario,
                 assunto=assunto,
@@ -282,28 +249,20 @@ class EmailService:
                 corpo_texto=texto_content
             )
             
-            if resultado_envio['sucesso']:
-                print(f"✅ [DEBUG] Senha temporária enviada com sucesso!")
-                
-                # Registrar no log (opcional - se você tiver tabela de log)
-                # self._registrar_log_email(
-                #     pesquisa_id=None,
-                #     email_destinatario=email_destinatario,
-                #     assunto=assunto,
-                #     sucesso=True,
-                #     erro=None
-                # )
-                
-                return {
-                    'sucesso': True,
-                    'email_enviado': email_destinatario,
-                    'mensagem': 'Senha temporária enviada com sucesso'
-                }
-            else:
+            if not renderizado['sucesso']:
                 return {
                     'sucesso': False,
-                    'erro': resultado_envio.get('erro', 'Erro desconhecido no envio')
+                    'erro': renderizado.get('erro', 'Erro desconhecido ao montar o email')
                 }
+            
+            enfileirar_emails([dict(renderizado['email'], tipo=TIPO_SENHA_TEMPORARIA)])
+            print(f"✅ [DEBUG] Senha temporária enfileirada para envio!")
+            
+            return {
+                'sucesso': True,
+                'email_enviado': email_destinatario,
+                'mensagem': 'Senha temporária enfileirada para envio'
+            }
                 
         except Exception as e:
             print(f"💥 [DEBUG] Erro ao enviar senha temporária: {str(e)}")
@@ -312,6 +271,68 @@ class EmailService:
                 'erro': f'Erro interno: {str(e)}'
             }
 
+    def montar_lembrete_agente(self, pesquisa: Dict, gestor_nome: Optional[str]) -> Dict:
+        """
+        Monta o lembrete ao agente sobre pesquisa pendente perto de expirar
+        
+        Args:
+            pesquisa (dict): Pesquisa com agente_nome, agente_email, tipo_produto e horas_restantes
+            gestor_nome (str): Nome do gestor que pediu o lembrete (None = lembrete automático)
+            
+        Returns:
+            dict: mensagem com as colunas de email_outbox
+        """
+        html_content, texto_content = renderizar_email(
+            'lembrete_agente',
+            agente_nome=pesquisa['agente_nome'],
+            gestor_nome=gestor_nome,
+            nome_cliente=pesquisa['nome_cliente'],
+            codigo_cliente=pesquisa['codigo_cliente'],
+            nome_treinamento=pesquisa['nome_treinamento'],
+            tipo_produto=pesquisa['tipo_produto'],
+            horas_restantes=pesquisa['horas_restantes'],
+            app_url=self.app_url
+        )
+        
+        return {
+            'tipo': 'lembrete_agente',
+            'pesquisa_id': pesquisa['id'],
+            'remetente': f"{self.nome_remetente} <{self.email_remetente}>",
+            'destinatario': pesquisa['agente_email'],
+            'nome_destinatario': pesquisa['agente_nome'],
+            'assunto': f"Lembrete: pesquisa de {pesquisa['nome_cliente']} expira em {pesquisa['horas_restantes']}h",
+            'corpo_html': html_content,
+            'corpo_texto': texto_content
+        }
+
+    def enviar_lembrete_agente(self, pesquisa: Dict, gestor_nome: str) -> Dict:
+        """
+        Enfileira lembrete ao agente sobre pesquisa pendente perto de expirar (email_outbox)
+        
+        Args:
+            pesquisa (dict): Pesquisa com agente_nome, agente_email, tipo_produto e horas_restantes
+            gestor_nome (str): Nome do gestor que pediu o lembrete
+            
+        Returns:
+            dict: Resultado do enfileiramento
+        """
+        
+        try:
+            enfileirar_emails([self.montar_lembrete_agente(pesquisa, gestor_nome)])
+            
+            return {
+                'sucesso': True,
+                'email_enviado': pesquisa['agente_email'],
+                'mensagem': 'Lembrete enfileirado para envio'
+            }
+            
+        except Exception as e:
+            print(f"💥 [DEBUG] Erro ao enfileirar lembrete: {str(e)}")
+            return {
+                'sucesso': False,
+                'erro': f'Erro interno: {str(e)}'
+            }
+
 
 
 
@@ -340,42 +361,6 @@ class EmailService:
         result = execute_query(query, (pesquisa_id,), fetch=True)
         return result[0] if result else None
 
-    def _buscar_gestores_para_alerta(self, tipo_produto: str) -> List[Dict]:
-        """Busca gestores que devem receber alertas para o produto específico"""
-        
-        # Mapear nome do produto para campo do banco
-        campo_alerta = None
-        if 'Time is Money' in tipo_produto or 'time' in tipo_produto.lower():
-            campo_alerta = 'alerta_time_is_money'
-        elif 'Servidor' in tipo_produto or 'servidor' in tipo_produto.lower() or 'nuvem' in tipo_produto.lower():
-            campo_alerta = 'alerta_servidor_nuvem'
-        elif 'Alterdata' in tipo_produto or 'alterdata' in tipo_produto.lower():
-            campo_alerta = 'alerta_alterdata'
-
-        if not campo_alerta:
-            print(f"⚠️ Produto não mapeado para alertas: {tipo_produto}")
-            return []
-        
-        query = f"""
-        SELECT 
-            id,
-            nome,
-            email
-        FROM usuarios
-        WHERE tipo_usuario = 'gestor'
-        AND ativo = TRUE
-        AND {campo_alerta} = TRUE
-        """
-        
-        result = execute_query(query, fetch=True)
-        gestores_encontrados = result if result else []
-        
-        print(f"📧 Gestores encontrados para '{tipo_produto}': {len(gestores_encontrados)}")
-        for gestor in gestores_encontrados:
-            print(f"   - {gestor['nome']} ({gestor['email']})")
-        
-        return gestores_encontrados
-
     def _gerar_assunto(self, dados_pesquisa: Dict, analise_sentimento: Dict) -> str:
         """Gera assunto do email de alerta"""
         
@@ -424,17 +409,17 @@ class EmailService:
                     if 'detalhes' in resposta:
                         palavras_negativas = resposta['detalhes'].get('palavras_negativas', [])
                     
-                    # Interpretar o motivo baseado nas palavras
+                    # Interpretar o motivo baseado nas palavras (uma passada pelo texto)
                     interpretacao = "Crítica geral ao serviço"
-                    texto = resposta['texto'].lower()
+                    motivos = correspondente_palavras.agrupar(resposta['texto'])
                     
-                    if any(palavra in texto for palavra in ['confuso', 'difícil', 'complicado', 'não entendi']):
+                    if 'motivo_compreensao' in motivos:
                         interpretacao = "Dificuldade de compreensão do conteúdo"
-                    elif any(palavra in texto for palavra in ['perdi tempo', 'inútil', 'não aprendi']):
+                    elif 'motivo_tempo_perdido' in motivos:
                         interpretacao = "Percepção de tempo perdido e baixo aproveitamento"
-                    elif any(palavra in texto for palavra in ['mal explicado', 'ruim', 'péssimo']):
+                    elif 'motivo_qualidade' in motivos:
                         interpretacao = "Crítica direta à qualidade da apresentação"
-                    elif any(palavra in texto for palavra in ['não recomendo', 'decepcionante']):
+                    elif 'motivo_reputacao' in motivos:
                         interpretacao = "Insatisfação que pode afetar reputação"
                     
                     trechos_criticos.append({
@@ -449,11 +434,12 @@ class EmailService:
             for resposta in detalhes['respostas_numericas']:
                 if resposta.get('pontos', 0) == -1:  # Nota baixa
                     contexto = "Avaliação geral"
-                    if 'instrutor' in resposta['pergunta'].lower():
+                    contextos = correspondente_palavras.agrupar(resposta['pergunta'])
+                    if 'contexto_instrutor' in contextos:
                         contexto = "Qualidade do instrutor"
-                    elif 'conteúdo' in resposta['pergunta'].lower():
+                    elif 'contexto_conteudo' in contextos:
                         contexto = "Conteúdo do treinamento"
-                    elif 'recomend' in resposta['pergunta'].lower():
+                    elif 'contexto_recomendacao' in contextos:
                         contexto = "Disposição para recomendar"
                     
                     notas_baixas.append({
@@ -499,477 +485,24 @@ class EmailService:
             'link_detalhes': f"{self.app_url}/gestor/detalhes/{dados_pesquisa['id']}"
         }
 
-    def _enviar_email(self, destinatario: str, nome_destinatario: str, 
-                assunto: str, dados_email: Dict = None, 
+    def _renderizar_email(self, destinatario: str, nome_destinatario: str,
+                assunto: str, dados_email: Dict = None,
                 corpo_html: str = None, corpo_texto: str = None) -> Dict:
-        """Envia email profissional com análise detalhada OU email simples"""
+        """Monta remetente, assunto e corpos do email profissional com análise detalhada OU do email simples"""
         
-        print(f"[DEBUG] === INICIANDO ENVIO DE EMAIL ===")
+        print(f"[DEBUG] === RENDERIZANDO EMAIL ===")
         print(f"[DEBUG] Destinatário: {destinatario}")
         print(f"[DEBUG] Assunto: {assunto}")
         print(f"[DEBUG] Tipo: {'Alerta' if dados_email else 'Simples'}")
         
-        # Validar configurações SMTP
-        print(f"[DEBUG] === CONFIGURAÇÕES SMTP ===")
-        print(f"[DEBUG] Servidor: {self.smtp_server}")
-        print(f"[DEBUG] Porta: {self.smtp_port}")
-        print(f"[DEBUG] Username: {self.smtp_username}")
-        print(f"[DEBUG] Remetente: {self.email_remetente}")
-        print(f"[DEBUG] Senha definida: {'SIM' if self.smtp_password else 'NÃO'}")
-        print(f"[DEBUG] Senha length: {len(self.smtp_password) if self.smtp_password else 0}")
-        
-        if not all([self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password, self.email_remetente]):
-            return {
-                'sucesso': False,
-                'erro': 'Configurações SMTP incompletas no .env'
-            }
-        
         try:
             # MODO ORIGINAL: Email de alerta (mantém todo código existente)
             if dados_email:
                 print(f"[DEBUG] Criando email profissional...")
                 print(f"[DEBUG] Nível: {dados_email['nivel_alerta']}")
                 
-                # === HTML PROFISSIONAL (código existente inalterado) ===
-                html_profissional = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Alerta de Insatisfação - Sistema de Pesquisa</title>
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #2c3e50;
-                    background: #ecf0f1;
-                }}
-                
-                .email-container {{
-                    max-width: 650px;
-                    margin: 0 auto;
-                    background: #ffffff;
-                    border-radius: 8px;
-                    overflow: hidden;
-                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                }}
-                
-                .header {{
-                    background: linear-gradient(135deg, {dados_email['cor_nivel']} 0%, #8b0000 100%);
-                    color: #ffffff;
-                    padding: 25px 30px;
-                    text-align: center;
-                    border-bottom: 3px solid rgba(255,255,255,0.2);
-                }}
-                
-                .header h1 {{
-                    font-size: 24px;
-                    font-weight: 600;
-                    margin-bottom: 8px;
-                    letter-spacing: 0.5px;
-                }}
-                
-                .nivel-badge {{
-                    display: inline-block;
-                    background: rgba(255,255,255,0.15);
-                    padding: 6px 16px;
-                    border-radius: 20px;
-                    font-size: 13px;
-                    font-weight: 500;
-                    border: 1px solid rgba(255,255,255,0.3);
-                    backdrop-filter: blur(10px);
-                }}
-                
-                .urgencia {{
-                    font-size: 12px;
-                    margin-top: 8px;
-                    opacity: 0.9;
-                    font-style: italic;
-                }}
-                
-                .content {{
-                    padding: 30px;
-                }}
-                
-                .alert-section {{
-                    background: linear-gradient(135deg, #fff8e1 0%, #ffecb3 100%);
-                    border-left: 4px solid #ff8f00;
-                    padding: 18px 20px;
-                    border-radius: 6px;
-                    margin-bottom: 25px;
-                }}
-                
-                .alert-section strong {{
-                    color: #e65100;
-                    font-weight: 600;
-                }}
-                
-                .info-section {{
-                    margin-bottom: 25px;
-                }}
-                
-                .section-title {{
-                    font-size: 16px;
-                    font-weight: 600;
-                    color: #34495e;
-                    margin-bottom: 15px;
-                    padding-bottom: 8px;
-                    border-bottom: 2px solid #ecf0f1;
-                    display: flex;
-                    align-items: center;
-                }}
-                
-                .section-title::before {{
-                    content: '';
-                    width: 4px;
-                    height: 16px;
-                    background: {dados_email['cor_nivel']};
-                    margin-right: 10px;
-                    border-radius: 2px;
-                }}
-                
-                .client-info {{
-                    background: #f8f9fa;
-                    padding: 20px;
-                    border-radius: 6px;
-                    border: 1px solid #e9ecef;
-                }}
-                
-                .info-grid {{
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 12px;
-                    margin-bottom: 10px;
-                }}
-                
-                .info-item {{
-                    display: flex;
-                    align-items: center;
-                }}
-                
-                .info-label {{
-                    font-weight: 600;
-                    color: #495057;
-                    min-width: 80px;
-                    font-size: 13px;
-                }}
-                
-                .info-value {{
-                    color: #212529;
-                    font-size: 13px;
-                    margin-left: 5px;
-                }}
-                
-                .ai-analysis {{
-                    background: linear-gradient(135deg, #f0f7ff 0%, #e3f2fd 100%);
-                    border: 1px solid #bbdefb;
-                    border-radius: 8px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                
-                .confidence-bar {{
-                    background: #e0e0e0;
-                    height: 6px;
-                    border-radius: 3px;
-                    overflow: hidden;
-                    margin: 8px 0;
-                }}
-                
-                .confidence-fill {{
-                    background: linear-gradient(90deg, #4caf50 0%, #2e7d32 100%);
-                    height: 100%;
-                    width: {dados_email['analise']['confianca']}%;
-                    transition: width 0.3s ease;
-                }}
-                
-                .excerpt {{
-                    background: #ffffff;
-                    border: 1px solid #dee2e6;
-                    border-left: 3px solid {dados_email['cor_nivel']};
-                    padding: 15px;
-                    margin: 10px 0;
-                    border-radius: 4px;
-                }}
-                
-                .excerpt-text {{
-                    font-style: italic;
-                    color: #495057;
-                    margin-bottom: 8px;
-                    line-height: 1.5;
-                }}
-                
-                .excerpt-interpretation {{
-                    font-size: 12px;
-                    color: #6c757d;
-                    font-weight: 500;
-                }}
-                
-                .summary-box {{
-                    background: linear-gradient(135deg, #fff3e0 0%, #ffe0b2 100%);
-                    border: 1px solid #ffcc02;
-                    border-radius: 6px;
-                    padding: 18px;
-                    margin: 15px 0;
-                }}
-                
-                .summary-title {{
-                    font-weight: 600;
-                    color: #ef6c00;
-                    margin-bottom: 8px;
-                    font-size: 14px;
-                }}
-                
-                .summary-text {{
-                    color: #bf360c;
-                    font-size: 13px;
-                    line-height: 1.5;
-                }}
-                
-                .recommendations {{
-                    background: linear-gradient(135deg, #e8f5e8 0%, #c8e6c9 100%);
-                    border: 1px solid #81c784;
-                    border-radius: 6px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                
-                .rec-list {{
-                    list-style: none;
-                    padding: 0;
-                }}
-                
-                .rec-list li {{
-                    padding: 6px 0;
-                    color: #2e7d32;
-                    font-size: 13px;
-                    display: flex;
-                    align-items: flex-start;
-                }}
-                
-                .rec-list li::before {{
-                    content: '▶';
-                    color: #4caf50;
-                    margin-right: 8px;
-                    margin-top: 1px;
-                    font-size: 10px;
-                }}
-                
-                .action-button {{
-                    display: inline-block;
-                    background: linear-gradient(135deg, #1976d2 0%, #0d47a1 100%);
-                    color: #ffffff !important;
-                    padding: 12px 24px;
-                    text-decoration: none !important;
-                    border-radius: 6px;
-                    font-weight: 500;
-                    font-size: 13px;
-                    margin: 15px 0;
-                    box-shadow: 0 2px 8px rgba(25,118,210,0.3);
-                    transition: all 0.2s ease;
-                }}
-                
-                .action-button:hover {{
-                    transform: translateY(-1px);
-                    box-shadow: 0 4px 12px rgba(25,118,210,0.4);
-                }}
-                
-                .divider {{
-                    height: 1px;
-                    background: linear-gradient(90deg, transparent 0%, #bdc3c7 50%, transparent 100%);
-                    margin: 25px 0;
-                }}
-                
-                .footer {{
-                    background: linear-gradient(135deg, #263238 0%, #37474f 100%);
-                    color: #eceff1;
-                    padding: 20px 30px;
-                    text-align: center;
-                    border-top: 1px solid #455a64;
-                }}
-                
-                .footer-main {{
-                    font-size: 13px;
-                    margin-bottom: 8px;
-                    font-weight: 500;
-                }}
-                
-                .footer-timestamp {{
-                    font-size: 11px;
-                    color: #b0bec5;
-                    margin-bottom: 12px;
-                }}
-                
-                .ai-credit {{
-                    background: rgba(255,255,255,0.05);
-                    border-radius: 20px;
-                    padding: 8px 16px;
-                    display: inline-block;
-                    border: 1px solid rgba(255,255,255,0.1);
-                }}
-                
-                .ai-credit-text {{
-                    font-size: 11px;
-                    color: #cfd8dc;
-                    margin: 0;
-                }}
-                
-                @media (max-width: 600px) {{
-                    .email-container {{ margin: 10px; }}
-                    .content {{ padding: 20px; }}
-                    .info-grid {{ grid-template-columns: 1fr; }}
-                    .header {{ padding: 20px; }}
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="email-container">
-                <div class="header">
-                    <h1>ALERTA DE INSATISFAÇÃO</h1>
-                    <div class="nivel-badge">NÍVEL: {dados_email['nivel_alerta']}</div>
-                    <div class="urgencia">{dados_email['urgencia']}</div>
-                </div>
-                
-                <div class="content">
-                    <div class="alert-section">
-                        <strong>Situação Detectada:</strong> Um cliente demonstrou insatisfação significativa com o treinamento realizado. 
-                        Recomenda-se análise imediata e contato direto para resolução.
-                    </div>
-                    
-                    <div class="info-section">
-                        <div class="section-title">Informações do Cliente</div>
-                        <div class="client-info">
-                            <div class="info-grid">
-                                <div class="info-item">
-                                    <span class="info-label">Cliente:</span>
-                                    <span class="info-value"><strong>{dados_email['cliente']['nome']}</strong></span>
-                                </div>
-                                <div class="info-item">
-                                    <span class="info-label">Código:</span>
-                                    <span class="info-value">{dados_email['cliente']['codigo']}</span>
-                                </div>
-                                <div class="info-item">
-                                    <span class="info-label">Treinamento:</span>
-                                    <span class="info-value">{dados_email['cliente']['treinamento']}</span>
-                                </div>
-                                <div class="info-item">
-                                    <span class="info-label">Produto:</span>
-                                    <span class="info-value">{dados_email['cliente']['produto']}</span>
-                                </div>
-                                <div class="info-item">
-                                    <span class="info-label">Agente:</span>
-                                    <span class="info-value">{dados_email['cliente']['agente']}</span>
-                                </div>
-                                <div class="info-item">
-                                    <span class="info-label">Data:</span>
-                                    <span class="info-value">{dados_email['cliente']['data_resposta']}</span>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="info-section">
-                        <div class="section-title">Análise de Inteligência Artificial</div>
-                        <div class="ai-analysis">
-                            <p><strong>Confiabilidade da Análise:</strong> {dados_email['analise']['confianca']}%</p>
-                            <div class="confidence-bar">
-                                <div class="confidence-fill"></div>
-                            </div>
-                            
-                            {self._gerar_trechos_html(dados_email['analise']['trechos_criticos'])}
-                            
-                            {self._gerar_notas_html(dados_email['analise']['notas_baixas'])}
-                            
-                            <div class="summary-box">
-                                <div class="summary-title">Interpretação da IA:</div>
-                                <div class="summary-text">{dados_email['analise']['resumo_ia']}</div>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="divider"></div>
-                    
-                    <div style="text-align: center;">
-                        <a href="{dados_email['link_detalhes']}" class="action-button">
-                            Ver Análise Completa no Sistema
-                        </a>
-                    </div>
-                    
-                    <div class="recommendations">
-                        <div class="section-title" style="border: none; margin-bottom: 10px;">Recomendações Estratégicas</div>
-                        <ul class="rec-list">
-                            <li>Contatar cliente nas próximas 4 horas para demonstrar proatividade</li>
-                            <li>Preparar plano de ação específico baseado nos pontos críticos identificados</li>
-                            <li>Oferecer sessão de follow-up personalizada sem custo adicional</li>
-                            <li>Documentar feedback para melhoria dos processos de treinamento</li>
-                            <li>Analisar padrões similares em outras avaliações do mesmo instrutor/produto</li>
-                        </ul>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <div class="footer-main">Sistema de Pesquisa de Satisfação</div>
-                    <div class="footer-timestamp">
-                        Email enviado automaticamente em {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}
-                    </div>
-                    <div class="ai-credit">
-                        <p class="ai-credit-text">
-                            🧠 Análise realizada por: RoBERTa (BERT)<br>
-                            IA de última geração especializada em compreensão de linguagem natural
-                        </p>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-                """.strip()
-                
-                # === VERSÃO TEXTO ===
-                texto_profissional = f"""
-        ALERTA DE INSATISFACAO - NIVEL {dados_email['nivel_alerta']}
-        {dados_email['urgencia']}
-
-        SITUACAO DETECTADA:
-        Um cliente demonstrou insatisfacao significativa com o treinamento realizado.
-        Recomenda-se analise imediata e contato direto para resolucao.
-
-        INFORMACOES DO CLIENTE:
-        ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-        Cliente: {dados_email['cliente']['nome']}              Codigo: {dados_email['cliente']['codigo']}
-        Treinamento: {dados_email['cliente']['treinamento']}
-        Produto: {dados_email['cliente']['produto']}           Agente: {dados_email['cliente']['agente']}
-        Data da Resposta: {dados_email['cliente']['data_resposta']}
-
-        ANALISE DE INTELIGENCIA ARTIFICIAL:
-        ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-        Confiabilidade: {dados_email['analise']['confianca']}% (alta precisao)
-
-        PRINCIPAIS PROBLEMAS IDENTIFICADOS:
-        {self._gerar_trechos_texto(dados_email['analise']['trechos_criticos'])}
-
-        INTERPRETACAO DA IA:
-        {dados_email['analise']['resumo_ia']}
-
-        RECOMENDACOES ESTRATEGICAS:
-        ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-        • Contatar cliente nas proximas 4 horas para demonstrar proatividade
-        • Preparar plano de acao especifico baseado nos pontos criticos identificados
-        • Oferecer sessao de follow-up personalizada sem custo adicional
-        • Documentar feedback para melhoria dos processos de treinamento
-        • Analisar padroes similares em outras avaliacoes do mesmo instrutor/produto
-
-        ACESSO COMPLETO: {dados_email['link_detalhes']}
-
-        ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-        Sistema de Pesquisa de Satisfacao
-        Email enviado automaticamente em {datetime.now().strftime('%d/%m/%Y as %H:%M:%S')}
-
-        Analise realizada por: RoBERTa (BERT)
-        IA de ultima geracao especializada em compreensao de linguagem natural
-                """.strip()
+                # === HTML + VERSÃO TEXTO (templates emails/alerta_insatisfacao.*) ===
+                html_profissional, texto_profissional = renderizar_email('alerta_insatisfacao', **dados_email)
                 
                 subject_line = f"ALERTA [{dados_email['nivel_alerta']}] - Insatisfação Detectada: {dados_email['cliente']['nome']}"
                 from_header = f"Sistema de Pesquisa <{self.email_remetente}>"
@@ -991,165 +524,16 @@ class EmailService:
             print(f"[DEBUG] HTML length: {len(html_profissional) if html_profissional else 0}")
             print(f"[DEBUG] Text length: {len(texto_profissional) if texto_profissional else 0}")
             
-            # === CRIAÇÃO DA MENSAGEM ===
-            print(f"[DEBUG] === CRIANDO MENSAGEM EMAIL ===")
-            
-            from email.mime.multipart import MIMEMultipart
-            from email.mime.text import MIMEText
-            
-            msg = MIMEMultipart('alternative')
-            msg['From'] = from_header
-            msg['To'] = destinatario
-            msg['Subject'] = subject_line
-            msg['Message-ID'] = f"<{hash(subject_line + destinatario)}@{self.smtp_server}>"
-            msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-            
-            print(f"[DEBUG] Headers configurados")
-            print(f"[DEBUG] Message-ID: {msg['Message-ID']}")
-            
-            # Anexar conteúdo
-            if texto_profissional:
-                parte_texto = MIMEText(texto_profissional, 'plain', 'utf-8')
-                msg.attach(parte_texto)
-                print(f"[DEBUG] Parte texto anexada")
-                
-            if html_profissional:
-                parte_html = MIMEText(html_profissional, 'html', 'utf-8')
-                msg.attach(parte_html)
-                print(f"[DEBUG] Parte HTML anexada")
-            
-            # === CONEXÃO E ENVIO SMTP ===
-            print(f"[DEBUG] === INICIANDO CONEXÃO SMTP ===")
-            
-            import smtplib
-            import ssl
-            import socket
-            
-            # Testar resolução DNS primeiro
-            try:
-                print(f"[DEBUG] Testando resolução DNS para {self.smtp_server}")
-                ip = socket.gethostbyname(self.smtp_server)
-                print(f"[DEBUG] DNS OK - IP: {ip}")
-            except Exception as dns_error:
-                print(f"[ERROR] Falha na resolução DNS: {dns_error}")
-                return {
-                    'sucesso': False,
-                    'erro': f'Falha DNS: {dns_error}'
-                }
-            
-            # Configurar SSL
-            context = ssl.create_default_context()
-            # Algumas configurações específicas para provedores brasileiros
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            try:
-                print(f"[DEBUG] Conectando ao servidor SMTP {self.smtp_server}:{self.smtp_port}")
-                
-                with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30) as server:
-                    print(f"[DEBUG] Conexão estabelecida")
-                    
-                    # Ativar debug do SMTP
-                    server.set_debuglevel(1)
-                    
-                    print(f"[DEBUG] Iniciando STARTTLS")
-                    try:
-                        server.starttls(context=context)
-                        print(f"[DEBUG] STARTTLS OK")
-                    except Exception as tls_error:
-                        print(f"[WARNING] STARTTLS falhou: {tls_error}")
-                        print(f"[DEBUG] Tentando sem TLS")
-                    
-                    print(f"[DEBUG] Fazendo login")
-                    print(f"[DEBUG] Username: {self.smtp_username}")
-                    print(f"[DEBUG] Password: {'*' * len(self.smtp_password)}")
-                    
-                    try:
-                        server.login(self.smtp_username, self.smtp_password)
-                        print(f"[DEBUG] Login bem-sucedido")
-                    except smtplib.SMTPAuthenticationError as auth_error:
-                        print(f"[ERROR] Falha na autenticação: {auth_error}")
-                        return {
-                            'sucesso': False,
-                            'erro': f'Falha na autenticação SMTP: {auth_error}'
-                        }
-                    except Exception as login_error:
-                        print(f"[ERROR] Erro no login: {login_error}")
-                        return {
-                            'sucesso': False,
-                            'erro': f'Erro no login: {login_error}'
-                        }
-                    
-                    print(f"[DEBUG] Enviando mensagem")
-                    print(f"[DEBUG] De: {self.email_remetente}")
-                    print(f"[DEBUG] Para: {destinatario}")
-                    
-                    try:
-                        result = server.send_message(msg)
-                        print(f"[DEBUG] send_message() concluído")
-                        print(f"[DEBUG] Resultado SMTP: {result}")
-                        
-                        if not result:
-                            print(f"[DEBUG] Email aceito pelo servidor sem problemas")
-                        else:
-                            print(f"[WARNING] Alguns destinatários foram rejeitados: {result}")
-                            return {
-                                'sucesso': False,
-                                'erro': f'Destinatários rejeitados: {result}'
-                            }
-                            
-                    except smtplib.SMTPRecipientsRefused as recip_error:
-                        print(f"[ERROR] Destinatário recusado: {recip_error}")
-                        return {
-                            'sucesso': False,
-                            'erro': f'Destinatário recusado: {recip_error}'
-                        }
-                    except smtplib.SMTPDataError as data_error:
-                        print(f"[ERROR] Erro nos dados do email: {data_error}")
-                        return {
-                            'sucesso': False,
-                            'erro': f'Erro nos dados: {data_error}'
-                        }
-                    except Exception as send_error:
-                        print(f"[ERROR] Erro no envio: {send_error}")
-                        return {
-                            'sucesso': False,
-                            'erro': f'Erro no envio: {send_error}'
-                        }
-                    
-                    print(f"[DEBUG] Desconectando do servidor")
-                    
-            except smtplib.SMTPConnectError as conn_error:
-                print(f"[ERROR] Falha na conexão: {conn_error}")
-                return {
-                    'sucesso': False,
-                    'erro': f'Falha na conexão SMTP: {conn_error}'
-                }
-            except smtplib.SMTPServerDisconnected as disc_error:
-                print(f"[ERROR] Servidor desconectou: {disc_error}")
-                return {
-                    'sucesso': False,
-                    'erro': f'Servidor desconectou: {disc_error}'
-                }
-            except socket.timeout as timeout_error:
-                print(f"[ERROR] Timeout na conexão: {timeout_error}")
-                return {
-                    'sucesso': False,
-                    'erro': f'Timeout na conexão: {timeout_error}'
-                }
-            except Exception as general_error:
-                print(f"[ERROR] Erro geral: {general_error}")
-                print(f"[ERROR] Tipo do erro: {type(general_error)}")
-                return {
-                    'sucesso': False,
-                    'erro': f'Erro geral: {general_error}'
-                }
-            
-            print(f"[DEBUG] === EMAIL ENVIADO COM SUCESSO ===")
-            
             return {
                 'sucesso': True,
-                'mensagem': f'Email enviado para {destinatario}'
+                'email': {
+                    'remetente': from_header,
+                    'destinatario': destinatario,
+                    'nome_destinatario': nome_destinatario,
+                    'assunto': subject_line,
+                    'corpo_html': html_profissional,
+                    'corpo_texto': texto_profissional
+                }
             }
             
         except Exception as e:
@@ -1164,86 +548,178 @@ class EmailService:
                 'erro': f'Exceção geral: {str(e)}'
             }
             
-    def _gerar_trechos_html(self, trechos_criticos):
-        """Gera HTML para trechos críticos"""
-        if not trechos_criticos:
-            return '<p><em>Nenhum trecho crítico específico identificado no texto.</em></p>'
-        
-        html = '<div style="margin: 15px 0;"><strong>Principais Problemas Identificados:</strong></div>'
+    def _criar_mensagem(self, email: Dict, message_id: str = None) -> MIMEMultipart:
+        """Mensagem MIME (texto + HTML) a partir do email renderizado"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = email['remetente']
+        msg['To'] = email['destinatario']
+        msg['Subject'] = email['assunto']
+        msg['Message-ID'] = message_id or f"<{hash(email['assunto'] + email['destinatario'])}@{self.smtp_server}>"
+        msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+
+        if email.get('corpo_texto'):
+            msg.attach(MIMEText(email['corpo_texto'], 'plain', 'utf-8'))
+        if email.get('corpo_html'):
+            msg.attach(MIMEText(email['corpo_html'], 'html', 'utf-8'))
+
+        return msg
+
+    def _enviar_mensagem(self, msg: MIMEMultipart, destinatario: str) -> Dict:
+        """
+        Envia pela sessão SMTP do processo
+
+        Returns:
+            dict: sucesso/erro; 'definitivo' quando o servidor recusou a mensagem
+            e 'conexao' quando a falha foi da sessão (as próximas também falhariam)
+        """
+        print(f"[DEBUG] === ENVIANDO EMAIL ===")
+
+        # Sessão do processo: DNS, STARTTLS e LOGIN só na primeira mensagem
+        # (ou após o servidor encerrar a conexão)
+        sessao = get_sessao_smtp(self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password)
+
+        try:
+            print(f"[DEBUG] Enviando mensagem")
+            print(f"[DEBUG] De: {self.email_remetente}")
+            print(f"[DEBUG] Para: {destinatario}")
+
+            result = sessao.enviar(msg)
+            print(f"[DEBUG] send_message() concluído")
+            print(f"[DEBUG] Resultado SMTP: {result}")
+            print(f"[DEBUG] Sessão SMTP: {sessao.metricas()}")
+
+            if not result:
+                print(f"[DEBUG] Email aceito pelo servidor sem problemas")
+            else:
+                print(f"[WARNING] Alguns destinatários foram rejeitados: {result}")
+                return {
+                    'sucesso': False,
+                    'erro': f'Destinatários rejeitados: {result}',
+                    'definitivo': True
+                }
+
+        except socket.gaierror as dns_error:
+            print(f"[ERROR] Falha na resolução DNS: {dns_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Falha DNS: {dns_error}',
+                'conexao': True
+            }
+        except smtplib.SMTPAuthenticationError as auth_error:
+            print(f"[ERROR] Falha na autenticação: {auth_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Falha na autenticação SMTP: {auth_error}',
+                'conexao': True
+            }
+        except smtplib.SMTPRecipientsRefused as recip_error:
+            print(f"[ERROR] Destinatário recusado: {recip_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Destinatário recusado: {recip_error}',
+                'definitivo': True
+            }
+        except smtplib.SMTPDataError as data_error:
+            print(f"[ERROR] Erro nos dados do email: {data_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Erro nos dados: {data_error}',
+                # 5xx: o servidor não aceitará esta mensagem; 4xx: temporário
+                'definitivo': data_error.smtp_code >= 500
+            }
+        except smtplib.SMTPConnectError as conn_error:
+            print(f"[ERROR] Falha na conexão: {conn_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Falha na conexão SMTP: {conn_error}',
+                'conexao': True
+            }
+        except smtplib.SMTPServerDisconnected as disc_error:
+            print(f"[ERROR] Servidor desconectou: {disc_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Servidor desconectou: {disc_error}',
+                'conexao': True
+            }
+        except socket.timeout as timeout_error:
+            print(f"[ERROR] Timeout na conexão: {timeout_error}")
+            return {
+                'sucesso': False,
+                'erro': f'Timeout na conexão: {timeout_error}',
+                'conexao': True
+            }
+        except Exception as general_error:
+            print(f"[ERROR] Erro geral: {general_error}")
+            print(f"[ERROR] Tipo do erro: {type(general_error)}")
+            return {
+                'sucesso': False,
+                'erro': f'Erro geral: {general_error}',
+                'conexao': True
+            }
         
-        for trecho in trechos_criticos:
-            confianca_pct = int(trecho['confianca'] * 100)
-            html += f'''
-            <div class="excerpt">
-                <div class="excerpt-text">"{trecho['texto']}"</div>
-                <div class="excerpt-interpretation">
-                    → IA identificou: {trecho['interpretacao']} (confiança: {confianca_pct}%)
-                </div>
-            </div>
-            '''
+        print(f"[DEBUG] === EMAIL ENVIADO COM SUCESSO ===")
         
-        return html
+        return {
+            'sucesso': True,
+            'mensagem': f'Email enviado para {destinatario}'
+        }
 
-    def _gerar_notas_html(self, notas_baixas):
-        """Gera HTML para notas baixas"""
-        if not notas_baixas:
-            return ''
+    def _enviar_email(self, destinatario: str, nome_destinatario: str, 
+                assunto: str, dados_email: Dict = None, 
+                corpo_html: str = None, corpo_texto: str = None) -> Dict:
+        """Envia na hora, sem a caixa de saída (ex.: testar_envio)"""
         
-        html = '<div style="margin: 15px 0;"><strong>Avaliações Numéricas Críticas:</strong></div>'
+        if not all([self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password, self.email_remetente]):
+            return {
+                'sucesso': False,
+                'erro': 'Configurações SMTP incompletas no .env'
+            }
         
-        for nota in notas_baixas:
-            html += f'''
-            <div class="excerpt">
-                <div class="excerpt-text">Nota atribuída: {nota['nota']}/10</div>
-                <div class="excerpt-interpretation">
-                    → Contexto: {nota['contexto']} - Indica insatisfação significativa
-                </div>
-            </div>
-            '''
+        renderizado = self._renderizar_email(destinatario, nome_destinatario, assunto,
+                                             dados_email, corpo_html, corpo_texto)
+        if not renderizado['sucesso']:
+            return renderizado
         
-        return html
+        return self._enviar_mensagem(self._criar_mensagem(renderizado['email']), destinatario)
 
-    def _gerar_trechos_texto(self, trechos_criticos):
-        """Gera versão texto para trechos críticos"""
-        if not trechos_criticos:
-            return 'Nenhum trecho critico especifico identificado no texto.'
-        
-        texto = ''
-        for i, trecho in enumerate(trechos_criticos, 1):
-            confianca_pct = int(trecho['confianca'] * 100)
-            texto += f'''
-    {i}. "{trecho['texto']}"
-    → IA identificou: {trecho['interpretacao']} (confianca: {confianca_pct}%)
-    '''
-        
-        return texto.strip()        
+    def enviar_emails_outbox(self, emails: List[Dict]) -> Tuple[List[Dict], List[Tuple[Dict, str, bool]]]:
+        """
+        Envia mensagens reservadas da caixa de saída pela sessão reaproveitada
+        Se a sessão falhar (conexão, autenticação), as restantes do lote não são
+        tentadas e voltam com o mesmo erro para o backoff.
 
-    def _registrar_log_email(self, pesquisa_id: int, email_destinatario: str, 
-                           assunto: str, sucesso: bool, erro: Optional[str],
-                           analise_sentimento_id: Optional[int] = None) -> None:
-        """Registra log do envio de email"""
-        
-        try:
-            query = """
-            INSERT INTO log_emails_enviados 
-            (pesquisa_id, analise_sentimento_id, email_destinatario, assunto, enviado_com_sucesso, erro_envio)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            execute_query(query, (
-                pesquisa_id,
-                analise_sentimento_id,
-                email_destinatario,
-                assunto,
-                sucesso,
-                erro
-            ))
-            
-        except Exception as e:
-            print(f"Erro ao registrar log de email: {str(e)}")
+        Returns:
+            tuple: (enviados, [(email, erro, definitiva)]) para concluir_lote
+        """
+        enviados = []
+        falhas = []
+
+        for posicao, email in enumerate(emails):
+            # Message-ID fixo por mensagem: retentativas não viram emails diferentes
+            msg = self._criar_mensagem(email, message_id=f"<outbox.{email['id']}@{self.smtp_server}>")
+            resultado = self._enviar_mensagem(msg, email['destinatario'])
+
+            if resultado['sucesso']:
+                enviados.append(email)
+                continue
+
+            falhas.append((email, resultado['erro'], resultado.get('definitivo', False)))
+            if resultado.get('conexao'):
+                falhas.extend((restante, resultado['erro'], False) for restante in emails[posicao + 1:])
+                break
+
+        return enviados, falhas
+
+
+    def metricas_smtp(self) -> Dict:
+        """Reaproveitamento da sessão SMTP do processo (conexões x mensagens)"""
+        return get_sessao_smtp(self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password).metricas()
 
     def testar_envio(self, email_teste: str = "teste@exemplo.com") -> Dict:
-        """Testa envio de email com dados fictícios"""
+        """
+        Testa envio de email com dados fictícios (envia na hora pelo SMTP_SERVER configurado;
+        para não usar o servidor real, aponte para scripts/servidor_smtp_stub.py)
+        """
         
         dados_teste = {
             'id': 999,
@@ -1264,13 +740,13 @@ class EmailService:
         
         try:
             assunto = self._gerar_assunto(dados_teste, analise_teste)
-            corpo_html = self._gerar_corpo_email(dados_teste, analise_teste)
+            dados_email = self._gerar_corpo_email(dados_teste, analise_teste)
             
             resultado = self._enviar_email(
                 destinatario=email_teste,
                 nome_destinatario="Teste",
                 assunto=f"[TESTE] {assunto}",
-                corpo_html=corpo_html
+                dados_email=dados_email
             )
             
             return resultado
@@ -0,0 +1,214 @@
+# app/services/job_queue.py
+
+import json
+import os
+import random
+import socket
+import traceback
+from typing import Callable, Dict, List, Optional
+from app.utils.database import execute_query, transacao
+
+# Handlers registrados por tipo de job (preenchido via @registrar_handler)
+_HANDLERS: Dict[str, Callable[[Dict], None]] = {}
+
+# Configuração de retry/lease (pode ser ajustada no .env)
+LEASE_SEGUNDOS = int(os.getenv('JOBS_LEASE_SEGUNDOS', 300))
+BACKOFF_BASE_SEGUNDOS = int(os.getenv('JOBS_BACKOFF_BASE_SEGUNDOS', 30))
+BACKOFF_MAX_SEGUNDOS = int(os.getenv('JOBS_BACKOFF_MAX_SEGUNDOS', 3600))
+MAX_TENTATIVAS_PADRAO = int(os.getenv('JOBS_MAX_TENTATIVAS', 5))
+
+
+def registrar_handler(tipo: str):
+    """Decorador que associa uma função ao tipo de job"""
+    def decorator(func):
+        _HANDLERS[tipo] = func
+        return func
+    return decorator
+
+
+def gerar_worker_id() -> str:
+    """Identificador do worker (host + pid) gravado no lease"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enfileirar_job(tipo: str, payload: Dict, max_tentativas: int = None,
+                   atraso_segundos: int = 0) -> Optional[int]:
+    """
+    Insere um job na fila
+
+    Returns:
+        int: ID do job criado ou None se não foi possível enfileirar
+    """
+    try:
+        with transacao() as cursor:
+            return inserir_job(cursor, tipo, payload, max_tentativas, atraso_segundos)
+    except Exception as e:
+        print(f"❌ Erro ao enfileirar job '{tipo}': {str(e)}")
+        return None
+
+
+def inserir_job(cursor, tipo: str, payload: Dict, max_tentativas: int = None,
+                atraso_segundos: int = 0) -> int:
+    """
+    Insere um job dentro de uma transação já aberta e retorna o ID
+    (o job só existe se a transação de quem o criou for confirmada)
+    """
+    cursor.execute("""
+    INSERT INTO fila_jobs (tipo, payload, max_tentativas, disponivel_em)
+    VALUES (%s, %s, %s, DATE_ADD(NOW(), INTERVAL %s SECOND))
+    """, (
+        tipo,
+        json.dumps(payload, ensure_ascii=False, default=str),
+        max_tentativas or MAX_TENTATIVAS_PADRAO,
+        atraso_segundos
+    ))
+    return cursor.lastrowid
+
+
+def reservar_jobs(worker_id: str, limite: int = 1, tipos: List[str] = None,
+                  lease_segundos: int = None) -> List[Dict]:
+    """
+    Reserva (lease) jobs disponíveis para este worker
+
+    Pega jobs pendentes cujo disponivel_em já passou e também jobs em
+    processamento cujo lease expirou (worker morreu no meio). Jobs retomados
+    que já esgotaram as tentativas vão direto para a dead-letter.
+    """
+    lease_segundos = lease_segundos or LEASE_SEGUNDOS
+
+    filtro_tipo = ""
+    params = []
+    if tipos:
+        filtro_tipo = f"AND tipo IN ({', '.join(['%s'] * len(tipos))})"
+        params.extend(tipos)
+    params.append(limite)
+
+    with transacao() as cursor:
+        cursor.execute(f"""
+        SELECT id, tipo, payload, tentativas, max_tentativas
+        FROM fila_jobs
+        WHERE (
+            (status = 'pendente' AND disponivel_em <= NOW())
+            OR (status = 'processando' AND lease_ate < NOW())
+        )
+        {filtro_tipo}
+        ORDER BY disponivel_em ASC
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+        """, params)
+
+        candidatos = cursor.fetchall()
+        if not candidatos:
+            return []
+
+        esgotados = [job for job in candidatos if job['tentativas'] >= job['max_tentativas']]
+        jobs = [job for job in candidatos if job['tentativas'] < job['max_tentativas']]
+
+        if esgotados:
+            ids_esgotados = [job['id'] for job in esgotados]
+            cursor.execute(f"""
+            UPDATE fila_jobs
+            SET status = 'morto', lease_ate = NULL,
+                ultimo_erro = CONCAT(COALESCE(ultimo_erro, ''), '\nLease expirado após última tentativa')
+            WHERE id IN ({', '.join(['%s'] * len(ids_esgotados))})
+            """, ids_esgotados)
+            print(f"☠️ {len(esgotados)} job(s) movido(s) para dead-letter (lease expirado)")
+
+        if jobs:
+            ids = [job['id'] for job in jobs]
+            cursor.execute(f"""
+            UPDATE fila_jobs
+            SET status = 'processando',
+                tentativas = tentativas + 1,
+                lease_ate = DATE_ADD(NOW(), INTERVAL %s SECOND),
+                worker_id = %s
+            WHERE id IN ({', '.join(['%s'] * len(ids))})
+            """, [lease_segundos, worker_id] + ids)
+
+    for job in jobs:
+        job['tentativas'] += 1
+        if isinstance(job['payload'], (str, bytes)):
+            job['payload'] = json.loads(job['payload'])
+
+    return jobs
+
+
+def concluir_job(job_id: int, worker_id: str) -> bool:
+    """
+    Marca job como concluído (só se ainda estiver reservado por este worker)
+
+    Returns:
+        bool: False se o lease expirou (job retomado por outro worker) ou erro de banco
+    """
+    atualizados = execute_query("""
+    UPDATE fila_jobs
+    SET status = 'concluido', lease_ate = NULL, concluido_em = NOW(), ultimo_erro = NULL
+    WHERE id = %s AND worker_id = %s AND status = 'processando'
+    """, (job_id, worker_id))
+    if atualizados == 0:
+        print(f"⚠️ Job {job_id}: lease perdido pelo worker {worker_id} - resultado descartado")
+    return bool(atualizados)
+
+
+def calcular_backoff(tentativa: int) -> int:
+    """Backoff exponencial com jitter (em segundos) para a próxima tentativa"""
+    atraso = min(BACKOFF_MAX_SEGUNDOS, BACKOFF_BASE_SEGUNDOS * (2 ** max(0, tentativa - 1)))
+    return int(atraso / 2 + random.uniform(0, atraso / 2))
+
+
+def falhar_job(job: Dict, erro: str, worker_id: str) -> None:
+    """
+    Reagenda job com backoff ou move para dead-letter se esgotou tentativas
+    (só se ainda estiver reservado por este worker)
+    """
+    if job['tentativas'] >= job['max_tentativas']:
+        atualizados = execute_query("""
+        UPDATE fila_jobs
+        SET status = 'morto', lease_ate = NULL, ultimo_erro = %s
+        WHERE id = %s AND worker_id = %s AND status = 'processando'
+        """, (erro[:5000], job['id'], worker_id))
+        if atualizados:
+            print(f"☠️ Job {job['id']} ({job['tipo']}) movido para dead-letter após {job['tentativas']} tentativa(s)")
+        elif atualizados == 0:
+            print(f"⚠️ Job {job['id']}: lease perdido pelo worker {worker_id} - falha descartada")
+        return
+
+    atraso = calcular_backoff(job['tentativas'])
+    atualizados = execute_query("""
+    UPDATE fila_jobs
+    SET status = 'pendente', lease_ate = NULL, ultimo_erro = %s,
+        disponivel_em = DATE_ADD(NOW(), INTERVAL %s SECOND)
+    WHERE id = %s AND worker_id = %s AND status = 'processando'
+    """, (erro[:5000], atraso, job['id'], worker_id))
+    if atualizados:
+        print(f"🔄 Job {job['id']} ({job['tipo']}) reagendado em {atraso}s (tentativa {job['tentativas']}/{job['max_tentativas']})")
+    elif atualizados == 0:
+        print(f"⚠️ Job {job['id']}: lease perdido pelo worker {worker_id} - falha descartada")
+
+
+def processar_jobs(worker_id: str, limite: int = 1, tipos: List[str] = None) -> int:
+    """
+    Reserva e executa um lote de jobs
+
+    Returns:
+        int: quantidade de jobs reservados (0 = fila vazia)
+    """
+    jobs = reservar_jobs(worker_id, limite=limite, tipos=tipos)
+
+    for job in jobs:
+        handler = _HANDLERS.get(job['tipo'])
+
+        if not handler:
+            falhar_job(job, f"Nenhum handler registrado para o tipo '{job['tipo']}'", worker_id)
+            continue
+
+        try:
+            print(f"⚙️ Executando job {job['id']} ({job['tipo']}) - tentativa {job['tentativas']}")
+            handler(job['payload'])
+            if concluir_job(job['id'], worker_id):
+                print(f"✅ Job {job['id']} concluído")
+        except Exception as e:
+            print(f"❌ Job {job['id']} falhou: {str(e)}")
+            falhar_job(job, f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}", worker_id)
+
+    return len(jobs)
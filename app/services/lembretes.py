@@ -0,0 +1,84 @@
+# app/services/lembretes.py
+"""
+Lembretes automáticos aos agentes sobre pesquisas críticas
+Pesquisa crítica: não respondida, expira em até JANELA_CRITICA_HORAS e sem
+lembrete nas últimas INTERVALO_LEMBRETE_HORAS (mesma regra do botão do gestor).
+Os lembretes vão para a caixa de saída num único INSERT; o worker de emails
+envia em lotes pela sessão SMTP compartilhada.
+"""
+
+import os
+from typing import List, Dict
+from app.utils.database import transacao
+from app.services.email_outbox import inserir_emails
+
+JANELA_CRITICA_HORAS = int(os.getenv('LEMBRETE_JANELA_CRITICA_HORAS', 6))
+INTERVALO_LEMBRETE_HORAS = int(os.getenv('LEMBRETE_INTERVALO_HORAS', 2))
+
+TIPO_LEMBRETE_AUTOMATICO = 'pesquisa_critica_automatico'
+
+
+def buscar_pesquisas_criticas(cursor, limite: int) -> List[Dict]:
+    """
+    Pesquisas críticas ainda sem lembrete recente, das que expiram primeiro
+    (uma consulta: idx_pendentes_expiracao + idx_lembretes_pesquisa)
+
+    Mesmo critério do painel (TIMESTAMPDIFF em horas <= janela), escrito como
+    intervalo em data_expiracao para usar o índice.
+    Trava as pesquisas selecionadas (SKIP LOCKED) até o fim da transação,
+    para dois workers não lembrarem a mesma pesquisa
+    """
+    cursor.execute("""
+    SELECT p.id, p.agente_id, p.nome_cliente, p.codigo_cliente, p.nome_treinamento,
+           u.nome as agente_nome, u.email as agente_email,
+           tp.nome as tipo_produto,
+           TIMESTAMPDIFF(HOUR, NOW(), p.data_expiracao) as horas_restantes
+    FROM pesquisas p
+    JOIN usuarios u ON p.agente_id = u.id
+    JOIN tipos_produtos tp ON p.tipo_produto_id = tp.id
+    WHERE p.respondida = FALSE
+    AND p.data_expiracao > NOW()
+    AND p.data_expiracao < DATE_ADD(NOW(), INTERVAL %s HOUR)
+    AND u.ativo = TRUE
+    AND NOT EXISTS (
+        SELECT 1 FROM log_lembretes l
+        WHERE l.pesquisa_id = p.id
+        AND l.created_at > DATE_SUB(NOW(), INTERVAL %s HOUR)
+    )
+    ORDER BY p.data_expiracao ASC
+    LIMIT %s
+    FOR UPDATE OF p SKIP LOCKED
+    """, (JANELA_CRITICA_HORAS + 1, INTERVALO_LEMBRETE_HORAS, limite))
+    return cursor.fetchall()
+
+
+def enfileirar_lembretes_criticos(email_service, limite: int = 200) -> int:
+    """
+    Enfileira um lembrete por pesquisa crítica e registra em log_lembretes
+    (mesma transação: lembrete na caixa de saída e no log, ou nenhum dos dois)
+
+    Args:
+        email_service: EmailService (monta remetente e corpos do lembrete)
+        limite: pesquisas por chamada (as demais ficam para a próxima)
+
+    Returns:
+        int: lembretes enfileirados
+    """
+    with transacao() as cursor:
+        pesquisas = buscar_pesquisas_criticas(cursor, limite)
+        if not pesquisas:
+            return 0
+
+        inserir_emails(cursor, [
+            email_service.montar_lembrete_agente(pesquisa, None)
+            for pesquisa in pesquisas
+        ])
+
+        cursor.executemany("""
+        INSERT INTO log_lembretes
+        (pesquisa_id, agente_id, gestor_id, tipo_lembrete, enviado_com_sucesso)
+        VALUES (%s, %s, NULL, %s, TRUE)
+        """, [(pesquisa['id'], pesquisa['agente_id'], TIPO_LEMBRETE_AUTOMATICO) for pesquisa in pesquisas])
+
+    print(f"⏰ {len(pesquisas)} lembrete(s) de pesquisa crítica na caixa de saída")
+    return len(pesquisas)
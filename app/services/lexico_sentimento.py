@@ -0,0 +1,223 @@
+# app/services/lexico_sentimento.py
+"""
+Analisador de sentimento local (léxico ponderado em português)
+Roda em microssegundos, sem rede: decide os casos claros e deixa a IA
+apenas para os textos ambíguos.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+# Pesos positivos/negativos (termos já sem acento e em minúsculas)
+LEXICO = {
+    # Positivos
+    'excelente': 2.0, 'otimo': 2.0, 'otima': 2.0, 'perfeito': 2.0, 'perfeita': 2.0,
+    'maravilhoso': 2.0, 'maravilhosa': 2.0, 'fantastico': 2.0, 'fantastica': 2.0,
+    'adorei': 2.0, 'amei': 2.0, 'sensacional': 2.0, 'incrivel': 2.0,
+    'superou expectativas': 2.0, 'superou as expectativas': 2.0, 'valeu a pena': 2.0,
+    'nada a reclamar': 1.5, 'nada a desejar': 1.5, 'nao deixou a desejar': 1.5,
+    'muito bom': 1.5, 'muito boa': 1.5, 'recomendo': 1.5, 'esclarecedor': 1.5,
+    'didatico': 1.5, 'didatica': 1.5, 'parabens': 1.5, 'gostei': 1.5,
+    'bom': 1.0, 'boa': 1.0, 'claro': 1.0, 'clara': 1.0, 'util': 1.0, 'aprendi': 1.0,
+    'objetivo': 1.0, 'objetiva': 1.0, 'pratico': 1.0, 'pratica': 1.0, 'atencioso': 1.0,
+    'atenciosa': 1.0, 'paciente': 1.0, 'satisfeito': 1.5, 'satisfeita': 1.5,
+    'obrigado': 0.5, 'obrigada': 0.5, 'entendi': 1.0, 'consegui': 1.0, 'ajudou': 1.0,
+    'tranquilo': 0.5, 'facil': 1.0, 'rapido': 0.5, 'resolveu': 1.0, 'eficiente': 1.5,
+
+    # Negativos
+    'pessimo': -2.0, 'pessima': -2.0, 'horrivel': -2.0, 'terrivel': -2.0,
+    'perdi tempo': -2.0, 'perda de tempo': -2.0, 'decepcionante': -2.0,
+    'inutil': -2.0, 'lamentavel': -2.0, 'absurdo': -1.5, 'decepcao': -2.0,
+    'ruim': -1.5, 'confuso': -1.5, 'confusa': -1.5, 'mal explicado': -1.5,
+    'mal explicada': -1.5, 'desorganizado': -1.5, 'desorganizada': -1.5,
+    'frustrante': -1.5, 'frustante': -1.5, 'insatisfeito': -1.5, 'insatisfeita': -1.5,
+    'dificil': -1.0, 'perdido': -1.0, 'perdida': -1.0, 'chato': -1.0, 'chata': -1.0,
+    'fraco': -1.0, 'fraca': -1.0, 'lento': -1.0, 'lenta': -1.0, 'demorado': -1.0,
+    'corrido': -1.0, 'superficial': -1.0, 'cansativo': -1.0, 'cansativa': -1.0,
+    'muito tecnico': -1.0, 'muito rapido': -1.5, 'muito lento': -1.5,
+    'problema': -0.5, 'problemas': -0.5, 'erro': -0.5, 'erros': -0.5, 'falta': -0.5,
+}
+
+# Palavras que invertem a polaridade dos termos seguintes -> alcance (em palavras,
+# contando intensificadores). 'sem' só nega o termo seguinte ("sem problemas")
+NEGADORES = {
+    'nao': 3, 'nunca': 2, 'nem': 2, 'nada': 2, 'jamais': 2,
+    'sem': 1, 'nenhum': 2, 'nenhuma': 2,
+}
+
+# Expressões com negador que não negam: ênfase ("sem dúvida excelente",
+# "nunca vi algo tão bom") -> multiplicador do termo seguinte.
+# Desligam a negação até o próximo termo do léxico ou pontuação.
+EXPRESSOES_ENFATICAS = {
+    'sem duvida': 1.3, 'sem duvidas': 1.3, 'sem sombra de duvida': 1.5,
+    'sem sombra de duvidas': 1.5, 'nunca vi': 1.5, 'jamais vi': 1.5,
+    'nada menos que': 1.3, 'nao so': 1.0,
+}
+
+# Confiança máxima quando o sentimento vencedor depende de um termo invertido
+# pela negação: fica abaixo de SENTIMENTO_LEXICO_CONFIANCA_MINIMA e a IA decide
+CONFIANCA_MAXIMA_INVERSAO = 0.7
+
+# Multiplicadores aplicados ao termo imediatamente seguinte
+INTENSIFICADORES = {
+    'muito': 1.5, 'muita': 1.5, 'super': 1.5, 'bastante': 1.3, 'bem': 1.3,
+    'extremamente': 2.0, 'totalmente': 1.5, 'tao': 1.3, 'demais': 1.3,
+    'pouco': 0.5, 'pouca': 0.5, 'meio': 0.6, 'um pouco': 0.5,
+}
+
+_TOKEN = re.compile(r"\w+|[.!?;,]")
+_PONTUACAO = set('.!?;,')
+_MAIOR_TERMO = max(len(termo.split()) for termo in list(LEXICO) + list(INTENSIFICADORES) + list(EXPRESSOES_ENFATICAS))
+
+
+def dobrar_acentos(texto: str) -> str:
+    """Minúsculas e sem acentos ('Não é didático' -> 'nao e didatico')"""
+    decomposto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class AnalisadorLexico:
+    """
+    Pontua um texto somando os pesos do léxico, com:
+    - negação ("não recomendo", "nada confuso") invertendo a polaridade, exceto
+      em expressões enfáticas ("sem dúvida", "nunca vi ... tão")
+    - intensificadores ("muito", "pouco") escalando o termo seguinte
+    - acentuação ignorada ("didatico" == "didático")
+
+    A confiança cresce com a magnitude e com a concordância entre os termos
+    encontrados; textos sem termos ou com sinais opostos ficam com confiança baixa.
+    """
+
+    def __init__(self, lexico: Dict[str, float] = None):
+        self.lexico = lexico or LEXICO
+
+    def _casar_termo(self, tokens: List[str], i: int, dicionario: Dict) -> Tuple[str, int]:
+        """Maior termo do dicionário começando em tokens[i] -> (termo, tamanho)"""
+        for tamanho in range(min(_MAIOR_TERMO, len(tokens) - i), 0, -1):
+            termo = ' '.join(tokens[i:i + tamanho])
+            if termo in dicionario:
+                return termo, tamanho
+        return None, 1
+
+    def analisar(self, texto: str) -> Dict:
+        """
+        Returns:
+            dict: sentimento, confianca, pontuacao, positivas, negativas,
+                  invertido (sentimento depende de termo negado: confiança limitada)
+        """
+        tokens = _TOKEN.findall(dobrar_acentos(texto))
+
+        positivo = 0.0
+        negativo = 0.0
+        positivas = []
+        negativas = []
+
+        # Peso vindo de termos invertidos pela negação, por polaridade resultante
+        invertido_positivo = 0.0
+        invertido_negativo = 0.0
+
+        negacao_restante = 0
+        enfase = False
+        multiplicador = 1.0
+        i = 0
+
+        while i < len(tokens):
+            token = tokens[i]
+
+            if token in _PONTUACAO:
+                negacao_restante = 0
+                enfase = False
+                multiplicador = 1.0
+                i += 1
+                continue
+
+            termo, tamanho = self._casar_termo(tokens, i, self.lexico)
+
+            if termo is None:
+                expressao, tamanho_exp = self._casar_termo(tokens, i, EXPRESSOES_ENFATICAS)
+                if expressao is not None:
+                    negacao_restante = 0
+                    enfase = True
+                    multiplicador = EXPRESSOES_ENFATICAS[expressao]
+                    i += tamanho_exp
+                    continue
+
+                intensificador, tamanho_int = self._casar_termo(tokens, i, INTENSIFICADORES)
+                if intensificador is not None:
+                    multiplicador = max(multiplicador, INTENSIFICADORES[intensificador]) if enfase \
+                        else INTENSIFICADORES[intensificador]
+                    # Intensificadores contam no alcance da negação ("não é tão ... ")
+                    negacao_restante = max(0, negacao_restante - 1)
+                    i += tamanho_int
+                    continue
+
+                if token in NEGADORES and not enfase:
+                    negacao_restante = NEGADORES[token]
+                elif not enfase:
+                    negacao_restante = max(0, negacao_restante - 1)
+                    multiplicador = 1.0
+                i += 1
+                continue
+
+            peso = self.lexico[termo] * multiplicador
+            rotulo = termo
+            invertido = negacao_restante > 0
+            if invertido:
+                # Negar um termo positivo pesa quase como o negativo; negar um negativo atenua
+                peso = -peso * (0.8 if peso > 0 else 0.6)
+                rotulo = f"não {termo}"
+
+            if peso > 0:
+                positivo += peso
+                positivas.append(rotulo)
+                if invertido:
+                    invertido_positivo += peso
+            elif peso < 0:
+                negativo += -peso
+                negativas.append(rotulo)
+                if invertido:
+                    invertido_negativo += -peso
+
+            enfase = False
+            multiplicador = 1.0
+            i += tamanho
+
+        pontuacao = positivo - negativo
+        total = positivo + negativo
+
+        if total == 0:
+            return {
+                'sentimento': 'neutral',
+                'confianca': 0.3,
+                'pontuacao': 0.0,
+                'positivas': positivas,
+                'negativas': negativas,
+                'invertido': False
+            }
+
+        concordancia = abs(pontuacao) / total
+        confianca = min(0.95, 0.4 + 0.3 * concordancia + 0.1 * min(abs(pontuacao), 2.5))
+
+        if abs(pontuacao) < 0.5:
+            # Sinais fracos ou que se anulam: não é um caso claro
+            sentimento = 'neutral'
+            confianca = min(confianca, 0.5)
+        else:
+            sentimento = 'positive' if pontuacao > 0 else 'negative'
+
+        # Negação é a regra que mais erra (ironia, expressões idiomáticas):
+        # se o lado vencedor depende de um termo invertido, não é um caso claro
+        invertido = (sentimento == 'positive' and invertido_positivo > 0) or \
+                    (sentimento == 'negative' and invertido_negativo > 0)
+        if invertido:
+            confianca = min(confianca, CONFIANCA_MAXIMA_INVERSAO)
+
+        return {
+            'sentimento': sentimento,
+            'confianca': round(confianca, 3),
+            'pontuacao': round(pontuacao, 3),
+            'positivas': positivas,
+            'negativas': negativas,
+            'invertido': invertido
+        }
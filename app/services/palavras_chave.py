@@ -0,0 +1,103 @@
+# app/services/palavras_chave.py
+"""
+Palavras-chave usadas na análise de sentimento e nos emails de alerta
+Todas as listas são compiladas em uma única expressão regular: uma passada
+pelo texto devolve todas as ocorrências com suas categorias.
+"""
+
+import re
+from typing import Dict, List, Tuple
+from app.services.lexico_sentimento import dobrar_acentos
+
+# Termos terminados em '*' casam por prefixo ("recomend*" -> recomenda, recomendaria...)
+PALAVRAS_CHAVE = {
+    # Comentários (SentimentAnalyzer._analisar_palavras_chave)
+    'insatisfacao': [
+        'confuso', 'difícil', 'não entendi', 'perdido', 'mal explicado',
+        'desorganizado', 'ruim', 'péssimo', 'horrível', 'terrível',
+        'perdi tempo', 'decepcionante', 'frustante', 'chato',
+        'não recomendo', 'muito técnico', 'muito rápido', 'muito lento',
+        'não consegui', 'não aprendi', 'inútil', 'fraco'
+    ],
+    'satisfacao': [
+        'excelente', 'ótimo', 'muito bom', 'perfeito', 'maravilhoso',
+        'claro', 'útil', 'aprendi', 'recomendo', 'fantástico',
+        'didático', 'objetivo', 'prático', 'esclarecedor',
+        'valeu a pena', 'superou expectativas', 'adorei'
+    ],
+
+    # Perguntas Sim/Não (SentimentAnalyzer._analisar_sim_nao)
+    'pergunta_nao_negativo': [
+        'recomend*', 'satisfeit*', 'atendeu', 'gostou', 'aprovou',
+        'valeu', 'útil', 'clar*', 'entendeu'
+    ],
+    'pergunta_sim_negativo': [
+        'dificuldade*', 'problema*', 'confus*', 'difícil'
+    ],
+
+    # Interpretação dos trechos críticos (EmailService._gerar_corpo_email), em ordem de prioridade
+    'motivo_compreensao': ['confuso', 'difícil', 'complicado', 'não entendi'],
+    'motivo_tempo_perdido': ['perdi tempo', 'inútil', 'não aprendi'],
+    'motivo_qualidade': ['mal explicado', 'ruim', 'péssimo'],
+    'motivo_reputacao': ['não recomendo', 'decepcionante'],
+
+    # Contexto das notas baixas (EmailService._gerar_corpo_email)
+    'contexto_instrutor': ['instrutor*'],
+    'contexto_conteudo': ['conteúdo*'],
+    'contexto_recomendacao': ['recomend*'],
+}
+
+
+class CorrespondentePalavras:
+    """
+    Busca de várias listas de palavras-chave em uma única passada
+
+    Os termos são comparados sem acento e em minúsculas, respeitando limites
+    de palavra ("claro" não casa com "esclarecedor"); termos mais longos têm
+    prioridade ("não recomendo" não conta também como "recomendo").
+    """
+
+    def __init__(self, categorias: Dict[str, List[str]]):
+        self._exatos = {}     # termo sem acento -> [(categoria, termo original)]
+        self._prefixos = {}   # prefixo sem acento -> [(categoria, termo original)]
+
+        for categoria, termos in categorias.items():
+            for termo in termos:
+                if termo.endswith('*'):
+                    destino, chave = self._prefixos, dobrar_acentos(termo[:-1])
+                else:
+                    destino, chave = self._exatos, dobrar_acentos(termo)
+                destino.setdefault(chave, []).append((categoria, termo))
+
+        alternativas = [(termo, re.escape(termo)) for termo in self._exatos]
+        alternativas += [(prefixo, re.escape(prefixo) + r'\w*') for prefixo in self._prefixos]
+        alternativas.sort(key=lambda item: len(item[0]), reverse=True)
+
+        self._padrao = re.compile(r'\b(?:' + '|'.join(padrao for _, padrao in alternativas) + r')\b')
+
+    def encontrar(self, texto: str) -> List[Tuple[str, str]]:
+        """Todas as ocorrências, em ordem: [(categoria, termo configurado)]"""
+        ocorrencias = []
+
+        for encontrado in self._padrao.finditer(dobrar_acentos(texto)):
+            trecho = encontrado.group(0)
+            ocorrencias.extend(self._exatos.get(trecho, []))
+            if ' ' not in trecho:
+                for prefixo, categorias in self._prefixos.items():
+                    if trecho.startswith(prefixo):
+                        ocorrencias.extend(categorias)
+
+        return ocorrencias
+
+    def agrupar(self, texto: str) -> Dict[str, List[str]]:
+        """Ocorrências agrupadas por categoria (sem repetir termos)"""
+        grupos = {}
+        for categoria, termo in self.encontrar(texto):
+            termos = grupos.setdefault(categoria, [])
+            if termo not in termos:
+                termos.append(termo)
+        return grupos
+
+
+# Instância compartilhada (compilada uma vez por processo)
+correspondente_palavras = CorrespondentePalavras(PALAVRAS_CHAVE)
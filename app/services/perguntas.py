@@ -0,0 +1,135 @@
+# app/services/perguntas.py
+"""
+Cache de perguntas e polaridade das perguntas Sim/Não
+A polaridade é inferida uma vez ao salvar a pergunta (ou definida pelo gestor);
+pontuar uma resposta Sim/Não vira uma consulta a dicionário.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from app.utils.database import execute_query
+from app.services.palavras_chave import correspondente_palavras
+
+# positiva: "Sim" é bom (recomendaria?); inversa: "Sim" é ruim (teve dificuldade?)
+POLARIDADES = ('positiva', 'inversa', 'indefinida')
+
+PONTOS_SIM_NAO = {
+    'positiva': {'sim': 1, 'não': -1},
+    'inversa': {'sim': -1, 'não': 1},
+    'indefinida': {'sim': 1, 'não': 0},
+}
+
+
+def inferir_polaridade_sim_nao(texto_pergunta: str) -> str:
+    """Infere a polaridade pelo contexto da pergunta (palavras-chave)"""
+    contexto = correspondente_palavras.agrupar(texto_pergunta or '')
+
+    if 'pergunta_nao_negativo' in contexto:
+        return 'positiva'
+    if 'pergunta_sim_negativo' in contexto:
+        return 'inversa'
+    return 'indefinida'
+
+
+def definir_polaridade(texto_pergunta: str, escolha: Optional[str]) -> Tuple[str, bool]:
+    """
+    Polaridade a gravar na pergunta a partir do formulário do gestor
+
+    Returns:
+        tuple: (polaridade, manual) - 'auto' ou vazio infere pelo texto
+    """
+    if escolha in POLARIDADES:
+        return escolha, True
+    return inferir_polaridade_sim_nao(texto_pergunta), False
+
+
+def pontuar_sim_nao(resposta: str, polaridade: str) -> int:
+    """Pontos de uma resposta Sim/Não dada a polaridade da pergunta"""
+    return PONTOS_SIM_NAO.get(polaridade, PONTOS_SIM_NAO['indefinida']).get((resposta or '').lower(), 0)
+
+
+class PerguntasCache:
+    """
+    Cache em memória das perguntas (com o nome do tipo), por ID
+
+    Perguntas mudam raramente; o TTL garante que edições feitas em outro
+    processo apareçam em pouco tempo, e as rotas do gestor invalidam o
+    cache do próprio processo a cada alteração.
+
+    Um ID desconhecido (vem do formulário público) não recarrega o cache:
+    é buscado sozinho e, se não existir, fica como ausente até o TTL vencer.
+    """
+
+    # Limite de IDs ausentes guardados (IDs arbitrários enviados pelo formulário)
+    MAX_AUSENTES = 10000
+
+    def __init__(self, ttl_segundos: float = None):
+        self.ttl_segundos = ttl_segundos if ttl_segundos is not None else float(
+            os.getenv('PERGUNTAS_CACHE_TTL_SEGUNDOS', 60)
+        )
+        self._perguntas = {}
+        self._ausentes = set()
+        self._carregado_em = None
+        self._lock = threading.Lock()
+
+    _CONSULTA = """
+    SELECT p.*, tp.nome as tipo_nome
+    FROM perguntas p
+    LEFT JOIN tipos_perguntas tp ON p.tipo_pergunta_id = tp.id
+    """
+
+    @staticmethod
+    def _preparar(linha: Dict) -> Dict:
+        if not linha.get('polaridade_sim_nao'):
+            # Pergunta anterior à coluna: inferir sem gravar
+            linha['polaridade_sim_nao'] = inferir_polaridade_sim_nao(linha['texto'])
+        return linha
+
+    def _carregar(self) -> None:
+        """Carrega todas as perguntas em uma consulta (chamar com lock)"""
+        linhas = execute_query(self._CONSULTA, fetch=True)
+        if linhas is None:
+            return
+
+        self._perguntas = {linha['id']: self._preparar(linha) for linha in linhas}
+        self._ausentes = set()
+        self._carregado_em = time.monotonic()
+
+    def _buscar(self, pergunta_id: int) -> None:
+        """Busca só a pergunta que faltou (chamar com lock)"""
+        linhas = execute_query(self._CONSULTA + " WHERE p.id = %s", (pergunta_id,), fetch=True)
+        if linhas is None:
+            return
+
+        if linhas:
+            self._perguntas[pergunta_id] = self._preparar(linhas[0])
+            return
+
+        if len(self._ausentes) >= self.MAX_AUSENTES:
+            self._ausentes.clear()
+        self._ausentes.add(pergunta_id)
+
+    def obter(self, pergunta_id) -> Optional[Dict]:
+        """Pergunta pelo ID (None se não existir)"""
+        try:
+            pergunta_id = int(pergunta_id)
+        except (TypeError, ValueError):
+            return None
+
+        with self._lock:
+            expirado = self._carregado_em is None or time.monotonic() - self._carregado_em > self.ttl_segundos
+            if expirado:
+                self._carregar()
+            elif pergunta_id not in self._perguntas and pergunta_id not in self._ausentes:
+                self._buscar(pergunta_id)
+            return self._perguntas.get(pergunta_id)
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._carregado_em = None
+
+
+# Instância compartilhada do processo
+perguntas_cache = PerguntasCache()
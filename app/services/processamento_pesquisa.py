@@ -0,0 +1,200 @@
+# app/services/processamento_pesquisa.py
+"""
+Processamento assíncrono das respostas de pesquisa (análise de IA e alertas)
+Executado pelo worker da fila de jobs (scripts/worker_jobs.py)
+"""
+
+from typing import Dict, List, Optional
+from app.utils.database import execute_query, transacao
+from app.services.job_queue import registrar_handler, enfileirar_job, inserir_job
+from app.services.telemetria_sentimento import COLUNAS_TELEMETRIA, valores_telemetria
+from app.services.analise_respostas import salvar_detalhes_respostas, carregar_analise
+
+JOB_ANALISE_PESQUISA = 'analise_pesquisa'
+JOB_ALERTA_INSATISFACAO = 'alerta_insatisfacao'
+
+
+def enfileirar_analise_pesquisa(pesquisa_id: int, respostas_processamento: List[Dict]):
+    """Enfileira a análise de IA de uma pesquisa recém-respondida"""
+    return enfileirar_job(JOB_ANALISE_PESQUISA, {
+        'pesquisa_id': pesquisa_id,
+        'respostas': respostas_processamento
+    })
+
+
+# Respostas de texto que são escalas fechadas (não vão à IA como texto livre)
+OPCOES_SATISFACAO = ['Muito Insatisfeito', 'Insatisfeito', 'Neutro', 'Satisfeito', 'Muito Satisfeito']
+
+# Tipos de pergunta (tipos_perguntas.nome) com resposta em texto que a análise trata diretamente
+TIPOS_TEXTO_ANALISADOS = ('texto_livre', 'escala_satisfacao', 'sim_nao')
+
+
+def tipo_resposta_texto(tipo_pergunta: Optional[str], valor: str) -> str:
+    """
+    Tipo de uma resposta em texto para calcular_pontuacao_hibrida
+    Vem do tipo da pergunta; só perguntas de outros tipos (ex.: multipla_escolha)
+    são classificadas pelo valor
+    """
+    if tipo_pergunta in TIPOS_TEXTO_ANALISADOS:
+        return tipo_pergunta
+    if valor in OPCOES_SATISFACAO:
+        return 'escala_satisfacao'
+    if valor.lower() in ['sim', 'não', 'yes', 'no']:
+        return 'sim_nao'
+    return 'texto_livre'
+
+
+def montar_respostas_pesquisas(pesquisa_ids: List[int]) -> Optional[Dict[int, List[Dict]]]:
+    """
+    Busca as respostas gravadas de várias pesquisas (uma consulta, agrupada
+    por pesquisa) no formato de calcular_pontuacao_hibrida
+
+    Returns:
+        dict: {pesquisa_id: [respostas]} (pesquisas sem resposta ficam de fora) ou None em erro
+    """
+    if not pesquisa_ids:
+        return {}
+
+    linhas = execute_query(f"""
+    SELECT r.id, r.pesquisa_id, r.resposta_texto, r.resposta_numerica,
+           p.texto as pergunta, p.polaridade_sim_nao, tp.nome as tipo_nome
+    FROM respostas r
+    JOIN perguntas p ON r.pergunta_id = p.id
+    LEFT JOIN tipos_perguntas tp ON p.tipo_pergunta_id = tp.id
+    WHERE r.pesquisa_id IN ({', '.join(['%s'] * len(pesquisa_ids))})
+    AND (r.resposta_texto IS NOT NULL OR r.resposta_numerica IS NOT NULL)
+    ORDER BY r.pesquisa_id, r.id
+    """, tuple(pesquisa_ids), fetch=True)
+
+    if linhas is None:
+        return None
+
+    por_pesquisa = {}
+    for resposta in linhas:
+        if resposta['resposta_texto']:
+            valor = resposta['resposta_texto']
+            item = {
+                'tipo': tipo_resposta_texto(resposta['tipo_nome'], valor),
+                'valor': valor,
+                'pergunta': resposta['pergunta'],
+                'polaridade': resposta['polaridade_sim_nao']
+            }
+        elif resposta['resposta_numerica']:
+            item = {
+                'tipo': 'escala_numerica',
+                'valor': str(resposta['resposta_numerica']),
+                'pergunta': resposta['pergunta']
+            }
+        else:
+            continue
+
+        item['resposta_id'] = resposta['id']
+        por_pesquisa.setdefault(resposta['pesquisa_id'], []).append(item)
+
+    return por_pesquisa
+
+
+def salvar_analise(pesquisa_id: int, resultado_analise: Dict) -> Optional[int]:
+    """
+    Grava análise (com a telemetria e o detalhe por resposta), marca a pesquisa
+    como processada e, se deve alertar, enfileira o job de alerta, tudo na
+    mesma transação: não há pesquisa processada com o alerta perdido
+
+    Returns:
+        int: ID do job de alerta (None se não deve alertar)
+    """
+    with transacao() as cursor:
+        cursor.execute(f"""
+        INSERT INTO analises_sentimento
+        (pesquisa_id, resposta_consolidada, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao,
+         {', '.join(COLUNAS_TELEMETRIA)})
+        VALUES (%s, %s, %s, %s, %s, %s, {', '.join(['%s'] * len(COLUNAS_TELEMETRIA))})
+        """, (
+            pesquisa_id,
+            resultado_analise.get('texto_consolidado', '')[:1000],
+            resultado_analise['sentimento_geral'],
+            resultado_analise.get('confianca_geral', 0.5),
+            resultado_analise.get('pontuacao_hibrida', 0),
+            resultado_analise.get('motivo_insatisfacao', '')
+        ) + valores_telemetria(resultado_analise))
+        salvar_detalhes_respostas(cursor, pesquisa_id, resultado_analise)
+        # ia_reanalisar: a IA não respondeu e o resultado veio do fallback local
+        cursor.execute(
+            "UPDATE pesquisas SET ia_processada = TRUE, ia_reanalisar = %s WHERE id = %s",
+            (bool(resultado_analise.get('reanalisar', False)), pesquisa_id)
+        )
+        if resultado_analise.get('deve_alertar', False):
+            # Alerta em job separado: falha de SMTP não refaz a análise de IA
+            # (o job relê a análise gravada, inclusive o detalhe por resposta)
+            return inserir_job(cursor, JOB_ALERTA_INSATISFACAO, {'pesquisa_id': pesquisa_id})
+    return None
+
+
+@registrar_handler(JOB_ANALISE_PESQUISA)
+def job_analise_pesquisa(payload: Dict) -> None:
+    """Analisa sentimento da pesquisa, salva o resultado e enfileira alerta se necessário"""
+    from app.services.sentiment_analyzer import get_sentiment_analyzer
+
+    pesquisa_id = payload['pesquisa_id']
+    respostas_processamento = payload['respostas']
+
+    # Idempotência: job pode ser retomado após lease expirado
+    status = execute_query("SELECT ia_processada FROM pesquisas WHERE id = %s", (pesquisa_id,), fetch=True)
+    if status is None:
+        raise ConnectionError("Não foi possível consultar a pesquisa")
+    if not status:
+        print(f"⚠️ Pesquisa {pesquisa_id} não existe mais - job ignorado")
+        return
+    if status[0]['ia_processada']:
+        print(f"⭕ Pesquisa {pesquisa_id} já processada pela IA - job ignorado")
+        return
+
+    print(f"🤖 === INICIANDO ANÁLISE DE IA (pesquisa {pesquisa_id}) ===")
+
+    analyzer = get_sentiment_analyzer()
+    resultado_analise = analyzer.calcular_pontuacao_hibrida(respostas_processamento)
+
+    print(f"🎯 === RESULTADO DA IA ===")
+    print(f"   Sentimento: {resultado_analise['sentimento_geral']}")
+    print(f"   Pontuação: {resultado_analise.get('pontuacao_hibrida', 0)}")
+    print(f"   Confiança: {resultado_analise.get('confianca_geral', 0.5)}")
+    print(f"   Deve alertar: {resultado_analise.get('deve_alertar', False)}")
+    print(f"   Motivo: {resultado_analise.get('motivo_insatisfacao', 'N/A')}")
+    telemetria = resultado_analise.get('telemetria', {})
+    print(f"   Método: {telemetria.get('metodo_analise')} | {telemetria.get('chamadas_api', 0)} chamada(s) | "
+          f"{telemetria.get('latencia_ms', 0)} ms | Fallback: {telemetria.get('motivo_fallback') or 'não'}")
+
+    job_id = salvar_analise(pesquisa_id, resultado_analise)
+    print(f"✅ Análise IA salva e pesquisa {pesquisa_id} marcada como processada")
+
+    if job_id:
+        print(f"🚨 === INSATISFAÇÃO DETECTADA! === (alerta no job {job_id})")
+    else:
+        print(f"✅ Cliente satisfeito - nenhum alerta necessário")
+
+
+@registrar_handler(JOB_ALERTA_INSATISFACAO)
+def job_alerta_insatisfacao(payload: Dict) -> None:
+    """Enfileira o alerta de insatisfação aos gestores na caixa de saída de emails"""
+    from app.services.email_service import EmailService
+
+    # Jobs antigos trazem a análise no payload; os novos leem do banco
+    analise = payload.get('analise') or carregar_analise(payload['pesquisa_id'])
+    if analise is None:
+        raise ConnectionError(f"Análise da pesquisa {payload['pesquisa_id']} não encontrada")
+
+    email_service = EmailService()
+    resultado_email = email_service.enviar_alerta_insatisfacao(
+        payload['pesquisa_id'],
+        analise
+    )
+
+    if resultado_email.get('sucesso', False) and resultado_email.get('emails_enfileirados'):
+        print(f"📧 ✅ {resultado_email['emails_enfileirados']} email(s) na caixa de saída!")
+        if resultado_email.get('alertas_acumulados'):
+            print(f"🗞️ Alerta guardado no resumo de {resultado_email['alertas_acumulados']} gestor(es)")
+    elif resultado_email.get('erro'):
+        # Nada foi enfileirado: deixar a fila tentar novamente com backoff
+        raise RuntimeError(resultado_email['erro'])
+    else:
+        print(f"📧 {resultado_email.get('mensagem', 'Nenhum email enviado')}")
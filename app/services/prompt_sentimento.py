@@ -0,0 +1,130 @@
+# app/services/prompt_sentimento.py
+"""
+Montagem dos prompts de sentimento com orçamento de tokens
+Comentários longos são reduzidos às frases com mais carga de sentimento,
+e as instruções usam um modelo compacto.
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+from app.services.lexico_sentimento import AnalisadorLexico
+from app.services.palavras_chave import correspondente_palavras
+
+# Instruções compactas; os formatos das linhas de texto ('Texto: "..."' e
+# '[G1.T1] "..."') são os mesmos interpretados pelo servidor simulado
+PROMPT_TEXTO = '''Classifique o sentimento do texto (português). Responda só JSON:
+{{"sentimento":"positive|negative|neutral","confianca":0.0-1.0,"resumo":"até 10 palavras"}}
+Texto: "{texto}"'''
+
+PROMPT_LOTE = '''Classifique o sentimento de cada texto (português) e dê um veredito consolidado por grupo.
+Responda só JSON:
+{{"itens":[{{"id":"G1.T1","sentimento":"positive|negative|neutral","confianca":0.0-1.0,"resumo":"até 10 palavras"}}],
+"grupos":[{{"grupo":"G1","sentimento":"positive|negative|neutral","confianca":0.0-1.0,"resumo":"até 10 palavras"}}]}}
+{linhas}'''
+
+_FRASES = re.compile(r'[^.!?;\n]+[.!?;]*')
+_RETICENCIAS = ' (...) '
+
+_lexico = AnalisadorLexico()
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa de tokens (≈ 3,6 caracteres por token em português)"""
+    if not texto:
+        return 0
+    return max(1, round(len(texto) / 3.6))
+
+
+def reduzir_texto(texto: str, orcamento_tokens: int) -> Tuple[str, bool]:
+    """
+    Reduz o texto ao orçamento mantendo as frases com mais carga de sentimento
+    (na ordem original)
+
+    Returns:
+        tuple: (texto reduzido, se houve redução)
+    """
+    if estimar_tokens(texto) <= orcamento_tokens:
+        return texto, False
+
+    frases = [f.strip() for f in _FRASES.findall(texto) if f.strip()]
+
+    # Carga de cada frase: termos do léxico + palavras-chave de (in)satisfação;
+    # empate favorece as primeiras
+    pesos = []
+    for posicao, frase in enumerate(frases):
+        analise = _lexico.analisar(frase)
+        chaves = correspondente_palavras.agrupar(frase)
+        carga = (len(analise['positivas']) + len(analise['negativas'])
+                 + len(chaves.get('satisfacao', [])) + len(chaves.get('insatisfacao', [])))
+        pesos.append((-carga, posicao))
+
+    escolhidas = []
+    vistas = set()
+    usados = 0
+    for _, posicao in sorted(pesos):
+        # Frases repetidas não acrescentam sentimento
+        chave = frases[posicao].lower()
+        if chave in vistas:
+            continue
+        vistas.add(chave)
+        custo = estimar_tokens(frases[posicao]) + (estimar_tokens(_RETICENCIAS) if escolhidas else 0)
+        if usados + custo <= orcamento_tokens:
+            escolhidas.append(posicao)
+            usados += custo
+
+    if escolhidas:
+        return _RETICENCIAS.join(frases[p] for p in sorted(escolhidas)), True
+
+    # Nenhuma frase cabe inteira: cortar a de maior carga
+    maior = frases[sorted(pesos)[0][1]] if frases else texto
+    limite_caracteres = max(1, int(orcamento_tokens * 3.6) - 3)
+    return maior[:limite_caracteres].rstrip() + '...', True
+
+
+class ConstrutorPrompt:
+    """
+    Monta os prompts respeitando o orçamento de tokens
+
+    max_tokens_texto: limite por comentário
+    max_tokens_grupo: limite somado dos comentários de um grupo (pesquisa)
+    """
+
+    def __init__(self, max_tokens_texto: int = None, max_tokens_grupo: int = None):
+        self.max_tokens_texto = max_tokens_texto or int(os.getenv('SENTIMENTO_PROMPT_MAX_TOKENS_TEXTO', 300))
+        self.max_tokens_grupo = max_tokens_grupo or int(os.getenv('SENTIMENTO_PROMPT_MAX_TOKENS_GRUPO', 1200))
+
+    @staticmethod
+    def _escapar(texto: str) -> str:
+        """Uma linha por texto: aspas e quebras de linha não podem quebrar o formato"""
+        return texto.replace('"', "'").replace('\n', ' ')
+
+    def prompt_texto(self, texto: str) -> Tuple[str, bool]:
+        """Prompt de um único texto -> (prompt, se o texto foi reduzido)"""
+        reduzido, cortado = reduzir_texto(texto, self.max_tokens_texto)
+        return PROMPT_TEXTO.format(texto=self._escapar(reduzido)), cortado
+
+    def prompt_lote(self, grupos: List[Tuple[str, List[Tuple[int, str]]]]) -> Tuple[str, Dict[str, int]]:
+        """
+        Prompt de um lote
+
+        Args:
+            grupos: [(rótulo do grupo, [(índice do texto, texto)])]
+
+        Returns:
+            tuple: (prompt, tokens estimados das linhas de cada grupo)
+        """
+        linhas = []
+        tokens_por_grupo = {}
+
+        for rotulo, textos in grupos:
+            # Grupo grande: dividir o orçamento do grupo entre os textos
+            orcamento = min(self.max_tokens_texto, self.max_tokens_grupo // max(1, len(textos)))
+            linhas_grupo = [f"Grupo {rotulo}:"]
+            for t, texto in textos:
+                reduzido, _ = reduzir_texto(texto, max(1, orcamento))
+                linhas_grupo.append(f'[{rotulo}.T{t}] "{self._escapar(reduzido)}"')
+            tokens_por_grupo[rotulo] = estimar_tokens('\n'.join(linhas_grupo))
+            linhas.extend(linhas_grupo)
+
+        return PROMPT_LOTE.format(linhas='\n'.join(linhas)), tokens_por_grupo
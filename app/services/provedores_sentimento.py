@@ -0,0 +1,203 @@
+# app/services/provedores_sentimento.py
+"""
+Provedores de modelo para a análise de sentimento
+
+    zhipu   - GLM via SDK zhipuai (padrão)
+    openai  - qualquer endpoint compatível com /chat/completions da OpenAI
+              (inclui o servidor simulado scripts/servidor_sentimento_stub.py)
+    lexico  - sem rede: tudo decidido pelo léxico local
+
+Escolha via SENTIMENTO_PROVEDOR; timeouts e conexões também vêm do .env.
+"""
+
+import os
+import threading
+from typing import Optional
+import httpx
+from app.services.prompt_sentimento import estimar_tokens
+
+
+class RespostaModelo:
+    """Texto da resposta e tokens consumidos (estimados se a API não informar)"""
+
+    def __init__(self, texto: str, tokens_prompt: Optional[int], tokens_resposta: Optional[int], prompt: str = ''):
+        self.texto = texto
+        self.estimado = tokens_prompt is None or tokens_resposta is None
+        self.tokens_prompt = tokens_prompt if tokens_prompt is not None else estimar_tokens(prompt)
+        self.tokens_resposta = tokens_resposta if tokens_resposta is not None else estimar_tokens(texto)
+
+
+class ProvedorSentimento:
+    """Interface dos provedores: recebem o prompt e devolvem uma RespostaModelo"""
+
+    nome = 'base'
+    # Provedor local: o analisador usa o léxico e nunca chama completar()
+    local = False
+
+    def __init__(self, modelo: str, timeout: float = 30, max_conexoes: int = 10):
+        self.modelo = modelo
+        self.timeout = timeout
+        self.max_conexoes = max_conexoes
+
+    @property
+    def descricao(self) -> str:
+        """Texto gravado em analises_sentimento.modelo_usado"""
+        return f"{self.modelo} ({self.nome})"
+
+    def completar(self, prompt: str, timeout: Optional[float] = None) -> RespostaModelo:
+        raise NotImplementedError
+
+    def _novo_http_client(self, **kwargs) -> httpx.Client:
+        """Pool de conexões keep-alive do provedor"""
+        return httpx.Client(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_conexoes,
+                max_keepalive_connections=self.max_conexoes,
+                keepalive_expiry=60
+            ),
+            **kwargs
+        )
+
+
+class _ClientePorProcesso:
+    """Cria o cliente sob demanda e recria se o processo foi forkado"""
+
+    def __init__(self, fabrica):
+        self._fabrica = fabrica
+        self._cliente = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def obter(self):
+        if self._cliente is None or self._pid != os.getpid():
+            with self._lock:
+                if self._cliente is None or self._pid != os.getpid():
+                    # Conexões herdadas do processo pai não podem ser compartilhadas
+                    self._cliente = self._fabrica()
+                    self._pid = os.getpid()
+        return self._cliente
+
+
+class ProvedorZhipu(ProvedorSentimento):
+    """GLM da ZHIPU AI (SDK oficial, cliente HTTP persistente)"""
+
+    nome = 'ZHIPU AI'
+
+    def __init__(self, api_key: str, modelo: str = 'glm-4-flash', **kwargs):
+        if not api_key:
+            raise ValueError("ZHIPU_API_KEY não encontrado no .env")
+        super().__init__(modelo, **kwargs)
+        self.api_key = api_key
+        self._cliente = _ClientePorProcesso(self._criar_cliente)
+
+    def _criar_cliente(self):
+        import zhipuai
+
+        return zhipuai.ZhipuAI(
+            api_key=self.api_key,
+            http_client=self._novo_http_client(),
+            max_retries=0  # Retentativas controladas pelo SentimentAnalyzer
+        )
+
+    def completar(self, prompt: str, timeout: Optional[float] = None) -> RespostaModelo:
+        response = self._cliente.obter().chat.completions.create(
+            model=self.modelo,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            top_p=0.7,
+            timeout=timeout if timeout is not None else self.timeout
+        )
+
+        uso = getattr(response, 'usage', None)
+        return RespostaModelo(
+            response.choices[0].message.content,
+            getattr(uso, 'prompt_tokens', None),
+            getattr(uso, 'completion_tokens', None),
+            prompt
+        )
+
+
+class ProvedorOpenAICompativel(ProvedorSentimento):
+    """Endpoint HTTP no formato /chat/completions da OpenAI"""
+
+    nome = 'OpenAI compatível'
+
+    def __init__(self, url_base: str, modelo: str, api_key: Optional[str] = None, **kwargs):
+        if not url_base:
+            raise ValueError("SENTIMENTO_OPENAI_URL não encontrado no .env")
+        super().__init__(modelo, **kwargs)
+        self.url_base = url_base.rstrip('/')
+        self.api_key = api_key
+        self._cliente = _ClientePorProcesso(self._criar_cliente)
+
+    def _criar_cliente(self) -> httpx.Client:
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        return self._novo_http_client(base_url=self.url_base, headers=headers)
+
+    def completar(self, prompt: str, timeout: Optional[float] = None) -> RespostaModelo:
+        response = self._cliente.obter().post(
+            '/chat/completions',
+            json={
+                'model': self.modelo,
+                'messages': [{'role': 'user', 'content': prompt}],
+                'temperature': 0.3,
+                'top_p': 0.7
+            },
+            timeout=timeout if timeout is not None else self.timeout
+        )
+        response.raise_for_status()
+
+        dados = response.json()
+        uso = dados.get('usage') or {}
+        return RespostaModelo(
+            dados['choices'][0]['message']['content'],
+            uso.get('prompt_tokens'),
+            uso.get('completion_tokens'),
+            prompt
+        )
+
+
+class ProvedorLexico(ProvedorSentimento):
+    """Sem modelo remoto: o SentimentAnalyzer responde tudo com o léxico local"""
+
+    nome = 'léxico local'
+    local = True
+
+    def __init__(self, **kwargs):
+        super().__init__('lexico-local', **kwargs)
+
+    def completar(self, prompt: str, timeout: Optional[float] = None) -> RespostaModelo:
+        raise RuntimeError("O provedor léxico não atende prompts")
+
+
+def criar_provedor(nome: Optional[str] = None) -> ProvedorSentimento:
+    """Cria o provedor configurado em SENTIMENTO_PROVEDOR (zhipu, openai ou lexico)"""
+
+    nome = (nome or os.getenv('SENTIMENTO_PROVEDOR', 'zhipu')).lower()
+    opcoes = {
+        'timeout': float(os.getenv('SENTIMENTO_TIMEOUT_SEGUNDOS', os.getenv('ZHIPU_TIMEOUT_SEGUNDOS', 30))),
+        'max_conexoes': int(os.getenv('SENTIMENTO_MAX_CONEXOES', os.getenv('ZHIPU_MAX_CONEXOES', 10)))
+    }
+
+    if nome == 'zhipu':
+        return ProvedorZhipu(
+            os.getenv('ZHIPU_API_KEY'),
+            modelo=os.getenv('ZHIPU_MODELO', 'glm-4-flash'),
+            **opcoes
+        )
+
+    if nome == 'openai':
+        return ProvedorOpenAICompativel(
+            os.getenv('SENTIMENTO_OPENAI_URL'),
+            modelo=os.getenv('SENTIMENTO_OPENAI_MODELO', 'gpt-4o-mini'),
+            api_key=os.getenv('SENTIMENTO_OPENAI_API_KEY'),
+            **opcoes
+        )
+
+    if nome == 'lexico':
+        return ProvedorLexico(**opcoes)
+
+    raise ValueError(f"SENTIMENTO_PROVEDOR inválido: {nome} (use zhipu, openai ou lexico)")
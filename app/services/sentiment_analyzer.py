@@ -3,193 +3,637 @@
 import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime
-import zhipuai
+from app.services.sentiment_cache import SentimentCache
+from app.services.provedores_sentimento import ProvedorSentimento, RespostaModelo, criar_provedor
+from app.services.prompt_sentimento import ConstrutorPrompt
+from app.services.telemetria_sentimento import metodo_analise, motivo_fallback
+from app.services.lexico_sentimento import AnalisadorLexico
+from app.services.palavras_chave import correspondente_palavras
+from app.services.perguntas import inferir_polaridade_sim_nao, pontuar_sim_nao
+from app.utils.rate_limit import TokenBucket
+from app.utils.retry import RetryPolicy, Prazo, PrazoEsgotadoError
+from app.utils.circuit_breaker import CircuitBreaker, CircuitoAbertoError
+
+# Versão dos prompts enviados ao modelo; alterar invalida o cache de vereditos
+PROMPT_VERSAO = '3'
+
+# Instância única por processo (ver get_sentiment_analyzer)
+_analyzer_instance = None
+_analyzer_lock = threading.Lock()
+
+
+def get_sentiment_analyzer() -> 'SentimentAnalyzer':
+    """
+    Retorna o analisador compartilhado do processo
+
+    O cliente HTTP do provedor (pool de conexões keep-alive) é criado uma única
+    vez e reaproveitado entre pesquisas, evitando novo handshake TLS por texto.
+    """
+    global _analyzer_instance
+    
+    if _analyzer_instance is None:
+        with _analyzer_lock:
+            if _analyzer_instance is None:
+                _analyzer_instance = SentimentAnalyzer()
+    
+    return _analyzer_instance
+
+
+def _resetar_apos_fork() -> None:
+    """No processo filho, descartar singleton e lock herdados do pai"""
+    global _analyzer_instance, _analyzer_lock
+    _analyzer_instance = None
+    _analyzer_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetar_apos_fork)
+
 
 class SentimentAnalyzer:
     """
-    Serviço de análise de sentimento usando ZHIPU AI GLM-4.5 Flash
+    Serviço de análise de sentimento (ZHIPU AI GLM-4.5 Flash por padrão)
     Implementa sistema híbrido: texto livre + escalas numéricas
+    O modelo vem de um provedor plugável (SENTIMENTO_PROVEDOR)
     """
     
-    def __init__(self):
-        self.api_key = os.getenv('ZHIPU_API_KEY')
-        
-        if not self.api_key:
-            raise ValueError("ZHIPU_API_KEY não encontrado no .env")
+    def __init__(self, provedor: Optional[ProvedorSentimento] = None):
+        # Provedor do modelo (cliente HTTP persistente criado sob demanda)
+        self.provedor = provedor or criar_provedor()
+        self.model_name = self.provedor.modelo
+        self.timeout_api = self.provedor.timeout
+        
+        # Máximo de textos enviados por chamada em analisar_sentimentos_lote
+        self.tamanho_lote = int(os.getenv('SENTIMENTO_LOTE_TAMANHO', 20))
+        
+        # Cache de vereditos por conteúdo (memória + MySQL)
+        self.cache = SentimentCache(self.model_name, PROMPT_VERSAO)
+        
+        # Paralelismo entre lotes e limite de requisições da cota do provedor
+        self.concorrencia = int(os.getenv('SENTIMENTO_CONCORRENCIA', 4))
+        self.limitador = TokenBucket(
+            taxa_por_segundo=float(os.getenv('SENTIMENTO_REQUISICOES_POR_SEGUNDO', 5)),
+            capacidade=float(os.getenv('SENTIMENTO_RAJADA', 5))
+        )
+        
+        # Retentativas com backoff exponencial + jitter, limitadas por um prazo total
+        self.retry = RetryPolicy(
+            max_tentativas=int(os.getenv('SENTIMENTO_MAX_TENTATIVAS', 3)),
+            espera_base=float(os.getenv('SENTIMENTO_RETRY_BASE_SEGUNDOS', 0.5)),
+            espera_maxima=float(os.getenv('SENTIMENTO_RETRY_MAX_SEGUNDOS', 4)),
+            timeout_tentativa=self.timeout_api
+        )
+        self.prazo_segundos = float(os.getenv('SENTIMENTO_PRAZO_SEGUNDOS', 20))
+        
+        # Disjuntor: com o provedor fora do ar, vai direto ao fallback local
+        self.circuito = CircuitBreaker(
+            self.provedor.nome,
+            taxa_falhas=float(os.getenv('SENTIMENTO_CIRCUITO_TAXA_FALHAS', 0.5)),
+            janela=int(os.getenv('SENTIMENTO_CIRCUITO_JANELA', 10)),
+            minimo_chamadas=int(os.getenv('SENTIMENTO_CIRCUITO_MINIMO_CHAMADAS', 5)),
+            cooldown_segundos=float(os.getenv('SENTIMENTO_CIRCUITO_COOLDOWN_SEGUNDOS', 60))
+        )
+        
+        # Léxico local: casos claros são decididos sem chamar a IA
+        self.lexico = AnalisadorLexico()
+        self.lexico_ativo = os.getenv('SENTIMENTO_LEXICO_ATIVO', 'true').lower() == 'true'
+        self.lexico_confianca_minima = float(os.getenv('SENTIMENTO_LEXICO_CONFIANCA_MINIMA', 0.85))
+        self._contadores_lock = threading.Lock()
+        self.textos_decididos_localmente = 0
+        self.textos_enviados_ia = 0
+        
+        # Palavras-chave (listas em app/services/palavras_chave.py, compiladas uma vez)
+        self.palavras = correspondente_palavras
+        
+        # Prompts compactos com orçamento de tokens por texto e por grupo
+        self.prompts = ConstrutorPrompt()
+        self.chamadas_modelo = 0
+        self.tokens_prompt = 0
+        self.tokens_resposta = 0
+
+    def _chamar_modelo(self, prompt: str, timeout: Optional[float] = None) -> RespostaModelo:
+        """Envia o prompt ao modelo e retorna a resposta com os tokens consumidos"""
         
-        self.model_name = "glm-4-flash"
+        resposta = self.provedor.completar(prompt, timeout=timeout)
         
-        # Palavras-chave para detectar insatisfação
-        self.palavras_insatisfacao = [
-            'confuso', 'difícil', 'não entendi', 'perdido', 'mal explicado',
-            'desorganizado', 'ruim', 'péssimo', 'horrível', 'terrível',
-            'perdi tempo', 'decepcionante', 'frustante', 'chato',
-            'não recomendo', 'muito técnico', 'muito rápido', 'muito lento',
-            'não consegui', 'não aprendi', 'inútil', 'fraco'
-        ]
+        with self._contadores_lock:
+            self.chamadas_modelo += 1
+            self.tokens_prompt += resposta.tokens_prompt
+            self.tokens_resposta += resposta.tokens_resposta
         
-        # Palavras-chave para detectar satisfação
-        self.palavras_satisfacao = [
-            'excelente', 'ótimo', 'muito bom', 'perfeito', 'maravilhoso',
-            'claro', 'útil', 'aprendi', 'recomendo', 'fantástico',
-            'didático', 'objetivo', 'prático', 'esclarecedor',
-            'valeu a pena', 'superou expectativas', 'adorei'
-        ]
+        return resposta
 
-    def analisar_sentimento_texto(self, texto: str) -> Dict:
+    def _chamar_modelo_com_retry(self, prompt: str, prazo: Optional[Prazo] = None,
+                                 telemetria: Optional[Dict] = None) -> RespostaModelo:
         """
-        Analisa sentimento de um texto usando ZHIPU AI GLM-4.5 Flash
-        Com retry logic para timeout
+        Chama o modelo seguindo self.retry; propaga o último erro se todas falharem
+        ou PrazoEsgotadoError se o prazo acabar antes
+        
+        telemetria: se informado, acumula 'tentativas', 'chamadas_api' e 'latencia_api_ms'
         """
         
-        max_tentativas = 3
-        delay_entre_tentativas = 5  # segundos
+        if telemetria is None:
+            telemetria = {}
+        for chave in ('tentativas', 'chamadas_api', 'latencia_api_ms'):
+            telemetria.setdefault(chave, 0)
         
-        for tentativa in range(max_tentativas):
+        def tentativa(timeout):
+            telemetria['tentativas'] += 1
+            if not self.circuito.permitir():
+                raise CircuitoAbertoError(f"Circuito do provedor {self.provedor.nome} aberto - usando análise local")
+            
+            # Respeitar a cota do provedor (compartilhada entre threads)
+            if not self.limitador.adquirir(timeout=timeout):
+                self.circuito.cancelar()
+                raise TimeoutError("Cota de requisições do provedor não liberou a tempo")
+            
+            telemetria['chamadas_api'] += 1
+            inicio = time.monotonic()
             try:
-                # Limpar e preparar texto
-                texto_limpo = self._limpar_texto(texto)
-                
-                if not texto_limpo or len(texto_limpo.strip()) < 3:
-                    return {
-                        'sentimento': 'neutral',
-                        'confianca': 0.5,
-                        'detalhes': {'erro': 'Texto muito curto ou vazio'}
-                    }
-                
-                print(f"🤖 Tentativa {tentativa + 1}/{max_tentativas} - Analisando sentimento...")
-                
-                # Chamar ZHIPU AI
-                client = zhipuai.ZhipuAI(api_key=self.api_key)
-                
-                prompt = f"""Você é um analisador de sentimento especializado em português. 
-Analise o seguinte texto e responda APENAS em JSON, sem explicações adicionais.
+                resposta = self._chamar_modelo(prompt, timeout=timeout)
+            except Exception:
+                self.circuito.registrar_falha()
+                raise
+            finally:
+                telemetria['latencia_api_ms'] += round((time.monotonic() - inicio) * 1000)
+            
+            self.circuito.registrar_sucesso()
+            return resposta
+        
+        return self.retry.executar(
+            tentativa,
+            prazo=prazo,
+            descricao='Analisando sentimento',
+            nao_repetir=(CircuitoAbertoError,)
+        )
 
-Texto: "{texto_limpo}"
+    def _novo_prazo(self) -> Prazo:
+        """Prazo padrão de uma análise (SENTIMENTO_PRAZO_SEGUNDOS; 0 = sem prazo)"""
+        return self.retry.prazo(self.prazo_segundos or None)
 
-Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
-{{"sentimento": "positive" ou "negative" ou "neutral", "confianca": valor entre 0.0 e 1.0, "resumo": "breve resumo"}}"""
+    def analisar_sentimento_texto(self, texto: str, prazo: Optional[Prazo] = None) -> Dict:
+        """
+        Analisa sentimento de um texto usando o modelo do provedor configurado
+        Com retentativas até o prazo; esgotado o prazo, usa palavras-chave
+        """
+        
+        # Limpar e preparar texto
+        texto_limpo = self._limpar_texto(texto)
+        
+        if not texto_limpo or len(texto_limpo.strip()) < 3:
+            return self._resultado_texto_curto()
+        
+        # Caso claro para o léxico local: sem chamada de rede
+        resultado_local = self._decidir_localmente(texto_limpo)
+        if resultado_local:
+            self._contar_textos(locais=1)
+            return resultado_local
+        self._contar_textos(ia=1)
+        
+        # Texto idêntico já classificado: sem chamada de rede
+        veredito_cache = self.cache.obter(texto_limpo)
+        if veredito_cache:
+            return self._montar_resultado_ia(dict(veredito_cache, cache=True), texto_limpo)
+        
+        # Texto longo é reduzido às frases com mais carga de sentimento
+        prompt, texto_reduzido = self.prompts.prompt_texto(texto_limpo)
 
-                response = client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    top_p=0.7
-                )
-                
-                resposta_texto = response.choices[0].message.content
-                
-                print(f"✅ Análise de sentimento concluída com sucesso!")
-                
-                return self._processar_resposta_zhipu(resposta_texto, texto_limpo)
-                
-            except Exception as e:
-                print(f"❌ Erro na análise de sentimento (tentativa {tentativa + 1}): {str(e)}")
-                if tentativa < max_tentativas - 1:
-                    print(f"🔄 Tentando novamente em {delay_entre_tentativas}s...")
-                    time.sleep(delay_entre_tentativas)
-                    continue
-                else:
-                    print(f"❌ Todas as tentativas falharam")
-                    # Fallback para análise de palavras-chave
-                    palavras = self._analisar_palavras_chave(texto_limpo)
-                    sentimento, confianca = self._analisar_palavras_simples(palavras)
-                    return {
-                        'sentimento': sentimento,
-                        'confianca': confianca,
-                        'detalhes': {
-                            'metodo': 'fallback_palavras_chave',
-                            'palavras_positivas': palavras['positivas'],
-                            'palavras_negativas': palavras['negativas'],
-                            'erro_api': str(e)
-                        }
-                    }
+        try:
+            # Chamar o modelo (cliente reaproveitado)
+            resposta = self._chamar_modelo_com_retry(prompt, prazo or self._novo_prazo())
+        except Exception as e:
+            # Fallback para análise de palavras-chave
+            return self._resultado_fallback(texto_limpo, **self._extras_erro_api(e))
+        
+        print(f"✅ Análise de sentimento concluída com sucesso!")
+        
+        resultado = self._processar_resposta_zhipu(resposta.texto, texto_limpo)
+        resultado['detalhes'].update({
+            'tokens_prompt': resposta.tokens_prompt,
+            'tokens_resposta': resposta.tokens_resposta,
+            'texto_reduzido': texto_reduzido
+        })
+        return resultado
 
-    def _processar_resposta_zhipu(self, resposta_texto: str, texto: str) -> Dict:
-        """Processa resposta da API ZHIPU AI e adiciona análise de palavras-chave"""
+    def analisar_sentimentos_lote(self, grupos: List[List[str]], 
+                                  tamanho_lote: Optional[int] = None,
+                                  concorrencia: Optional[int] = None,
+                                  prazo: Optional[Prazo] = None) -> List[Dict]:
+        """
+        Classifica vários textos com uma única chamada ao modelo por lote
         
-        try:
-            # Tentar fazer parse JSON
-            resposta_limpa = resposta_texto.strip()
-            
-            # Remover possíveis marcadores markdown
-            if resposta_limpa.startswith('```json'):
-                resposta_limpa = resposta_limpa[7:]
-            if resposta_limpa.startswith('```'):
-                resposta_limpa = resposta_limpa[3:]
-            if resposta_limpa.endswith('```'):
-                resposta_limpa = resposta_limpa[:-3]
+        Args:
+            grupos: Lista de grupos de textos (normalmente um grupo por pesquisa)
+            tamanho_lote: Máximo de textos por chamada (padrão SENTIMENTO_LOTE_TAMANHO)
+            concorrencia: Lotes enviados em paralelo (padrão SENTIMENTO_CONCORRENCIA; 1 = sequencial)
+            prazo: Prazo compartilhado por todos os lotes (padrão: um prazo novo por lote)
             
-            resultado_ia = json.loads(resposta_limpa.strip())
+        Returns:
+            list: Para cada grupo, {'itens': [análise por texto], 'consolidado': análise do grupo,
+                  'telemetria': chamadas, latência, tokens e fallback do grupo}
+        """
+        
+        tamanho_lote = tamanho_lote or self.tamanho_lote
+        grupos_limpos = [[self._limpar_texto(texto) for texto in textos] for textos in grupos]
+        
+        # Montar lotes sem quebrar grupos (grupo maior que o lote vai sozinho)
+        lotes = []
+        lote_atual = []
+        textos_no_lote = 0
+        
+        for indice, textos in enumerate(grupos_limpos):
+            qtd_validos = len([t for t in textos if len(t.strip()) >= 3])
             
-            sentimento_ia = resultado_ia.get('sentimento', 'neutral')
-            confianca_ia = float(resultado_ia.get('confianca', 0.5))
-            resumo_ia = resultado_ia.get('resumo', '')
+            if lote_atual and textos_no_lote + qtd_validos > tamanho_lote:
+                lotes.append(lote_atual)
+                lote_atual = []
+                textos_no_lote = 0
             
-            # Validar sentimento
-            if sentimento_ia not in ['positive', 'negative', 'neutral']:
-                sentimento_ia = 'neutral'
+            lote_atual.append(indice)
+            textos_no_lote += qtd_validos
+        
+        if lote_atual:
+            lotes.append(lote_atual)
+        
+        concorrencia = max(1, concorrencia or self.concorrencia)
+        
+        def analisar(lote):
+            return self._analisar_lote([grupos_limpos[i] for i in lote], prazo or self._novo_prazo())
+        
+        if concorrencia == 1 or len(lotes) <= 1:
+            resultados_lotes = [analisar(lote) for lote in lotes]
+        else:
+            # Lotes são independentes: o resultado é o mesmo do caminho sequencial
+            with ThreadPoolExecutor(max_workers=min(concorrencia, len(lotes))) as executor:
+                resultados_lotes = list(executor.map(analisar, lotes))
+        
+        resultados = [None] * len(grupos)
+        
+        for lote, resultados_lote in zip(lotes, resultados_lotes):
+            for indice, resultado in zip(lote, resultados_lote):
+                resultados[indice] = resultado
+        
+        return resultados
+
+    def _analisar_lote(self, grupos: List[List[str]], prazo: Optional[Prazo] = None) -> List[Dict]:
+        """
+        Envia um lote de grupos de textos (já limpos) em um único prompt
+        Grupos cujos vereditos já estão todos em cache não são enviados
+        """
+        
+        inicio = time.monotonic()
+        validos_por_grupo = [
+            [(t, texto) for t, texto in enumerate(textos, 1) if len(texto.strip()) >= 3]
+            for textos in grupos
+        ]
+        textos_grupo = [" ".join(t for t in textos if t.strip()) for textos in grupos]
+        
+        # === LÉXICO LOCAL (casos claros não vão à IA) ===
+        locais_itens = {}
+        locais_grupos = {}
+        for g, validos in enumerate(validos_por_grupo):
+            for t, texto in validos:
+                resultado_local = self._decidir_localmente(texto)
+                if resultado_local:
+                    locais_itens[(g, t)] = resultado_local
+            if len(validos) > 1:
+                resultado_local = self._decidir_localmente(textos_grupo[g])
+                if resultado_local:
+                    locais_grupos[g] = resultado_local
+        
+        self._contar_textos(
+            locais=len(locais_itens),
+            ia=sum(len(validos) for validos in validos_por_grupo) - len(locais_itens)
+        )
+        
+        # === CONSULTAR CACHE ===
+        cache_itens = self.cache.obter_varios(
+            [texto for g, validos in enumerate(validos_por_grupo)
+             for t, texto in validos if (g, t) not in locais_itens]
+        )
+        cache_grupos = self.cache.obter_varios(
+            [textos_grupo[g] for g, validos in enumerate(validos_por_grupo)
+             if len(validos) > 1 and g not in locais_grupos],
+            tipo='grupo'
+        )
+        
+        vereditos_itens = {}
+        vereditos_grupos = {}
+        pendentes = []
+        
+        for g, validos in enumerate(validos_por_grupo):
+            for t, texto in validos:
+                veredito = cache_itens.get(self.cache.chave(texto))
+                if veredito:
+                    vereditos_itens[(g, t)] = dict(veredito, cache=True)
             
-            # Análise complementar de palavras-chave
-            palavras_encontradas = self._analisar_palavras_chave(texto)
+            if len(validos) > 1:
+                veredito = cache_grupos.get(self.cache.chave(textos_grupo[g], 'grupo'))
+                if veredito:
+                    vereditos_grupos[g] = dict(veredito, cache=True)
             
-            # Combinar resultado da IA com análise de palavras
-            sentimento_final, confianca_final = self._combinar_analises(
-                sentimento_ia, confianca_ia, palavras_encontradas
+            completo = all(
+                (g, t) in vereditos_itens or (g, t) in locais_itens for t, _ in validos
+            ) and (
+                len(validos) <= 1 or g in vereditos_grupos or g in locais_grupos
+            )
+            if not completo:
+                pendentes.append(g)
+        
+        # === CHAMAR O MODELO PARA OS GRUPOS SEM CACHE ===
+        extras_fallback = {}
+        tokens_grupos = {}
+        chamada = {}
+        
+        if pendentes:
+            # Textos longos reduzidos ao orçamento por texto e por grupo
+            prompt, tokens_linhas = self.prompts.prompt_lote(
+                [(f"G{g + 1}", validos_por_grupo[g]) for g in pendentes]
             )
             
-            return {
-                'sentimento': sentimento_final,
-                'confianca': round(confianca_final, 3),
-                'detalhes': {
-                    'api_sentimento': sentimento_ia,
-                    'api_confianca': round(confianca_ia, 3),
-                    'api_resumo': resumo_ia,
-                    'palavras_positivas': palavras_encontradas['positivas'],
-                    'palavras_negativas': palavras_encontradas['negativas'],
-                    'metodo': 'zhipu_ai'
+            resposta = None
+            try:
+                resposta = self._chamar_modelo_com_retry(prompt, prazo, telemetria=chamada)
+                resultado_ia = self._extrair_json(resposta.texto)
+                itens_ia = {
+                    str(item.get('id', '')).strip(): item
+                    for item in resultado_ia.get('itens', []) if isinstance(item, dict)
                 }
-            }
+                grupos_ia = {
+                    str(grupo.get('grupo', '')).strip(): grupo
+                    for grupo in resultado_ia.get('grupos', []) if isinstance(grupo, dict)
+                }
+            except Exception as e:
+                if resposta is None:
+                    extras_fallback = self._extras_erro_api(e)
+                else:
+                    print(f"⚠️ Erro ao fazer parse da resposta IA (lote): {resposta.texto[:200]}")
+                    extras_fallback = {'resposta_bruta': resposta.texto[:100]}
+            else:
+                print(f"✅ Análise em lote concluída ({len(itens_ia)} item(ns) retornado(s))")
+                
+                novos_itens = []
+                novos_grupos = []
+                
+                for g in pendentes:
+                    for t, texto in validos_por_grupo[g]:
+                        veredito = self._validar_item_lote(itens_ia.get(f"G{g + 1}.T{t}"))
+                        if veredito:
+                            vereditos_itens[(g, t)] = veredito
+                            novos_itens.append((texto, veredito))
+                    
+                    if len(validos_por_grupo[g]) > 1:
+                        veredito = self._validar_item_lote(grupos_ia.get(f"G{g + 1}"))
+                        if veredito:
+                            vereditos_grupos[g] = veredito
+                            novos_grupos.append((textos_grupo[g], veredito))
+                
+                self.cache.gravar_varios(novos_itens)
+                self.cache.gravar_varios(novos_grupos, tipo='grupo')
             
-        except json.JSONDecodeError:
-            print(f"⚠️ Erro ao fazer parse da resposta IA: {resposta_texto}")
-            # Fallback para análise de palavras-chave
-            palavras = self._analisar_palavras_chave(texto)
-            sentimento, confianca = self._analisar_palavras_simples(palavras)
+            if resposta is not None:
+                # Tokens da chamada rateados pelo tamanho de cada grupo no prompt
+                total_linhas = sum(tokens_linhas.values()) or 1
+                for g in pendentes:
+                    fracao = tokens_linhas[f"G{g + 1}"] / total_linhas
+                    tokens_grupos[g] = {
+                        'prompt': round(resposta.tokens_prompt * fracao),
+                        'resposta': round(resposta.tokens_resposta * fracao)
+                    }
+        
+        # === MONTAR RESULTADOS ===
+        latencia_ms = round((time.monotonic() - inicio) * 1000)
+        resultados = []
+        for g, textos in enumerate(grupos):
+            itens = []
+            for t, texto in enumerate(textos, 1):
+                if len(texto.strip()) < 3:
+                    itens.append(self._resultado_texto_curto())
+                elif (g, t) in locais_itens:
+                    itens.append(locais_itens[(g, t)])
+                else:
+                    itens.append(self._resultado_item_lote(vereditos_itens.get((g, t)), texto, extras_fallback))
             
-            return {
-                'sentimento': sentimento,
-                'confianca': confianca,
-                'detalhes': {
-                    'metodo': 'fallback_palavras_chave',
-                    'palavras_positivas': palavras['positivas'],
-                    'palavras_negativas': palavras['negativas'],
-                    'resposta_bruta': resposta_texto[:100]
-                }
-            }
+            validos = validos_por_grupo[g]
+            if len(textos_grupo[g].strip()) < 3:
+                consolidado = self._resultado_texto_curto()
+            elif len(validos) == 1:
+                # Um único texto: o veredito consolidado é o do próprio texto
+                consolidado = locais_itens.get((g, validos[0][0])) or self._resultado_item_lote(
+                    vereditos_itens.get((g, validos[0][0])), textos_grupo[g], extras_fallback
+                )
+            elif g in locais_grupos:
+                consolidado = locais_grupos[g]
+            else:
+                consolidado = self._resultado_item_lote(vereditos_grupos.get(g), textos_grupo[g], extras_fallback)
+            
+            resultados.append({
+                'itens': itens,
+                'consolidado': consolidado,
+                'telemetria': self._telemetria_grupo(
+                    itens + [consolidado],
+                    chamada if g in pendentes else {},
+                    # Chamadas e retentativas do lote contadas uma vez (no primeiro grupo enviado)
+                    contar_chamadas=bool(pendentes) and g == pendentes[0],
+                    tokens=tokens_grupos.get(g, {}),
+                    latencia_ms=latencia_ms
+                )
+            })
+        
+        return resultados
 
-    def _analisar_palavras_chave(self, texto: str) -> Dict:
-        """Analisa palavras-chave de satisfação/insatisfação no texto"""
+    def _telemetria_grupo(self, resultados: List[Dict], chamada: Dict, contar_chamadas: bool,
+                          tokens: Dict, latencia_ms: int) -> Dict:
+        """Telemetria de um grupo (pesquisa) do lote, no formato de COLUNAS_TELEMETRIA"""
         
-        texto_lower = texto.lower()
+        chamadas_api = chamada.get('chamadas_api', 0) if contar_chamadas else 0
         
-        palavras_positivas = []
-        palavras_negativas = []
+        return {
+            'modelo_usado': self.provedor.descricao,
+            'provedor': self.provedor.nome,
+            'prompt_versao': PROMPT_VERSAO,
+            'metodo_analise': metodo_analise(resultados, chamada.get('chamadas_api', 0)),
+            'chamadas_api': chamadas_api,
+            'retentativas': max(0, chamada.get('tentativas', 0) - 1) if contar_chamadas else 0,
+            'latencia_ms': latencia_ms,
+            'latencia_api_ms': chamada.get('latencia_api_ms', 0),
+            'tokens_prompt': tokens.get('prompt', 0),
+            'tokens_resposta': tokens.get('resposta', 0),
+            'cache_hit': any(r.get('detalhes', {}).get('cache') for r in resultados),
+            'motivo_fallback': motivo_fallback(resultados)
+        }
+
+    def _validar_item_lote(self, item_ia: Optional[Dict]) -> Optional[Dict]:
+        """Valida um item retornado pelo lote; None se ausente ou inválido"""
         
-        # Buscar palavras de insatisfação
-        for palavra in self.palavras_insatisfacao:
-            if palavra.lower() in texto_lower:
-                palavras_negativas.append(palavra)
+        if not item_ia:
+            return None
         
-        # Buscar palavras de satisfação
-        for palavra in self.palavras_satisfacao:
-            if palavra.lower() in texto_lower:
-                palavras_positivas.append(palavra)
+        try:
+            return self._validar_veredito(item_ia)
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Item inválido na resposta do lote: {item_ia} ({str(e)})")
+            return None
+
+    def _resultado_item_lote(self, veredito: Optional[Dict], texto: str, extras_fallback: Dict) -> Dict:
+        """Resultado de um item do lote, usando palavras-chave se não houver veredito"""
+        
+        if not veredito:
+            return self._resultado_fallback(
+                texto, **(extras_fallback or {'erro_item': 'Item ausente ou inválido na resposta do lote'})
+            )
+        
+        return self._montar_resultado_ia(veredito, texto)
+
+    def _resultado_texto_curto(self) -> Dict:
+        """Resultado neutro para texto vazio ou curto demais"""
+        return {
+            'sentimento': 'neutral',
+            'confianca': 0.5,
+            'detalhes': {'erro': 'Texto muito curto ou vazio'}
+        }
+
+    def _extras_erro_api(self, erro: Exception) -> Dict:
+        """Detalhes do fallback quando a chamada ao modelo falhou"""
+        
+        extras = {'erro_api': str(erro)}
+        if isinstance(erro, PrazoEsgotadoError):
+            extras['prazo_esgotado'] = True
+        if isinstance(erro, CircuitoAbertoError):
+            extras['circuito_aberto'] = True
+        return extras
+
+    def _decidir_localmente(self, texto: str) -> Optional[Dict]:
+        """Resultado do léxico local se o caso for claro; None para escalar à IA"""
+        
+        local = self.lexico.analisar(texto)
+        
+        # Provedor sem modelo remoto: o léxico decide tudo
+        if self.provedor.local:
+            return self._resultado_lexico(local, 'lexico_local')
+        
+        if not self.lexico_ativo:
+            return None
+        
+        # Sentimento que depende de negação invertida fica com a IA, qualquer que seja o limiar
+        if local['sentimento'] == 'neutral' or local.get('invertido') or \
+                local['confianca'] < self.lexico_confianca_minima:
+            return None
+        
+        return self._resultado_lexico(local, 'lexico_local')
+
+    def _resultado_lexico(self, local: Dict, metodo: str, **extras) -> Dict:
+        """Monta o resultado a partir da análise do léxico local"""
+        
+        detalhes = {
+            'metodo': metodo,
+            'pontuacao_lexico': local['pontuacao'],
+            'palavras_positivas': local['positivas'],
+            'palavras_negativas': local['negativas']
+        }
+        detalhes.update(extras)
+        
+        return {
+            'sentimento': local['sentimento'],
+            'confianca': local['confianca'],
+            'detalhes': detalhes
+        }
+
+    def _contar_textos(self, locais: int = 0, ia: int = 0) -> None:
+        """Contadores de textos decididos pelo léxico x enviados à IA"""
+        with self._contadores_lock:
+            self.textos_decididos_localmente += locais
+            self.textos_enviados_ia += ia
+
+    def _resultado_fallback(self, texto: str, **extras) -> Dict:
+        """Resultado apenas do léxico local (quando a IA não responde)"""
+        
+        return self._resultado_lexico(self.lexico.analisar(texto), 'fallback_lexico', **extras)
+
+    def _extrair_json(self, resposta_texto: str):
+        """Remove marcadores markdown e faz parse do JSON retornado pela IA"""
+        
+        resposta_limpa = resposta_texto.strip()
+        
+        # Remover possíveis marcadores markdown
+        if resposta_limpa.startswith('```json'):
+            resposta_limpa = resposta_limpa[7:]
+        if resposta_limpa.startswith('```'):
+            resposta_limpa = resposta_limpa[3:]
+        if resposta_limpa.endswith('```'):
+            resposta_limpa = resposta_limpa[:-3]
+        
+        return json.loads(resposta_limpa.strip())
+
+    def _validar_veredito(self, resultado_ia: Dict) -> Dict:
+        """Normaliza o veredito da IA (ValueError/TypeError se a confiança for inválida)"""
+        
+        sentimento_ia = resultado_ia.get('sentimento', 'neutral')
+        confianca_ia = min(1.0, max(0.0, float(resultado_ia.get('confianca', 0.5))))
+        
+        # Validar sentimento
+        if sentimento_ia not in ['positive', 'negative', 'neutral']:
+            sentimento_ia = 'neutral'
+        
+        return {
+            'sentimento': sentimento_ia,
+            'confianca': round(confianca_ia, 3),
+            'resumo': str(resultado_ia.get('resumo', '') or '')
+        }
+
+    def _montar_resultado_ia(self, veredito: Dict, texto: str) -> Dict:
+        """Combina o veredito (já validado) da IA com a análise de palavras-chave"""
+        
+        sentimento_ia = veredito['sentimento']
+        confianca_ia = veredito['confianca']
+        
+        # Análise complementar de palavras-chave
+        palavras_encontradas = self._analisar_palavras_chave(texto)
+        
+        # Combinar resultado da IA com análise de palavras
+        sentimento_final, confianca_final = self._combinar_analises(
+            sentimento_ia, confianca_ia, palavras_encontradas
+        )
+        
+        return {
+            'sentimento': sentimento_final,
+            'confianca': round(confianca_final, 3),
+            'detalhes': {
+                'api_sentimento': sentimento_ia,
+                'api_confianca': round(confianca_ia, 3),
+                'api_resumo': veredito.get('resumo', ''),
+                'palavras_positivas': palavras_encontradas['positivas'],
+                'palavras_negativas': palavras_encontradas['negativas'],
+                'metodo': 'ia',
+                'provedor': self.provedor.nome,
+                'cache': veredito.get('cache', False)
+            }
+        }
+
+    def _processar_resposta_zhipu(self, resposta_texto: str, texto: str) -> Dict:
+        """Processa resposta do modelo e adiciona análise de palavras-chave"""
+        
+        try:
+            veredito = self._validar_veredito(self._extrair_json(resposta_texto))
+            
+        except (json.JSONDecodeError, AttributeError, ValueError, TypeError):
+            print(f"⚠️ Erro ao fazer parse da resposta IA: {resposta_texto}")
+            # Fallback para análise de palavras-chave
+            return self._resultado_fallback(texto, resposta_bruta=resposta_texto[:100])
+        
+        self.cache.gravar(texto, veredito)
+        return self._montar_resultado_ia(veredito, texto)
+
+    def _analisar_palavras_chave(self, texto: str) -> Dict:
+        """Analisa palavras-chave de satisfação/insatisfação no texto (uma passada)"""
+        
+        encontradas = self.palavras.agrupar(texto)
+        palavras_positivas = encontradas.get('satisfacao', [])
+        palavras_negativas = encontradas.get('insatisfacao', [])
         
         return {
             'positivas': palavras_positivas,
@@ -197,17 +641,6 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
             'score_palavras': len(palavras_positivas) - len(palavras_negativas)
         }
 
-    def _analisar_palavras_simples(self, palavras: Dict) -> Tuple[str, float]:
-        """Análise simples baseada em palavras-chave"""
-        score = palavras['score_palavras']
-        
-        if score >= 2:
-            return 'positive', 0.8
-        elif score <= -2:
-            return 'negative', 0.8
-        else:
-            return 'neutral', 0.6
-
     def _combinar_analises(self, sentimento_ia: str, confianca_ia: float, 
                           palavras: Dict) -> Tuple[str, float]:
         """Combina resultado da IA com análise de palavras-chave"""
@@ -232,17 +665,55 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
         # Usar resultado da IA por padrão
         return sentimento_ia, confianca_ia
 
-    def calcular_pontuacao_hibrida(self, respostas_dados: List[Dict]) -> Dict:
+    def calcular_pontuacao_hibrida(self, respostas_dados: List[Dict], prazo: Optional[Prazo] = None) -> Dict:
         """
         Calcula pontuação híbrida baseada em todos os tipos de resposta
         
         Args:
             respostas_dados: Lista de dicts com respostas formatadas
+            prazo: Prazo total para as chamadas à IA (padrão SENTIMENTO_PRAZO_SEGUNDOS)
             
         Returns:
             dict: Análise completa com pontuação híbrida
         """
         
+        return self.calcular_pontuacao_hibrida_lote([respostas_dados], prazo=prazo)[0]
+
+    def calcular_pontuacao_hibrida_lote(self, lista_respostas: List[List[Dict]],
+                                        tamanho_lote: Optional[int] = None,
+                                        concorrencia: Optional[int] = None,
+                                        prazo: Optional[Prazo] = None) -> List[Dict]:
+        """
+        Calcula a pontuação híbrida de várias pesquisas, agrupando os textos
+        livres de todas elas em chamadas em lote ao modelo
+        
+        Args:
+            lista_respostas: Uma lista de respostas formatadas por pesquisa
+            tamanho_lote: Máximo de textos por chamada ao modelo
+            concorrencia: Chamadas ao modelo em paralelo
+            prazo: Prazo compartilhado pelas chamadas (padrão: um prazo por lote)
+            
+        Returns:
+            list: Uma análise completa (mesmo formato de calcular_pontuacao_hibrida) por pesquisa
+        """
+        
+        preparos = [self._preparar_respostas(respostas_dados) for respostas_dados in lista_respostas]
+        
+        analises_lote = self.analisar_sentimentos_lote(
+            [preparo['textos'] for preparo in preparos],
+            tamanho_lote=tamanho_lote,
+            concorrencia=concorrencia,
+            prazo=prazo
+        )
+        
+        return [
+            self._finalizar_pontuacao(preparo, analise_lote)
+            for preparo, analise_lote in zip(preparos, analises_lote)
+        ]
+
+    def _preparar_respostas(self, respostas_dados: List[Dict]) -> Dict:
+        """Pontua respostas objetivas e separa os textos livres para a IA"""
+        
         pontos_totais = 0
         textos_para_analise = []
         detalhes_analise = {
@@ -257,28 +728,17 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
             tipo = resposta.get('tipo', 'texto')
             valor = resposta.get('valor', '')
             pergunta = resposta.get('pergunta', '')
+            # Chave de analises_respostas (ausente em chamadas sem resposta gravada)
+            resposta_id = resposta.get('resposta_id')
             
             if tipo == 'texto_livre' and valor and len(valor.strip()) > 3:
-                # Analisar sentimento do texto
-                analise_texto = self.analisar_sentimento_texto(valor)
-                
-                # Converter para pontos
-                if analise_texto['sentimento'] == 'positive':
-                    pontos = 1
-                elif analise_texto['sentimento'] == 'negative':
-                    pontos = -1
-                else:
-                    pontos = 0
-                
-                pontos_totais += pontos
+                # Sentimento preenchido depois, pela análise em lote
                 textos_para_analise.append(valor)
                 
                 detalhes_analise['respostas_texto'].append({
+                    'resposta_id': resposta_id,
                     'pergunta': pergunta,
-                    'texto': valor,
-                    'sentimento': analise_texto['sentimento'],
-                    'confianca': analise_texto['confianca'],
-                    'pontos': pontos
+                    'texto': valor
                 })
             
             elif tipo == 'escala_numerica':
@@ -295,6 +755,7 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
                     pontos_totais += pontos
                     
                     detalhes_analise['respostas_numericas'].append({
+                        'resposta_id': resposta_id,
                         'pergunta': pergunta,
                         'nota': nota,
                         'pontos': pontos
@@ -313,30 +774,62 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
                 pontos_totais += pontos
                 
                 detalhes_analise['respostas_satisfacao'].append({
+                    'resposta_id': resposta_id,
                     'pergunta': pergunta,
                     'resposta': valor,
                     'pontos': pontos
                 })
             
             elif tipo == 'sim_nao':
-                # Sim/Não depende do contexto da pergunta
-                pontos = self._analisar_sim_nao(pergunta, valor)
+                # Sim/Não depende da polaridade da pergunta (gravada em perguntas)
+                pontos = self._analisar_sim_nao(pergunta, valor, resposta.get('polaridade'))
                 pontos_totais += pontos
                 
                 detalhes_analise['respostas_sim_nao'].append({
+                    'resposta_id': resposta_id,
                     'pergunta': pergunta,
                     'resposta': valor,
                     'pontos': pontos
                 })
         
-        # Análise consolidada dos textos
-        texto_consolidado = " ".join(textos_para_analise)
+        return {
+            'pontos_totais': pontos_totais,
+            'textos': textos_para_analise,
+            'detalhes': detalhes_analise
+        }
+
+    def _finalizar_pontuacao(self, preparo: Dict, analise_lote: Dict) -> Dict:
+        """Aplica o resultado da IA aos textos livres e monta a análise final"""
+        
+        pontos_totais = preparo['pontos_totais']
+        detalhes_analise = preparo['detalhes']
+        
+        for resposta_texto, analise_texto in zip(detalhes_analise['respostas_texto'], analise_lote['itens']):
+            # Converter para pontos
+            if analise_texto['sentimento'] == 'positive':
+                pontos = 1
+            elif analise_texto['sentimento'] == 'negative':
+                pontos = -1
+            else:
+                pontos = 0
+            
+            pontos_totais += pontos
+            
+            resposta_texto.update({
+                'sentimento': analise_texto['sentimento'],
+                'confianca': analise_texto['confianca'],
+                'pontos': pontos,
+                'metodo': analise_texto.get('detalhes', {}).get('metodo')
+            })
+        
+        # Análise consolidada dos textos (veio na mesma chamada do lote)
+        texto_consolidado = " ".join(preparo['textos'])
         sentimento_geral = 'neutral'
         confianca_geral = 0.5
         motivo_insatisfacao = None
         
         if texto_consolidado.strip():
-            analise_consolidada = self.analisar_sentimento_texto(texto_consolidado)
+            analise_consolidada = analise_lote['consolidado']
             sentimento_geral = analise_consolidada['sentimento']
             confianca_geral = analise_consolidada['confianca']
             
@@ -346,6 +839,12 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
                     detalhes_analise, analise_consolidada
                 )
         
+        # IA indisponível (erro, prazo ou circuito aberto): refazer depois com o modelo
+        reanalisar = any(
+            'erro_api' in analise.get('detalhes', {})
+            for analise in analise_lote['itens'] + [analise_lote['consolidado']]
+        )
+        
         return {
             'sentimento_geral': sentimento_geral,
             'confianca_geral': confianca_geral,
@@ -353,46 +852,15 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
             'texto_consolidado': texto_consolidado,
             'motivo_insatisfacao': motivo_insatisfacao,
             'detalhes_completos': detalhes_analise,
-            'deve_alertar': (sentimento_geral == 'negative' or pontos_totais <= -1)
+            'deve_alertar': (sentimento_geral == 'negative' or pontos_totais <= -1),
+            'reanalisar': reanalisar,
+            'telemetria': analise_lote['telemetria']
         }
 
-    def _analisar_sim_nao(self, pergunta: str, resposta: str) -> int:
-        """Analisa resposta Sim/Não baseada no contexto da pergunta"""
-        
-        pergunta_lower = pergunta.lower()
-        
-        # Perguntas onde "Não" é negativo
-        contextos_negativos = [
-            'recomenda', 'satisfeito', 'atendeu', 'gostou', 'aprovou',
-            'valeu', 'útil', 'claro', 'entendeu'
-        ]
-        
-        # Perguntas onde "Sim" é negativo  
-        contextos_positivos_inversos = [
-            'dificuldade', 'problema', 'confuso', 'difícil'
-        ]
-        
-        if resposta.lower() == 'sim':
-            # Verificar se é contexto inverso
-            for contexto in contextos_positivos_inversos:
-                if contexto in pergunta_lower:
-                    return -1  # "Sim" para problemas = negativo
-            
-            # Por padrão, "Sim" é positivo
-            return 1
-        
-        elif resposta.lower() == 'não':
-            # Verificar se é contexto normal
-            for contexto in contextos_negativos:
-                if contexto in pergunta_lower:
-                    return -1  # "Não" para coisas boas = negativo
-            
-            # Para contextos inversos, "Não" é positivo
-            for contexto in contextos_positivos_inversos:
-                if contexto in pergunta_lower:
-                    return 1  # "Não" para problemas = positivo
+    def _analisar_sim_nao(self, pergunta: str, resposta: str, polaridade: Optional[str] = None) -> int:
+        """Pontua resposta Sim/Não pela polaridade da pergunta (inferida do texto se ausente)"""
         
-        return 0  # Neutro se não conseguir determinar
+        return pontuar_sim_nao(resposta, polaridade or inferir_polaridade_sim_nao(pergunta))
 
     def _gerar_motivo_insatisfacao(self, detalhes: Dict, analise_consolidada: Dict) -> str:
         """Gera resumo do motivo da insatisfação"""
@@ -439,14 +907,39 @@ Responda EXATAMENTE neste formato JSON (sem markdown, sem texto adicional):
         
         return texto.strip()
 
+    def metricas(self) -> Dict:
+        """Métricas do cache de vereditos, do disjuntor da API, do léxico local e de tokens"""
+        
+        with self._contadores_lock:
+            total = self.textos_decididos_localmente + self.textos_enviados_ia
+            lexico = {
+                'decididos_localmente': self.textos_decididos_localmente,
+                'enviados_ia': self.textos_enviados_ia,
+                'taxa_local': round(self.textos_decididos_localmente / total, 3) if total else 0.0
+            }
+            tokens = {
+                'chamadas': self.chamadas_modelo,
+                'prompt': self.tokens_prompt,
+                'resposta': self.tokens_resposta,
+                'prompt_por_chamada': round(self.tokens_prompt / self.chamadas_modelo, 1) if self.chamadas_modelo else 0.0
+            }
+        
+        return {
+            'cache': self.cache.metricas(),
+            'circuito': self.circuito.metricas(),
+            'lexico': lexico,
+            'tokens': tokens
+        }
+
     def testar_conexao(self) -> Dict:
-        """Testa conexão com ZHIPU AI"""
+        """Testa conexão com o provedor configurado"""
         
         try:
             resultado = self.analisar_sentimento_texto("Este é um teste de conexão.")
             return {
                 'sucesso': True,
                 'modelo': self.model_name,
+                'provedor': self.provedor.nome,
                 'resultado_teste': resultado
             }
         except Exception as e:
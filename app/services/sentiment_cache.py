@@ -0,0 +1,191 @@
+# app/services/sentiment_cache.py
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.utils.database import execute_query
+
+
+def normalizar_texto_cache(texto: str) -> str:
+    """Normaliza o texto para que variações triviais caiam na mesma chave"""
+    texto = (texto or '').lower().strip()
+    texto = re.sub(r'\s+', ' ', texto)
+    return texto.strip(' .!?,;:')
+
+
+class SentimentCache:
+    """
+    Cache de vereditos da IA endereçado por conteúdo
+    Chave = hash(modelo + versão do prompt + tipo + texto normalizado)
+
+    Camada 1: LRU em memória do processo
+    Camada 2: tabela cache_sentimento no MySQL (compartilhada entre processos)
+
+    Guarda apenas o veredito bruto da IA (sentimento, confiança, resumo);
+    a combinação com palavras-chave continua sendo feita a cada análise.
+    """
+
+    def __init__(self, modelo: str, versao_prompt: str, tamanho_memoria: int = None,
+                 usar_banco: bool = None):
+        self.modelo = modelo
+        self.versao_prompt = versao_prompt
+        self.tamanho_memoria = tamanho_memoria or int(os.getenv('SENTIMENTO_CACHE_TAMANHO', 5000))
+        if usar_banco is None:
+            usar_banco = os.getenv('SENTIMENTO_CACHE_BANCO', 'true').lower() == 'true'
+        self.usar_banco = usar_banco
+
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits_memoria = 0
+        self.hits_banco = 0
+        self.misses = 0
+        self.gravacoes = 0
+
+    def chave(self, texto: str, tipo: str = 'texto') -> str:
+        """Gera a chave SHA-256 do texto para o modelo/prompt atuais"""
+        base = f"{self.modelo}|{self.versao_prompt}|{tipo}|{normalizar_texto_cache(texto)}"
+        return hashlib.sha256(base.encode('utf-8')).hexdigest()
+
+    def obter(self, texto: str, tipo: str = 'texto') -> Optional[Dict]:
+        """Busca o veredito de um texto (memória, depois banco)"""
+        return self.obter_varios([texto], tipo=tipo).get(self.chave(texto, tipo))
+
+    def obter_varios(self, textos: List[str], tipo: str = 'texto') -> Dict[str, Dict]:
+        """
+        Busca vereditos de vários textos com no máximo uma consulta ao banco
+
+        Returns:
+            dict: chave -> veredito, apenas para os textos encontrados
+        """
+        chaves = list(dict.fromkeys(self.chave(texto, tipo) for texto in textos))
+        encontrados = {}
+        faltantes = []
+
+        with self._lock:
+            for chave in chaves:
+                if chave in self._memoria:
+                    self._memoria.move_to_end(chave)
+                    encontrados[chave] = self._memoria[chave]
+                    self.hits_memoria += 1
+                else:
+                    faltantes.append(chave)
+
+        if faltantes and self.usar_banco:
+            query = f"""
+            SELECT chave, sentimento, confianca, resumo
+            FROM cache_sentimento
+            WHERE chave IN ({', '.join(['%s'] * len(faltantes))})
+            """
+            linhas = execute_query(query, faltantes, fetch=True) or []
+
+            with self._lock:
+                for linha in linhas:
+                    veredito = {
+                        'sentimento': linha['sentimento'],
+                        'confianca': float(linha['confianca']),
+                        'resumo': linha['resumo'] or ''
+                    }
+                    encontrados[linha['chave']] = veredito
+                    self._guardar_memoria(linha['chave'], veredito)
+                    self.hits_banco += 1
+
+        with self._lock:
+            self.misses += len([chave for chave in faltantes if chave not in encontrados])
+
+        return encontrados
+
+    def gravar(self, texto: str, veredito: Dict, tipo: str = 'texto') -> None:
+        """Grava o veredito de um texto nas duas camadas"""
+        self.gravar_varios([(texto, veredito)], tipo=tipo)
+
+    def gravar_varios(self, itens: List[tuple], tipo: str = 'texto') -> None:
+        """Grava vários (texto, veredito) com um único INSERT"""
+        linhas = []
+
+        with self._lock:
+            for texto, veredito in itens:
+                chave = self.chave(texto, tipo)
+                self._guardar_memoria(chave, veredito)
+                linhas.append((chave, veredito))
+            self.gravacoes += len(linhas)
+
+        if not linhas or not self.usar_banco:
+            return
+
+        query = f"""
+        INSERT INTO cache_sentimento (chave, modelo, versao_prompt, sentimento, confianca, resumo)
+        VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(linhas))}
+        ON DUPLICATE KEY UPDATE
+            sentimento = VALUES(sentimento),
+            confianca = VALUES(confianca),
+            resumo = VALUES(resumo)
+        """
+        params = []
+        for chave, veredito in linhas:
+            params.extend([
+                chave, self.modelo, self.versao_prompt,
+                veredito['sentimento'], veredito['confianca'],
+                (veredito.get('resumo') or '')[:500]
+            ])
+
+        execute_query(query, params)
+
+    def _guardar_memoria(self, chave: str, veredito: Dict) -> None:
+        """Insere na LRU (chamar com o lock adquirido)"""
+        self._memoria[chave] = veredito
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.tamanho_memoria:
+            self._memoria.popitem(last=False)
+
+    def invalidar(self) -> None:
+        """
+        Limpa a LRU em memória deste processo
+        A tabela cache_sentimento é compartilhada e não é tocada: limpeza do banco
+        só por purgar_cache_sentimento (scripts/limpar_cache_sentimento.py)
+        """
+        with self._lock:
+            self._memoria.clear()
+
+    def metricas(self) -> Dict:
+        """Contadores de acerto do cache"""
+        with self._lock:
+            total = self.hits_memoria + self.hits_banco + self.misses
+            return {
+                'modelo': self.modelo,
+                'versao_prompt': self.versao_prompt,
+                'itens_memoria': len(self._memoria),
+                'hits_memoria': self.hits_memoria,
+                'hits_banco': self.hits_banco,
+                'misses': self.misses,
+                'gravacoes': self.gravacoes,
+                'taxa_acerto': round((self.hits_memoria + self.hits_banco) / total, 3) if total else 0.0
+            }
+
+
+def purgar_cache_sentimento(dias: int, limite: int = 5000) -> int:
+    """
+    Remove do banco vereditos gravados há mais de `dias` dias, de qualquer
+    modelo ou versão de prompt (DELETE em blocos, para não travar a tabela)
+    Não é chamado pelo cache: rodar por scripts/limpar_cache_sentimento.py
+
+    Returns:
+        int: entradas removidas
+    """
+    total = 0
+    while True:
+        removidas = execute_query("""
+        DELETE FROM cache_sentimento
+        WHERE created_at < NOW() - INTERVAL %s DAY
+        LIMIT %s
+        """, (dias, limite))
+        if not removidas:
+            break
+        total += removidas
+        if removidas < limite:
+            break
+
+    return total
@@ -0,0 +1,227 @@
+# app/services/sessao_smtp.py
+"""
+Sessão SMTP reaproveitada entre envios
+Conecta, faz STARTTLS e LOGIN uma vez e usa a mesma sessão para todos os
+destinatários de um alerta e para os alertas seguintes do processo.
+Se o servidor encerrar a conexão (ociosidade, limite de mensagens), reconecta
+e reenvia de forma transparente.
+"""
+
+import os
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from typing import Dict, Optional
+
+# Sessões do processo por (servidor, porta, usuário) (ver get_sessao_smtp)
+_sessoes = {}
+_sessoes_lock = threading.Lock()
+
+
+def get_sessao_smtp(servidor: str, porta: int, usuario: str, senha: str) -> 'SessaoSMTP':
+    """Retorna a sessão compartilhada do processo para estas credenciais"""
+    chave = (servidor, porta, usuario)
+
+    with _sessoes_lock:
+        sessao = _sessoes.get(chave)
+        if sessao is None or sessao.senha != senha:
+            if sessao is not None:
+                sessao.fechar()
+            sessao = SessaoSMTP(servidor, porta, usuario, senha)
+            _sessoes[chave] = sessao
+
+    return sessao
+
+
+def _resetar_apos_fork() -> None:
+    """No processo filho, descartar as sessões (socket e lock) herdadas do pai"""
+    global _sessoes, _sessoes_lock
+    _sessoes = {}
+    _sessoes_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetar_apos_fork)
+
+
+def _conexao_encerrada(erro: smtplib.SMTPException) -> bool:
+    """
+    Servidor encerrou a sessão antes de aceitar a mensagem: desconexão ou
+    421 (serviço encerrando o canal), que o smtplib entrega como recusa do
+    remetente/destinatários depois de fechar o socket
+    """
+    if isinstance(erro, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(erro, smtplib.SMTPSenderRefused):
+        return erro.smtp_code == 421
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return any(codigo == 421 for codigo, _ in erro.recipients.values())
+    return False
+
+
+class SessaoSMTP:
+    """
+    Conexão SMTP autenticada de longa duração (uso seguro entre threads)
+
+    ocioso_max_segundos: depois desse tempo sem uso, a sessão é testada com NOOP antes do envio
+    max_mensagens: mensagens por conexão antes de renovar (limite comum dos provedores)
+    """
+
+    def __init__(self, servidor: str, porta: int, usuario: str, senha: str,
+                 timeout: float = None, ocioso_max_segundos: float = None, max_mensagens: int = None):
+        self.servidor = servidor
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.timeout = timeout or float(os.getenv('SMTP_TIMEOUT_SEGUNDOS', 30))
+        self.ocioso_max_segundos = ocioso_max_segundos or float(os.getenv('SMTP_SESSAO_OCIOSA_SEGUNDOS', 60))
+        self.max_mensagens = max_mensagens or int(os.getenv('SMTP_SESSAO_MAX_MENSAGENS', 100))
+
+        self._smtp = None
+        self._ip = None
+        self._mensagens_conexao = 0
+        self._ultimo_uso = 0.0
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.conexoes = 0
+        self.reconexoes = 0
+        self.mensagens = 0
+        self.mensagens_reaproveitadas = 0
+
+    def _resolver(self) -> str:
+        """Resolução DNS uma vez por sessão (refeita só após falha de conexão)"""
+        if self._ip is None:
+            self._ip = socket.gethostbyname(self.servidor)
+            print(f"📮 SMTP {self.servidor} -> {self._ip}")
+        return self._ip
+
+    def _conectar(self) -> None:
+        """Abre a conexão (no IP resolvido), STARTTLS e LOGIN (chamar com lock)"""
+        ip = self._resolver()
+
+        context = ssl.create_default_context()
+        # Algumas configurações específicas para provedores brasileiros
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+        smtp = smtplib.SMTP(timeout=self.timeout)
+        # STARTTLS usa _host como nome do servidor (SNI e verificação do certificado):
+        # manter o nome, não o IP, mesmo conectando no endereço já resolvido
+        smtp._host = self.servidor
+        try:
+            codigo, resposta = smtp.connect(ip, self.porta)
+            if codigo != 220:
+                raise smtplib.SMTPConnectError(codigo, resposta)
+            try:
+                smtp.starttls(context=context)
+            except Exception as tls_error:
+                print(f"[WARNING] STARTTLS falhou: {tls_error} - seguindo sem TLS")
+            smtp.login(self.usuario, self.senha)
+        except Exception:
+            self._descartar(smtp)
+            raise
+
+        self._smtp = smtp
+        self._mensagens_conexao = 0
+        self._ultimo_uso = time.monotonic()
+        self.conexoes += 1
+        print(f"🔐 Sessão SMTP aberta ({self.servidor}:{self.porta}, conexão #{self.conexoes})")
+
+    @staticmethod
+    def _descartar(smtp: Optional[smtplib.SMTP]) -> None:
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _fechar_conexao(self) -> None:
+        self._descartar(self._smtp)
+        self._smtp = None
+
+    def _sessao_valida(self) -> bool:
+        """Sessão aberta, abaixo do limite de mensagens e respondendo (NOOP se ociosa)"""
+        if self._smtp is None:
+            return False
+        if self._mensagens_conexao >= self.max_mensagens:
+            self._fechar_conexao()
+            return False
+        if time.monotonic() - self._ultimo_uso > self.ocioso_max_segundos:
+            try:
+                codigo, _ = self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                codigo = None
+            if codigo != 250:
+                self._fechar_conexao()
+                return False
+        return True
+
+    def enviar(self, mensagem) -> Dict:
+        """
+        Envia a mensagem pela sessão, reconectando uma vez se o servidor a encerrou
+
+        Returns:
+            dict: destinatários recusados (vazio se todos foram aceitos), como send_message
+
+        Raises:
+            smtplib.SMTPException, OSError: falhas de conexão, autenticação ou envio
+        """
+        with self._lock:
+            reaproveitada = self._sessao_valida()
+            if not reaproveitada:
+                self._conectar_com_nova_resolucao()
+
+            try:
+                try:
+                    recusados = self._smtp.send_message(mensagem)
+                except smtplib.SMTPException as erro:
+                    if not _conexao_encerrada(erro):
+                        raise
+                    # Conexão derrubada pelo servidor entre envios: nova sessão e reenviar
+                    self._fechar_conexao()
+                    self.reconexoes += 1
+                    reaproveitada = False
+                    self._conectar_com_nova_resolucao()
+                    recusados = self._smtp.send_message(mensagem)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # Recusa da mensagem: a sessão continua válida
+                raise
+            except Exception:
+                # Estado da conexão incerto (timeout, erro de protocolo): não reaproveitar
+                self._fechar_conexao()
+                raise
+
+            self._mensagens_conexao += 1
+            self._ultimo_uso = time.monotonic()
+            self.mensagens += 1
+            if reaproveitada:
+                self.mensagens_reaproveitadas += 1
+
+            return recusados
+
+    def _conectar_com_nova_resolucao(self) -> None:
+        try:
+            self._conectar()
+        except (smtplib.SMTPConnectError, OSError):
+            # Endereço pode ter mudado: resolver de novo na próxima tentativa
+            self._ip = None
+            raise
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._fechar_conexao()
+
+    def metricas(self) -> Dict:
+        """Reaproveitamento da sessão (conexões abertas x mensagens enviadas)"""
+        return {
+            'conexoes': self.conexoes,
+            'reconexoes': self.reconexoes,
+            'mensagens': self.mensagens,
+            'mensagens_reaproveitadas': self.mensagens_reaproveitadas,
+            'taxa_reaproveitamento': round(self.mensagens_reaproveitadas / self.mensagens, 3) if self.mensagens else 0.0,
+            'aberta': self._smtp is not None
+        }
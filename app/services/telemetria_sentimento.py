@@ -0,0 +1,124 @@
+# app/services/telemetria_sentimento.py
+"""
+Telemetria das análises de sentimento
+Cada análise grava em analises_sentimento o provedor, a versão do prompt,
+chamadas/retentativas, latência, tokens, uso do cache e o motivo do fallback.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from app.utils.database import execute_query
+
+# Chaves de resultado['telemetria'] = colunas de analises_sentimento
+COLUNAS_TELEMETRIA = (
+    'modelo_usado', 'provedor', 'prompt_versao', 'metodo_analise',
+    'chamadas_api', 'retentativas', 'latencia_ms', 'latencia_api_ms',
+    'tokens_prompt', 'tokens_resposta', 'cache_hit', 'motivo_fallback'
+)
+
+# Ordem de prioridade ao identificar o motivo do fallback nos detalhes
+_MOTIVOS_FALLBACK = (
+    ('circuito_aberto', 'circuito_aberto'),
+    ('prazo_esgotado', 'prazo_esgotado'),
+    ('erro_api', 'erro_api'),
+    ('resposta_bruta', 'resposta_invalida'),
+    ('erro_item', 'item_ausente'),
+)
+
+
+def motivo_fallback(resultados: List[Dict]) -> Optional[str]:
+    """Motivo do fallback local entre os resultados de uma análise (None se não houve)"""
+    for resultado in resultados:
+        detalhes = resultado.get('detalhes', {})
+        if detalhes.get('metodo') != 'fallback_lexico':
+            continue
+        for chave, motivo in _MOTIVOS_FALLBACK:
+            if chave in detalhes:
+                return motivo
+        return 'desconhecido'
+    return None
+
+
+def metodo_analise(resultados: List[Dict], chamadas_api: int) -> str:
+    """Resumo de como a análise foi decidida: ia, cache, lexico, fallback ou sem_texto"""
+    metodos = [r.get('detalhes', {}).get('metodo') for r in resultados]
+    metodos = [m for m in metodos if m]
+
+    if not metodos:
+        return 'sem_texto'
+    if 'fallback_lexico' in metodos:
+        return 'fallback'
+    if 'ia' not in metodos:
+        return 'lexico'
+    return 'ia' if chamadas_api else 'cache'
+
+
+def valores_telemetria(resultado_analise: Dict) -> tuple:
+    """Valores na ordem de COLUNAS_TELEMETRIA (para INSERT/UPDATE)"""
+    telemetria = resultado_analise.get('telemetria', {})
+    return tuple(telemetria.get(coluna) for coluna in COLUNAS_TELEMETRIA)
+
+
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil p (0-100) por interpolação linear; None se vazio"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = math.floor(posicao)
+    superior = math.ceil(posicao)
+    if inferior == superior:
+        return float(ordenados[inferior])
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def resumo_diario(dias: int = 30) -> Optional[List[Dict]]:
+    """
+    Latência p50/p95, taxa de fallback, cache e tokens por dia
+
+    Returns:
+        list: um dict por dia (mais recente primeiro) ou None em erro de banco
+    """
+    linhas = execute_query("""
+    SELECT DATE(analisado_em) as dia, latencia_ms, latencia_api_ms, chamadas_api,
+           retentativas, tokens_prompt, tokens_resposta, cache_hit, motivo_fallback
+    FROM analises_sentimento
+    WHERE latencia_ms IS NOT NULL AND analisado_em >= %s
+    """, (date.today() - timedelta(days=max(1, dias) - 1),), fetch=True)
+
+    if linhas is None:
+        return None
+
+    por_dia = {}
+    for linha in linhas:
+        por_dia.setdefault(linha['dia'], []).append(linha)
+
+    resumo = []
+    for dia in sorted(por_dia, reverse=True):
+        analises = por_dia[dia]
+        total = len(analises)
+        latencias = [a['latencia_ms'] for a in analises]
+        fallbacks = sum(1 for a in analises if a['motivo_fallback'])
+
+        motivos = {}
+        for a in analises:
+            if a['motivo_fallback']:
+                motivos[a['motivo_fallback']] = motivos.get(a['motivo_fallback'], 0) + 1
+
+        resumo.append({
+            'dia': dia.isoformat(),
+            'analises': total,
+            'latencia_p50_ms': round(percentil(latencias, 50)),
+            'latencia_p95_ms': round(percentil(latencias, 95)),
+            'latencia_api_p95_ms': round(percentil([a['latencia_api_ms'] or 0 for a in analises], 95)),
+            'taxa_fallback': round(fallbacks / total, 3),
+            'motivos_fallback': motivos,
+            'taxa_cache': round(sum(1 for a in analises if a['cache_hit']) / total, 3),
+            'chamadas_api': sum(a['chamadas_api'] or 0 for a in analises),
+            'retentativas': sum(a['retentativas'] or 0 for a in analises),
+            'tokens_prompt': sum(a['tokens_prompt'] or 0 for a in analises),
+            'tokens_resposta': sum(a['tokens_resposta'] or 0 for a in analises)
+        })
+
+    return resumo
@@ -0,0 +1,43 @@
+# app/services/templates_email.py
+"""
+Templates Jinja dos emails (app/templates/emails)
+O ambiente é criado uma vez por processo e cada template é compilado na
+primeira renderização; as seguintes reaproveitam o template compilado.
+Funciona fora do contexto do Flask (workers da fila e da caixa de saída).
+"""
+
+import os
+from datetime import datetime
+from typing import Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+DIRETORIO_TEMPLATES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'emails'
+)
+
+_ambiente = Environment(
+    loader=FileSystemLoader(DIRETORIO_TEMPLATES),
+    # HTML escapado (respostas de clientes entram no corpo); .txt sem escape
+    autoescape=select_autoescape(['html']),
+    undefined=StrictUndefined,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    # Templates não mudam com o processo rodando: sem checar o arquivo a cada uso
+    auto_reload=False
+)
+
+
+def renderizar_email(nome: str, **contexto) -> Tuple[str, str]:
+    """
+    Renderiza as versões HTML e texto de um email
+
+    Args:
+        nome: nome do template sem extensão (ex.: 'alerta_insatisfacao')
+
+    Returns:
+        tuple: (html, texto)
+    """
+    contexto.setdefault('enviado_em', datetime.now())
+    html = _ambiente.get_template(f"{nome}.html").render(contexto)
+    texto = _ambiente.get_template(f"{nome}.txt").render(contexto)
+    return html, texto.strip()
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+
+class CircuitoAbertoError(RuntimeError):
+    """Chamada recusada sem ir à rede: o circuito está aberto"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para um serviço externo
+
+    fechado: chamadas passam; abre se a taxa de falhas nas últimas `janela`
+             chamadas atingir `taxa_falhas` (com pelo menos `minimo_chamadas`)
+    aberto: chamadas recusadas até passar `cooldown_segundos`
+    meio_aberto: uma única chamada de teste; sucesso fecha, falha reabre
+    """
+
+    def __init__(self, nome: str, taxa_falhas: float = 0.5, janela: int = 10,
+                 minimo_chamadas: int = 5, cooldown_segundos: float = 60,
+                 relogio=time.monotonic):
+        self.nome = nome
+        self.taxa_falhas = float(taxa_falhas)
+        self.minimo_chamadas = max(1, int(minimo_chamadas))
+        self.cooldown_segundos = float(cooldown_segundos)
+        self._relogio = relogio
+        self._resultados = deque(maxlen=max(self.minimo_chamadas, int(janela)))
+        self._lock = threading.Lock()
+
+        self.estado = FECHADO
+        self._aberto_em = None
+        self._teste_em_andamento = False
+
+        self.transicoes = {ABERTO: 0, MEIO_ABERTO: 0, FECHADO: 0}
+        self.chamadas_recusadas = 0
+
+    def _mudar_estado(self, estado: str) -> None:
+        """Registra a transição (chamar com lock)"""
+        if estado == self.estado:
+            return
+        print(f"🔌 Circuito {self.nome}: {self.estado} → {estado}")
+        self.estado = estado
+        self.transicoes[estado] += 1
+        if estado == ABERTO:
+            self._aberto_em = self._relogio()
+        if estado == FECHADO:
+            self._resultados.clear()
+
+    def permitir(self) -> bool:
+        """True se a chamada pode ir à rede (no meio-aberto, só a chamada de teste)"""
+        with self._lock:
+            if self.estado == ABERTO and self._relogio() - self._aberto_em >= self.cooldown_segundos:
+                self._mudar_estado(MEIO_ABERTO)
+                self._teste_em_andamento = False
+
+            if self.estado == FECHADO:
+                return True
+
+            if self.estado == MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+
+            self.chamadas_recusadas += 1
+            return False
+
+    def cancelar(self) -> None:
+        """A chamada permitida não chegou a ser feita: libera a vaga de teste"""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            if self.estado == MEIO_ABERTO:
+                self._teste_em_andamento = False
+                self._mudar_estado(FECHADO)
+            else:
+                self._resultados.append(True)
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            if self.estado == MEIO_ABERTO:
+                self._teste_em_andamento = False
+                self._mudar_estado(ABERTO)
+                return
+
+            self._resultados.append(False)
+            if len(self._resultados) >= self.minimo_chamadas:
+                falhas = self._resultados.count(False)
+                if falhas / len(self._resultados) >= self.taxa_falhas:
+                    self._mudar_estado(ABERTO)
+
+    def metricas(self) -> Dict:
+        """Estado atual e contadores de transição"""
+        with self._lock:
+            return {
+                'nome': self.nome,
+                'estado': self.estado,
+                'chamadas_janela': len(self._resultados),
+                'falhas_janela': self._resultados.count(False),
+                'aberturas': self.transicoes[ABERTO],
+                'meio_aberturas': self.transicoes[MEIO_ABERTO],
+                'fechamentos': self.transicoes[FECHADO],
+                'chamadas_recusadas': self.chamadas_recusadas
+            }
@@ -1,5 +1,6 @@
 import pymysql
 import os
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -42,4 +43,21 @@ def execute_query(query, params=None, fetch=False):
         print(f"Erro na query: {e}")
         return None
     finally:
-        connection.close()
\ No newline at end of file
+        connection.close()
+
+@contextmanager
+def transacao():
+    """Abrir transação explícita e devolver um cursor (commit no fim, rollback em erro)"""
+    connection = get_db_connection()
+    if not connection:
+        raise ConnectionError("Não foi possível conectar ao banco de dados")
+    
+    try:
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            yield cursor
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
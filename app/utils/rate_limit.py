@@ -0,0 +1,55 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Limitador de taxa (token bucket) compartilhado entre threads
+
+    taxa_por_segundo: tokens repostos por segundo (cota do provedor)
+    capacidade: rajada máxima permitida
+    """
+
+    def __init__(self, taxa_por_segundo: float, capacidade: float = None,
+                 relogio=time.monotonic, dormir=time.sleep):
+        self.taxa_por_segundo = float(taxa_por_segundo)
+        self.capacidade = float(capacidade or max(1.0, taxa_por_segundo))
+        self._relogio = relogio
+        self._dormir = dormir
+        self._tokens = self.capacidade
+        self._ultimo = relogio()
+        self._lock = threading.Lock()
+
+    def _repor(self) -> None:
+        """Repor tokens proporcionalmente ao tempo decorrido (chamar com lock)"""
+        agora = self._relogio()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa_por_segundo)
+        self._ultimo = agora
+
+    def adquirir(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        Bloqueia até haver tokens disponíveis
+
+        Returns:
+            bool: False se o timeout estourou antes de conseguir os tokens
+        """
+        if self.taxa_por_segundo <= 0:
+            return True
+
+        limite = None if timeout is None else self._relogio() + timeout
+
+        while True:
+            with self._lock:
+                self._repor()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                espera = (tokens - self._tokens) / self.taxa_por_segundo
+
+            if limite is not None:
+                restante = limite - self._relogio()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+
+            self._dormir(espera)
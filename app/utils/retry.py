@@ -0,0 +1,113 @@
+import random
+import time
+from typing import Callable, Optional
+
+
+class PrazoEsgotadoError(TimeoutError):
+    """O prazo total da operação acabou antes de uma tentativa bem-sucedida"""
+    pass
+
+
+class Prazo:
+    """
+    Prazo total de uma operação, propagado do chamador para as chamadas internas
+
+    segundos: orçamento total (None = sem prazo)
+    """
+
+    def __init__(self, segundos: Optional[float] = None, relogio=time.monotonic):
+        self._relogio = relogio
+        self.limite = None if segundos is None else relogio() + float(segundos)
+
+    def restante(self) -> Optional[float]:
+        """Segundos restantes (None se não houver prazo; nunca negativo)"""
+        if self.limite is None:
+            return None
+        return max(0.0, self.limite - self._relogio())
+
+    def esgotado(self) -> bool:
+        restante = self.restante()
+        return restante is not None and restante <= 0
+
+
+class RetryPolicy:
+    """
+    Retentativas com backoff exponencial e jitter, limitadas por um prazo
+
+    A espera antes da tentativa n+1 é sorteada entre 0 e
+    min(espera_maxima, espera_base * fator ** n) ("full jitter"), o que evita
+    que vários workers batam no provedor ao mesmo tempo após uma falha.
+
+    relogio/dormir/aleatorio podem ser substituídos (ex.: relógio falso) para
+    reproduzir a temporização sem esperar de verdade.
+    """
+
+    def __init__(self, max_tentativas: int = 3, espera_base: float = 0.5, fator: float = 2.0,
+                 espera_maxima: float = 4.0, timeout_tentativa: Optional[float] = None,
+                 relogio=time.monotonic, dormir=time.sleep, aleatorio=random.random):
+        self.max_tentativas = max(1, int(max_tentativas))
+        self.espera_base = float(espera_base)
+        self.fator = float(fator)
+        self.espera_maxima = float(espera_maxima)
+        self.timeout_tentativa = timeout_tentativa
+        self.relogio = relogio
+        self._dormir = dormir
+        self._aleatorio = aleatorio
+
+    def prazo(self, segundos: Optional[float] = None) -> Prazo:
+        """Cria um prazo usando o mesmo relógio da política"""
+        return Prazo(segundos, relogio=self.relogio)
+
+    def calcular_espera(self, tentativa: int) -> float:
+        """Espera (s) após a falha da tentativa `tentativa` (começando em 0)"""
+        teto = min(self.espera_maxima, self.espera_base * (self.fator ** tentativa))
+        return self._aleatorio() * teto
+
+    def timeout_para(self, prazo: Optional[Prazo]) -> Optional[float]:
+        """Timeout da próxima tentativa: o menor entre o por-tentativa e o que resta do prazo"""
+        restante = prazo.restante() if prazo else None
+        if restante is None:
+            return self.timeout_tentativa
+        if self.timeout_tentativa is None:
+            return restante
+        return min(self.timeout_tentativa, restante)
+
+    def executar(self, funcao: Callable[[Optional[float]], object], prazo: Optional[Prazo] = None,
+                 descricao: str = 'operação', nao_repetir: tuple = ()):
+        """
+        Executa funcao(timeout) até dar certo, esgotar as tentativas ou o prazo
+        Erros de `nao_repetir` são propagados na hora, sem nova tentativa
+
+        Raises:
+            PrazoEsgotadoError: se o prazo acabou (o último erro fica em __cause__)
+            Exception: o último erro, se todas as tentativas falharam dentro do prazo
+        """
+        ultimo_erro = None
+
+        for tentativa in range(self.max_tentativas):
+            if prazo and prazo.esgotado():
+                raise PrazoEsgotadoError(f"Prazo esgotado em {descricao}") from ultimo_erro
+
+            try:
+                print(f"🤖 Tentativa {tentativa + 1}/{self.max_tentativas} - {descricao}...")
+                return funcao(self.timeout_para(prazo))
+            except (PrazoEsgotadoError,) + tuple(nao_repetir):
+                raise
+            except Exception as e:
+                ultimo_erro = e
+                print(f"❌ Erro em {descricao} (tentativa {tentativa + 1}): {str(e)}")
+
+            if tentativa == self.max_tentativas - 1:
+                break
+
+            espera = self.calcular_espera(tentativa)
+            restante = prazo.restante() if prazo else None
+            if restante is not None and espera >= restante:
+                # Não adianta dormir se não sobrará tempo para tentar de novo
+                raise PrazoEsgotadoError(f"Prazo esgotado em {descricao}") from ultimo_erro
+
+            print(f"🔄 Tentando novamente em {espera:.1f}s...")
+            self._dormir(espera)
+
+        print(f"❌ Todas as tentativas falharam")
+        raise ultimo_erro
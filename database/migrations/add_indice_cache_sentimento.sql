@@ -0,0 +1,8 @@
+-- Índice da limpeza por idade do cache de vereditos (scripts/limpar_cache_sentimento.py)
+USE sistema_pesquisa;
+
+ALTER TABLE cache_sentimento
+ADD INDEX idx_cache_created (created_at);
+
+-- Verificar se foi adicionado
+SHOW INDEX FROM cache_sentimento;
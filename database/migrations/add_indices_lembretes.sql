@@ -0,0 +1,17 @@
+-- Índices da busca de pesquisas críticas para lembretes automáticos
+-- (não respondidas, expirando nas próximas horas, sem lembrete recente)
+USE sistema_pesquisa;
+
+ALTER TABLE pesquisas
+ADD INDEX idx_pendentes_expiracao (respondida, data_expiracao);
+
+ALTER TABLE log_lembretes
+ADD INDEX idx_lembretes_pesquisa (pesquisa_id, created_at);
+
+-- Lembretes automáticos não têm gestor
+ALTER TABLE log_lembretes
+MODIFY COLUMN gestor_id INT NULL COMMENT 'NULL = lembrete automático (scripts/worker_emails.py)';
+
+-- Verificar se foi adicionado
+SHOW INDEX FROM pesquisas;
+SHOW INDEX FROM log_lembretes;
@@ -0,0 +1,11 @@
+-- Reserva (lease) de pesquisas pelo reprocessamento em vários processos/servidores
+USE sistema_pesquisa;
+
+ALTER TABLE pesquisas
+ADD COLUMN ia_lease_ate DATETIME NULL COMMENT 'Enquanto no futuro, a pesquisa pertence a ia_lease_dono (scripts/reprocessar_pesquisas_ia.py)',
+ADD COLUMN ia_lease_dono VARCHAR(100) NULL COMMENT 'host:pid do processo que reservou';
+
+CREATE INDEX idx_ia_lease ON pesquisas (ia_processada, ia_lease_ate);
+
+-- Verificar se foi adicionado
+DESCRIBE pesquisas;
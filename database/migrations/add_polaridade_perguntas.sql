@@ -0,0 +1,11 @@
+-- Polaridade das perguntas Sim/Não (se "Sim" é uma resposta boa ou ruim)
+USE sistema_pesquisa;
+
+ALTER TABLE perguntas
+ADD COLUMN polaridade_sim_nao ENUM('positiva', 'inversa', 'indefinida') NULL
+    COMMENT 'positiva: Sim é bom; inversa: Sim é ruim; NULL: inferida do texto ao carregar' AFTER opcoes,
+ADD COLUMN polaridade_manual BOOLEAN NOT NULL DEFAULT FALSE
+    COMMENT 'TRUE se definida pelo gestor (não é reinferida ao editar o texto)' AFTER polaridade_sim_nao;
+
+-- Verificar se foi adicionado
+DESCRIBE perguntas;
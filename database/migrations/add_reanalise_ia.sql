@@ -0,0 +1,10 @@
+-- Marcar pesquisas analisadas pelo fallback local (IA indisponível / circuito aberto)
+USE sistema_pesquisa;
+
+ALTER TABLE pesquisas
+ADD COLUMN ia_reanalisar BOOLEAN NOT NULL DEFAULT FALSE COMMENT 'Análise feita sem a IA; refazer com scripts/reprocessar_pesquisas_ia.py --reanalisar';
+
+CREATE INDEX idx_ia_reanalisar ON pesquisas (ia_reanalisar);
+
+-- Verificar se foi adicionado
+DESCRIBE pesquisas;
@@ -0,0 +1,16 @@
+-- Retenção da caixa de saída: mensagens enviadas/mortas são removidas após
+-- EMAIL_OUTBOX_RETENCAO_DIAS (scripts/worker_emails.py) e o corpo das senhas
+-- temporárias é apagado assim que a mensagem é finalizada
+USE sistema_pesquisa;
+
+ALTER TABLE email_outbox
+ADD INDEX idx_outbox_finalizados (status, updated_at);
+
+-- Senhas temporárias já finalizadas antes desta versão
+UPDATE email_outbox
+SET corpo_html = NULL, corpo_texto = NULL
+WHERE tipo = 'senha_temporaria'
+AND status IN ('enviado', 'morto');
+
+-- Verificar se foi adicionado
+SHOW INDEX FROM email_outbox;
@@ -0,0 +1,36 @@
+-- Telemetria por análise de sentimento (gravada por processamento_pesquisa.salvar_analise)
+USE sistema_pesquisa;
+
+ALTER TABLE analises_sentimento
+ADD COLUMN analisado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Momento da análise (ou da última reanálise)',
+ADD COLUMN provedor VARCHAR(50) NULL COMMENT 'Provedor do modelo (SENTIMENTO_PROVEDOR)',
+ADD COLUMN prompt_versao VARCHAR(10) NULL COMMENT 'PROMPT_VERSAO do SentimentAnalyzer',
+ADD COLUMN metodo_analise VARCHAR(20) NULL COMMENT 'ia, cache, lexico, fallback ou sem_texto',
+ADD COLUMN chamadas_api INT NULL COMMENT 'Requisições enviadas ao provedor (lote: contadas na primeira pesquisa)',
+ADD COLUMN retentativas INT NULL COMMENT 'Tentativas além da primeira',
+ADD COLUMN latencia_ms INT NULL COMMENT 'Duração total da análise (NULL em análises anteriores à telemetria)',
+ADD COLUMN latencia_api_ms INT NULL COMMENT 'Tempo aguardando o provedor',
+ADD COLUMN cache_hit BOOLEAN NULL COMMENT 'Algum veredito veio do cache_sentimento',
+ADD COLUMN motivo_fallback VARCHAR(30) NULL COMMENT 'circuito_aberto, prazo_esgotado, erro_api, resposta_invalida, item_ausente';
+
+CREATE INDEX idx_analisado_em ON analises_sentimento (analisado_em);
+
+-- Agregado diário (p50/p95 de latência em GET /gestor/telemetria-ia)
+CREATE OR REPLACE VIEW vw_telemetria_ia_diaria AS
+SELECT
+    DATE(analisado_em) as dia,
+    COUNT(*) as analises,
+    ROUND(AVG(latencia_ms)) as latencia_media_ms,
+    MAX(latencia_ms) as latencia_maxima_ms,
+    ROUND(SUM(CASE WHEN motivo_fallback IS NOT NULL THEN 1 ELSE 0 END) / COUNT(*), 3) as taxa_fallback,
+    ROUND(SUM(CASE WHEN cache_hit THEN 1 ELSE 0 END) / COUNT(*), 3) as taxa_cache,
+    SUM(chamadas_api) as chamadas_api,
+    SUM(retentativas) as retentativas,
+    SUM(tokens_prompt) as tokens_prompt,
+    SUM(tokens_resposta) as tokens_resposta
+FROM analises_sentimento
+WHERE latencia_ms IS NOT NULL
+GROUP BY DATE(analisado_em);
+
+-- Verificar se foi adicionado
+DESCRIBE analises_sentimento;
@@ -0,0 +1,9 @@
+-- Tokens consumidos na chamada ao modelo por análise (estimados se o provedor não informar)
+USE sistema_pesquisa;
+
+ALTER TABLE analises_sentimento
+ADD COLUMN tokens_prompt INT NOT NULL DEFAULT 0 COMMENT 'Tokens do prompt atribuídos a esta análise',
+ADD COLUMN tokens_resposta INT NOT NULL DEFAULT 0 COMMENT 'Tokens da resposta atribuídos a esta análise';
+
+-- Verificar se foi adicionado
+DESCRIBE analises_sentimento;
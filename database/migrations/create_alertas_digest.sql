@@ -0,0 +1,28 @@
+-- Resumo (digest) dos alertas de insatisfação
+-- Gestores em modo horário/diário recebem um email por janela com todos os
+-- alertas acumulados; alertas CRÍTICOS continuam saindo na hora
+USE sistema_pesquisa;
+
+ALTER TABLE usuarios
+ADD COLUMN modo_alerta ENUM('imediato', 'horario', 'diario') NOT NULL DEFAULT 'imediato'
+    COMMENT 'Frequência dos alertas de insatisfação (não se aplica aos críticos)';
+
+CREATE TABLE IF NOT EXISTS alertas_digest (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    gestor_id INT NOT NULL,
+    pesquisa_id INT NOT NULL,
+    modo ENUM('horario', 'diario') NOT NULL COMMENT 'Janela do gestor quando o alerta foi acumulado',
+    nivel_alerta VARCHAR(20) NOT NULL,
+    dados JSON NOT NULL COMMENT 'Resumo do alerta exibido no email (cliente, produto, nível, link)',
+    outbox_id BIGINT NULL COMMENT 'Email de resumo que levou o alerta (NULL = aguardando a janela)',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (gestor_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (pesquisa_id) REFERENCES pesquisas(id) ON DELETE CASCADE,
+    UNIQUE KEY uk_digest_gestor_pesquisa (gestor_id, pesquisa_id),
+    INDEX idx_digest_pendentes (outbox_id, modo, created_at),
+    INDEX idx_digest_pesquisa (pesquisa_id)
+);
+
+-- Verificar se foi criada
+DESCRIBE alertas_digest;
@@ -0,0 +1,21 @@
+-- Análise de cada resposta (sentimento/pontos), gravada junto com analises_sentimento
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS analises_respostas (
+    resposta_id INT PRIMARY KEY,
+    pesquisa_id INT NOT NULL,
+    tipo VARCHAR(20) NOT NULL COMMENT 'texto_livre, escala_numerica, escala_satisfacao ou sim_nao',
+    sentimento ENUM('positive', 'negative', 'neutral') NULL COMMENT 'Somente texto livre',
+    confianca DECIMAL(4,3) NULL,
+    pontos TINYINT NOT NULL DEFAULT 0 COMMENT 'Contribuição para pontuacao_hibrida',
+    metodo VARCHAR(20) NULL COMMENT 'ia, lexico_local ou fallback_lexico',
+    modelo_usado VARCHAR(100) NULL,
+    prompt_versao VARCHAR(10) NULL COMMENT 'Outra versão: refazer com reprocessar_pesquisas_ia.py --versao-desatualizada',
+    analisado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (resposta_id) REFERENCES respostas(id) ON DELETE CASCADE,
+    INDEX idx_pesquisa (pesquisa_id),
+    INDEX idx_versao (tipo, prompt_versao)
+);
+
+-- Verificar se foi criada
+DESCRIBE analises_respostas;
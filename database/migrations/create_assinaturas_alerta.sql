@@ -0,0 +1,36 @@
+-- Assinaturas de alertas de insatisfação (gestor x produto x canal x severidade mínima)
+-- Substitui as colunas alerta_time_is_money / alerta_servidor_nuvem / alerta_alterdata
+-- de usuarios: um produto novo não exige mudança de esquema
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS assinaturas_alerta (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    gestor_id INT NOT NULL,
+    tipo_produto_id INT NOT NULL,
+    canal VARCHAR(20) NOT NULL DEFAULT 'email' COMMENT 'Canal de entrega (hoje apenas email)',
+    severidade_minima ENUM('MÉDIO', 'ALTO', 'CRÍTICO') NOT NULL DEFAULT 'MÉDIO'
+        COMMENT 'Alertas abaixo deste nível não são enviados ao gestor',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (gestor_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (tipo_produto_id) REFERENCES tipos_produtos(id) ON DELETE CASCADE,
+    UNIQUE KEY uk_assinatura (gestor_id, tipo_produto_id, canal)
+);
+
+-- Migrar as flags atuais (mesmo mapeamento por nome que o código usava)
+INSERT IGNORE INTO assinaturas_alerta (gestor_id, tipo_produto_id, canal)
+SELECT u.id, tp.id, 'email'
+FROM usuarios u
+JOIN tipos_produtos tp ON (
+    (u.alerta_time_is_money = TRUE AND tp.nome LIKE '%time%')
+    OR (u.alerta_servidor_nuvem = TRUE AND (tp.nome LIKE '%servidor%' OR tp.nome LIKE '%nuvem%'))
+    OR (u.alerta_alterdata = TRUE AND tp.nome LIKE '%alterdata%')
+)
+WHERE u.tipo_usuario = 'gestor';
+
+-- As colunas antigas em usuarios deixam de ser lidas; remover depois de conferir a migração:
+-- ALTER TABLE usuarios DROP COLUMN alerta_time_is_money, DROP COLUMN alerta_servidor_nuvem, DROP COLUMN alerta_alterdata;
+
+-- Verificar se foi criada
+DESCRIBE assinaturas_alerta;
@@ -0,0 +1,17 @@
+-- Cache persistente de vereditos da IA (endereçado pelo conteúdo do texto)
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS cache_sentimento (
+    chave CHAR(64) PRIMARY KEY COMMENT 'SHA-256 de modelo + versão do prompt + tipo + texto normalizado',
+    modelo VARCHAR(100) NOT NULL,
+    versao_prompt VARCHAR(20) NOT NULL,
+    sentimento ENUM('positive', 'negative', 'neutral') NOT NULL,
+    confianca DECIMAL(4,3) NOT NULL,
+    resumo VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_cache_versao (modelo, versao_prompt)
+);
+
+-- Verificar se foi criada
+DESCRIBE cache_sentimento;
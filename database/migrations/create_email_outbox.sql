@@ -0,0 +1,30 @@
+-- Caixa de saída de emails (enviados por scripts/worker_emails.py)
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    tipo VARCHAR(50) NOT NULL COMMENT 'alerta_insatisfacao, senha_temporaria',
+    pesquisa_id INT NULL,
+    remetente VARCHAR(255) NOT NULL,
+    destinatario VARCHAR(255) NOT NULL,
+    nome_destinatario VARCHAR(255) NULL,
+    assunto VARCHAR(500) NOT NULL,
+    corpo_html MEDIUMTEXT NULL,
+    corpo_texto MEDIUMTEXT NULL,
+    status ENUM('pendente', 'enviando', 'enviado', 'morto') NOT NULL DEFAULT 'pendente',
+    tentativas INT NOT NULL DEFAULT 0,
+    max_tentativas INT NOT NULL DEFAULT 5,
+    disponivel_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    lease_ate DATETIME NULL COMMENT 'Enquanto no futuro, a mensagem pertence ao worker_id',
+    worker_id VARCHAR(100) NULL,
+    ultimo_erro TEXT NULL,
+    enviado_em DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_outbox_disponivel (status, disponivel_em),
+    INDEX idx_outbox_lease (status, lease_ate),
+    INDEX idx_outbox_pesquisa (pesquisa_id, tipo, status)
+);
+
+-- Verificar se foi criada
+DESCRIBE email_outbox;
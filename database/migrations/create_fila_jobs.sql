@@ -0,0 +1,31 @@
+-- Fila de jobs em segundo plano (análise de IA e alertas por email)
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS fila_jobs (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    tipo VARCHAR(50) NOT NULL,
+    payload JSON NOT NULL,
+    status ENUM('pendente', 'processando', 'concluido', 'morto') NOT NULL DEFAULT 'pendente',
+    tentativas INT NOT NULL DEFAULT 0,
+    max_tentativas INT NOT NULL DEFAULT 5,
+    disponivel_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    lease_ate DATETIME NULL,
+    worker_id VARCHAR(100) NULL,
+    ultimo_erro TEXT NULL,
+    concluido_em DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_fila_disponivel (status, disponivel_em),
+    INDEX idx_fila_lease (status, lease_ate)
+);
+
+-- Comentários das colunas principais
+ALTER TABLE fila_jobs
+MODIFY COLUMN lease_ate DATETIME NULL COMMENT 'Enquanto no futuro, o job pertence ao worker_id; depois disso pode ser retomado';
+
+ALTER TABLE fila_jobs
+MODIFY COLUMN status ENUM('pendente', 'processando', 'concluido', 'morto') NOT NULL DEFAULT 'pendente'
+COMMENT 'morto = esgotou as tentativas (dead-letter), exige intervenção manual';
+
+-- Verificar se foi criada
+DESCRIBE fila_jobs;
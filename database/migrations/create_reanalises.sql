@@ -0,0 +1,48 @@
+-- Reanálise em massa do histórico (scripts/reanalisar_historico.py)
+-- Os novos resultados ficam ao lado dos originais: analises_sentimento não é alterada
+USE sistema_pesquisa;
+
+CREATE TABLE IF NOT EXISTS execucoes_reanalise (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    rotulo VARCHAR(100) NULL,
+    filtros JSON NOT NULL COMMENT 'Critérios de seleção (modelo, versão do prompt, período)',
+    modelo_usado VARCHAR(100) NOT NULL COMMENT 'Modelo que está reanalisando',
+    prompt_versao VARCHAR(10) NOT NULL,
+    status ENUM('em_andamento', 'interrompida', 'concluida') NOT NULL DEFAULT 'em_andamento',
+    ultimo_pesquisa_id INT NOT NULL DEFAULT 0 COMMENT 'Ponto de retomada (pesquisas em ordem de id)',
+    processadas INT NOT NULL DEFAULT 0,
+    erros INT NOT NULL DEFAULT 0,
+    iniciado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS reanalises_sentimento (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    execucao_id INT NOT NULL,
+    pesquisa_id INT NOT NULL,
+    sentimento ENUM('positive', 'negative', 'neutral') NOT NULL,
+    confianca DECIMAL(4,3) NOT NULL,
+    pontuacao_hibrida INT NOT NULL,
+    motivo_insatisfacao TEXT NULL,
+    detalhes_respostas JSON NULL COMMENT 'Detalhe por resposta (mesmo formato de detalhes_completos)',
+    modelo_usado VARCHAR(100) NULL,
+    provedor VARCHAR(50) NULL,
+    prompt_versao VARCHAR(10) NULL,
+    metodo_analise VARCHAR(20) NULL,
+    chamadas_api INT NULL,
+    retentativas INT NULL,
+    latencia_ms INT NULL,
+    latencia_api_ms INT NULL,
+    tokens_prompt INT NOT NULL DEFAULT 0,
+    tokens_resposta INT NOT NULL DEFAULT 0,
+    cache_hit BOOLEAN NULL,
+    motivo_fallback VARCHAR(30) NULL,
+    analisado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_execucao_pesquisa (execucao_id, pesquisa_id),
+    INDEX idx_pesquisa (pesquisa_id),
+    FOREIGN KEY (execucao_id) REFERENCES execucoes_reanalise(id) ON DELETE CASCADE
+);
+
+-- Verificar se foram criadas
+DESCRIBE execucoes_reanalise;
+DESCRIBE reanalises_sentimento;
@@ -0,0 +1,173 @@
+# scripts/benchmark_emails.py
+"""
+Benchmark: vazão de alertas de insatisfação de ponta a ponta
+Para cada alerta: monta os dados do email, roteia pelo índice de destinatários
+(em memória), renderiza uma vez e envia a cada gestor pela sessão SMTP
+reaproveitada, em lotes como o worker da caixa de saída. O SMTP é o servidor
+simulado (scripts/servidor_smtp_stub.py), com latência e falhas injetáveis.
+Não acessa banco nem o servidor de email real.
+
+Uso:
+    python scripts/benchmark_emails.py --alertas 500 --gestores 3 --lote 20
+    python scripts/benchmark_emails.py --latencia 0.02 --taxa-erro 0.05 --desconectar-a-cada 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servidor_smtp_stub import ConfiguracaoStubSMTP, ServidorSMTPStub
+
+ANALISE = {
+    'sentimento_geral': 'negative',
+    'pontuacao_hibrida': -1,
+    'confianca_geral': 0.91,
+    'motivo_insatisfacao': 'Conteúdo confuso',
+    'detalhes_completos': {
+        'respostas_texto': [
+            {'texto': 'Conteúdo confuso e mal explicado, perdi tempo', 'sentimento': 'negative', 'confianca': 0.93},
+            {'texto': 'Instrutor não respondeu às dúvidas', 'sentimento': 'negative', 'confianca': 0.88},
+        ],
+        'respostas_numericas': [{'nota': 3.0, 'pontos': -1, 'pergunta': 'Nota do instrutor'}]
+    }
+}
+
+
+def dados_pesquisa(pesquisa_id, produtos):
+    return {
+        'id': pesquisa_id,
+        'nome_cliente': f'Cliente {pesquisa_id}',
+        'codigo_cliente': f'CLI{pesquisa_id}',
+        'nome_treinamento': 'Servidor na Nuvem - Módulo 2',
+        'tipo_produto_id': pesquisa_id % produtos + 1,
+        'tipo_produto': 'Servidor na Nuvem',
+        'agente_nome': 'Agente Demo',
+        'data_resposta': datetime.now()
+    }
+
+
+def assinaturas(gestores, produtos):
+    """Todos os gestores assinam todos os produtos, na hora e a partir de MÉDIO"""
+    return [
+        {'tipo_produto_id': produto, 'canal': 'email', 'severidade_minima': 'MÉDIO',
+         'id': gestor, 'nome': f'Gestor {gestor}', 'email': f'gestor{gestor}@exemplo.com',
+         'modo_alerta': 'imediato'}
+        for produto in range(1, produtos + 1)
+        for gestor in range(1, gestores + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de alertas por email de ponta a ponta')
+    parser.add_argument('--alertas', type=int, default=500)
+    parser.add_argument('--gestores', type=int, default=3, help='Gestores assinantes por produto')
+    parser.add_argument('--produtos', type=int, default=3)
+    parser.add_argument('--lote', type=int, default=20, help='Mensagens por lote (como EMAIL_OUTBOX_LOTE)')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latência do servidor por mensagem (s)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fração de mensagens com 451')
+    parser.add_argument('--desconectar-a-cada', type=int, default=0,
+                        help='Servidor encerra a conexão após N mensagens (0 = nunca)')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    config = ConfiguracaoStubSMTP(latencia=args.latencia, taxa_erro=args.taxa_erro,
+                                  desconectar_a_cada=args.desconectar_a_cada, guardar=10,
+                                  semente=args.semente)
+    servidor = ServidorSMTPStub(config=config)
+    host, porta = servidor.iniciar_em_thread()
+
+    # EmailService exige as credenciais: apontar para o servidor simulado
+    os.environ.update({
+        'SMTP_SERVER': host,
+        'SMTP_PORT': str(porta),
+        'SMTP_USERNAME': 'stub',
+        'SMTP_PASSWORD': 'stub',
+        'EMAIL_REMETENTE': 'pesquisa@localhost',
+    })
+
+    from app.services.email_service import EmailService
+    from app.services.destinatarios_alerta import IndiceDestinatarios
+    from app.services.digest_alertas import separar_por_modo
+    from app.services.sessao_smtp import get_sessao_smtp
+
+    email_service = EmailService()
+    indice = IndiceDestinatarios(ttl_segundos=float('inf'))
+    indice.indexar(assinaturas(args.gestores, args.produtos))
+
+    tempos = {'montar': 0.0, 'rotear': 0.0, 'renderizar': 0.0, 'enviar': 0.0}
+    pendentes = []
+    enviados = 0
+    falhas = 0
+    proximo_id = 1
+
+    def enviar_lote():
+        nonlocal enviados, falhas
+        inicio = time.perf_counter()
+        ok, erros = email_service.enviar_emails_outbox(pendentes)
+        tempos['enviar'] += time.perf_counter() - inicio
+        enviados += len(ok)
+        falhas += len(erros)
+        pendentes.clear()
+
+    # Logs de debug do serviço fora da medição
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio_total = time.perf_counter()
+
+        for pesquisa_id in range(1, args.alertas + 1):
+            inicio = time.perf_counter()
+            pesquisa = dados_pesquisa(pesquisa_id, args.produtos)
+            dados_email = email_service._gerar_corpo_email(pesquisa, ANALISE)
+            assunto = email_service._gerar_assunto(pesquisa, ANALISE)
+            tempos['montar'] += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            gestores = indice.destinatarios(pesquisa['tipo_produto_id'], dados_email['nivel_alerta'])
+            gestores, _ = separar_por_modo(gestores, dados_email['nivel_alerta'])
+            tempos['rotear'] += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            renderizado = email_service._renderizar_email(gestores[0]['email'], gestores[0]['nome'],
+                                                          assunto, dados_email)
+            tempos['renderizar'] += time.perf_counter() - inicio
+
+            for gestor in gestores:
+                pendentes.append(dict(renderizado['email'], id=proximo_id, tipo='alerta_insatisfacao',
+                                      pesquisa_id=pesquisa_id, destinatario=gestor['email'],
+                                      nome_destinatario=gestor['nome']))
+                proximo_id += 1
+                if len(pendentes) >= args.lote:
+                    enviar_lote()
+
+        if pendentes:
+            enviar_lote()
+
+        total = time.perf_counter() - inicio_total
+
+    sessao = email_service.metricas_smtp()
+    get_sessao_smtp(host, porta, 'stub', 'stub').fechar()
+    servidor.parar()
+
+    print("\n" + "=" * 60)
+    print(f"📧 ALERTAS DE PONTA A PONTA - {args.alertas} alerta(s) x {args.gestores} gestor(es)")
+    print(f"   SMTP simulado: latência {args.latencia}s | erros {args.taxa_erro:.0%} | "
+          f"desconectar a cada {args.desconectar_a_cada or '-'}")
+    print("=" * 60)
+    for etapa, segundos in tempos.items():
+        print(f"{etapa:<12} {segundos * 1000:9.1f} ms | {segundos / args.alertas * 1000:7.3f} ms/alerta | "
+              f"{segundos / total:6.1%}")
+    print("-" * 60)
+    print(f"⏱️ Total: {total:.2f}s | {args.alertas / total:.1f} alertas/s | {enviados / total:.1f} emails/s")
+    print(f"📨 Enviados: {enviados} | Falhas: {falhas} | Servidor: {config.metricas()}")
+    print(f"🔐 Sessão SMTP: {sessao}")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# scripts/benchmark_lexico_sentimento.py
+"""
+Benchmark do léxico local de sentimento
+Mede a concordância com os vereditos da IA, a fração de chamadas à API
+evitadas e o tempo por texto.
+
+Uso:
+    python scripts/benchmark_lexico_sentimento.py            # rótulos de referência abaixo
+    python scripts/benchmark_lexico_sentimento.py --com-ia   # rótulos obtidos do GLM na hora
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.lexico_sentimento import AnalisadorLexico
+
+# Comentários típicos de treinamento com o rótulo esperado (use --com-ia para comparar com o GLM)
+CONJUNTO_ROTULADO = [
+    ("Excelente treinamento, aprendi muito", 'positive'),
+    ("O instrutor foi muito didático e paciente", 'positive'),
+    ("Conteúdo claro e objetivo, valeu a pena", 'positive'),
+    ("Superou as expectativas, parabéns à equipe", 'positive'),
+    ("Gostei bastante, material prático", 'positive'),
+    ("Ótima explicação, tirou todas as dúvidas", 'positive'),
+    ("Nada confuso, tudo muito bem explicado", 'positive'),
+    ("Recomendo para toda a equipe", 'positive'),
+    ("Treinamento esclarecedor, resolveu meu problema", 'positive'),
+    ("Adorei o atendimento, muito atencioso", 'positive'),
+    ("Foi bom, consegui entender o sistema", 'positive'),
+    ("Sem problemas, tudo certo", 'positive'),
+    ("Muito útil para o dia a dia", 'positive'),
+    ("Perfeito, obrigado", 'positive'),
+    ("Sem dúvida excelente treinamento", 'positive'),
+    ("Sem dúvidas ótimo curso", 'positive'),
+    ("Nunca vi algo tão excelente", 'positive'),
+    ("Nada a reclamar, instrutor muito atencioso", 'positive'),
+    ("Não deixou a desejar", 'positive'),
+    ("Achei confuso e mal explicado", 'negative'),
+    ("Não recomendo, perdi tempo", 'negative'),
+    ("Muito rápido, não consegui acompanhar", 'negative'),
+    ("Péssimo, o instrutor não sabia responder", 'negative'),
+    ("Não entendi nada do que foi passado", 'negative'),
+    ("Treinamento desorganizado e cansativo", 'negative'),
+    ("Horrível, uma perda de tempo", 'negative'),
+    ("Muito técnico, fiquei perdido", 'negative'),
+    ("Não foi muito bom, esperava mais", 'negative'),
+    ("Conteúdo fraco e superficial", 'negative'),
+    ("Não aprendi o que precisava", 'negative'),
+    ("Decepcionante, ninguém explicou direito", 'negative'),
+    ("Difícil de acompanhar, muito corrido", 'negative'),
+    ("Nunca vi nada tão confuso", 'negative'),
+    ("Não é tão bom quanto esperava", 'negative'),
+    ("Foi ok, nada de especial", 'neutral'),
+    ("Treinamento realizado conforme combinado", 'neutral'),
+    ("Poderia ter mais exemplos", 'neutral'),
+    ("Bom, mas um pouco confuso em algumas partes", 'neutral'),
+    ("O instrutor é ótimo porém o material é péssimo", 'neutral'),
+    ("Sem comentários", 'neutral'),
+    ("Gostaria de um segundo módulo", 'neutral'),
+    ("A conexão caiu algumas vezes", 'neutral'),
+    ("Razoável", 'neutral'),
+]
+
+
+def obter_rotulos_ia(textos):
+    """Rótulos do GLM (ignora o léxico local e o cache)"""
+    os.environ['SENTIMENTO_LEXICO_ATIVO'] = 'false'
+    os.environ['SENTIMENTO_CACHE_BANCO'] = 'false'
+    from app.services.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    rotulos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for texto in textos:
+            rotulos.append(analyzer.analisar_sentimento_texto(texto)['sentimento'])
+    return rotulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do léxico local de sentimento')
+    parser.add_argument('--com-ia', action='store_true', help='Obtém os rótulos do GLM em vez dos de referência')
+    parser.add_argument('--confianca-minima', type=float,
+                        default=float(os.getenv('SENTIMENTO_LEXICO_CONFIANCA_MINIMA', 0.85)),
+                        help='Confiança a partir da qual o léxico decide sozinho')
+    parser.add_argument('--repeticoes', type=int, default=1000, help='Repetições para medir o tempo')
+    args = parser.parse_args()
+
+    textos = [texto for texto, _ in CONJUNTO_ROTULADO]
+    rotulos = obter_rotulos_ia(textos) if args.com_ia else [rotulo for _, rotulo in CONJUNTO_ROTULADO]
+
+    lexico = AnalisadorLexico()
+    resultados = [lexico.analisar(texto) for texto in textos]
+
+    decididos = [
+        (resultado, rotulo) for resultado, rotulo in zip(resultados, rotulos)
+        if resultado['sentimento'] != 'neutral' and resultado['confianca'] >= args.confianca_minima
+    ]
+    concordancia_decididos = sum(1 for resultado, rotulo in decididos if resultado['sentimento'] == rotulo)
+    concordancia_geral = sum(1 for resultado, rotulo in zip(resultados, rotulos) if resultado['sentimento'] == rotulo)
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticoes):
+        for texto in textos:
+            lexico.analisar(texto)
+    microssegundos = (time.perf_counter() - inicio) / (args.repeticoes * len(textos)) * 1_000_000
+
+    print("=" * 60)
+    print("📊 BENCHMARK - LÉXICO LOCAL x IA")
+    print("=" * 60)
+    print(f"Textos rotulados:                 {len(textos)} ({'GLM ao vivo' if args.com_ia else 'referência'})")
+    print(f"Decididos localmente:             {len(decididos)} ({len(decididos) / len(textos) * 100:.1f}% das chamadas evitadas)")
+    if decididos:
+        print(f"Concordância nos decididos:       {concordancia_decididos / len(decididos) * 100:.1f}%")
+    print(f"Concordância geral (sem a IA):    {concordancia_geral / len(textos) * 100:.1f}%")
+    print(f"Tempo médio por texto:            {microssegundos:.1f} µs")
+    print("=" * 60)
+
+    divergentes = [
+        (texto, resultado, rotulo) for texto, resultado, rotulo in zip(textos, resultados, rotulos)
+        if resultado['sentimento'] != 'neutral' and resultado['confianca'] >= args.confianca_minima
+        and resultado['sentimento'] != rotulo
+    ]
+    for texto, resultado, rotulo in divergentes:
+        print(f"⚠️ Divergência: \"{texto}\" léxico={resultado['sentimento']} ({resultado['confianca']}) IA={rotulo}")
+
+
+if __name__ == '__main__':
+    main()
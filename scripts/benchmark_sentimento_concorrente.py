@@ -0,0 +1,117 @@
+# scripts/benchmark_sentimento_concorrente.py
+"""
+Benchmark: análise de sentimento sequencial x concorrente
+Roda o pipeline completo contra o servidor simulado (scripts/servidor_sentimento_stub.py),
+sem chamadas reais à API, e confere que os dois caminhos produzem exatamente o mesmo resultado.
+
+Uso: python scripts/benchmark_sentimento_concorrente.py --pesquisas 60 --latencia 0.3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmark offline: sem cache no banco e sem léxico local (todos os textos vão ao modelo)
+os.environ['SENTIMENTO_CACHE_BANCO'] = 'false'
+os.environ['SENTIMENTO_LEXICO_ATIVO'] = 'false'
+
+from app.services.sentiment_analyzer import SentimentAnalyzer
+from app.services.provedores_sentimento import ProvedorOpenAICompativel
+from app.utils.rate_limit import TokenBucket
+from servidor_sentimento_stub import ConfiguracaoStub, criar_servidor, iniciar_em_thread
+
+COMENTARIOS = [
+    'O treinamento foi excelente e muito didático',
+    'Achei o conteúdo confuso e mal explicado',
+    'Instrutor objetivo, aprendi bastante',
+    'Muito rápido, não consegui acompanhar',
+    'Foi ok, nada de especial',
+    'Perdi tempo, não recomendo',
+    'Material prático e esclarecedor',
+]
+
+
+def gerar_pesquisas(quantidade, textos_por_pesquisa, semente=42):
+    """Gera pesquisas sintéticas com textos únicos (sem acerto de cache)"""
+    rnd = random.Random(semente)
+    pesquisas = []
+    for p in range(quantidade):
+        respostas = [{'tipo': 'escala_numerica', 'valor': str(rnd.randint(1, 10)), 'pergunta': 'Nota'}]
+        for t in range(textos_por_pesquisa):
+            respostas.append({
+                'tipo': 'texto_livre',
+                'valor': f"{rnd.choice(COMENTARIOS)} (pesquisa {p} comentário {t})",
+                'pergunta': 'Comentários'
+            })
+        pesquisas.append(respostas)
+    return pesquisas
+
+
+def executar(analyzer, pesquisas, tamanho_lote, concorrencia):
+    """Executa uma rodada com cache vazio e retorna (resultados, segundos)"""
+    analyzer.cache.invalidar()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = analyzer.calcular_pontuacao_hibrida_lote(
+            pesquisas, tamanho_lote=tamanho_lote, concorrencia=concorrencia
+        )
+    return resultados, time.perf_counter() - inicio
+
+
+def vereditos(resultados):
+    """Resultados sem a telemetria (latências variam entre rodadas)"""
+    return [{k: v for k, v in r.items() if k != 'telemetria'} for r in resultados]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequencial x concorrente')
+    parser.add_argument('--pesquisas', type=int, default=60)
+    parser.add_argument('--textos', type=int, default=2, help='Textos livres por pesquisa')
+    parser.add_argument('--lote', type=int, default=6, help='Textos por chamada ao modelo')
+    parser.add_argument('--latencia', type=float, default=0.3, help='Latência simulada por chamada (s)')
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=20, help='Cota simulada do provedor (req/s)')
+    args = parser.parse_args()
+
+    servidor = criar_servidor(config=ConfiguracaoStub(latencia=args.latencia))
+    provedor = ProvedorOpenAICompativel(
+        iniciar_em_thread(servidor), modelo='stub', max_conexoes=max(1, args.concorrencia)
+    )
+
+    analyzer = SentimentAnalyzer(provedor)
+    analyzer.limitador = TokenBucket(args.rps, capacidade=args.rps)
+
+    pesquisas = gerar_pesquisas(args.pesquisas, args.textos)
+
+    sequencial, tempo_seq = executar(analyzer, pesquisas, args.lote, 1)
+    concorrente, tempo_conc = executar(analyzer, pesquisas, args.lote, args.concorrencia)
+
+    chamadas = -(-args.pesquisas * args.textos // args.lote)
+
+    print("=" * 60)
+    print("📊 BENCHMARK - ANÁLISE DE SENTIMENTO")
+    print("=" * 60)
+    print(f"Pesquisas: {args.pesquisas} | Textos/pesquisa: {args.textos} | Textos/chamada: {args.lote}")
+    print(f"Chamadas ao modelo: ~{chamadas} | Latência simulada: {args.latencia}s | Cota: {args.rps} req/s")
+    print(f"Sequencial:               {tempo_seq:8.2f}s")
+    print(f"Concorrente (x{args.concorrencia}):        {tempo_conc:8.2f}s")
+    print(f"Ganho:                    {tempo_seq / tempo_conc:8.2f}x")
+    identicos = vereditos(sequencial) == vereditos(concorrente)
+    print(f"Resultados idênticos:     {'SIM' if identicos else 'NÃO'}")
+    print("=" * 60)
+
+    servidor.shutdown()
+
+    if not identicos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# scripts/benchmark_templates_email.py
+"""
+Benchmark: custo de renderização do email de alerta
+Compara o template compilado uma vez (ambiente em cache) com recompilar a cada
+email, e renderizar uma vez por alerta com renderizar uma vez por gestor.
+Não acessa banco nem SMTP.
+
+Uso: python scripts/benchmark_templates_email.py --alertas 200 --gestores 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from app.services.templates_email import DIRETORIO_TEMPLATES, renderizar_email
+
+DADOS_ALERTA = {
+    'nivel_alerta': 'CRÍTICO',
+    'cor_nivel': '#dc3545',
+    'urgencia': 'Ação imediata necessária',
+    'cliente': {
+        'nome': 'Cliente Exemplo',
+        'codigo': 'CLI123',
+        'treinamento': 'Servidor na Nuvem - Módulo 2',
+        'produto': 'Servidor na Nuvem',
+        'agente': 'Agente Demo',
+        'data_resposta': '10/10/2024 14:30'
+    },
+    'analise': {
+        'sentimento': 'negative',
+        'confianca': 91,
+        'trechos_criticos': [
+            {'texto': 'Conteúdo confuso e mal explicado, perdi tempo', 'interpretacao': 'Dificuldade de compreensão do conteúdo', 'confianca': 0.93},
+            {'texto': 'Instrutor não respondeu às dúvidas', 'interpretacao': 'Crítica direta à qualidade da apresentação', 'confianca': 0.88},
+        ],
+        'notas_baixas': [{'nota': 3.0, 'contexto': 'Qualidade do instrutor', 'pergunta': 'Nota do instrutor'}],
+        'resumo_ia': 'Este cliente demonstrou crítico nível de insatisfação.',
+        'pontuacao': -4
+    },
+    'link_detalhes': 'http://localhost:5000/gestor/detalhes/1'
+}
+
+
+def renderizar_sem_cache():
+    """Ambiente novo a cada email: lê e compila os templates toda vez"""
+    ambiente = Environment(
+        loader=FileSystemLoader(DIRETORIO_TEMPLATES),
+        autoescape=select_autoescape(['html']),
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    contexto = dict(DADOS_ALERTA, enviado_em=datetime.now())
+    html = ambiente.get_template('alerta_insatisfacao.html').render(contexto)
+    texto = ambiente.get_template('alerta_insatisfacao.txt').render(contexto)
+    return html, texto
+
+
+def renderizar_com_cache():
+    return renderizar_email('alerta_insatisfacao', **DADOS_ALERTA)
+
+
+def medir(funcao, vezes):
+    inicio = time.perf_counter()
+    for _ in range(vezes):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de renderização do email de alerta')
+    parser.add_argument('--alertas', type=int, default=200)
+    parser.add_argument('--gestores', type=int, default=5, help='Destinatários por alerta')
+    args = parser.parse_args()
+
+    # Mesmo conteúdo nos dois caminhos
+    assert renderizar_sem_cache()[0] == renderizar_com_cache()[0]
+
+    renderizar_com_cache()  # compilar antes de medir
+    por_gestor_sem_cache = medir(renderizar_sem_cache, args.alertas * args.gestores)
+    por_gestor_com_cache = medir(renderizar_com_cache, args.alertas * args.gestores)
+    por_alerta_com_cache = medir(renderizar_com_cache, args.alertas)
+
+    print("\n" + "=" * 60)
+    print(f"📧 RENDERIZAÇÃO - {args.alertas} alerta(s) x {args.gestores} gestor(es)")
+    print("=" * 60)
+    for rotulo, segundos, renders in (
+        ('Compilando a cada email, 1 por gestor', por_gestor_sem_cache, args.alertas * args.gestores),
+        ('Template em cache, 1 por gestor', por_gestor_com_cache, args.alertas * args.gestores),
+        ('Template em cache, 1 por alerta', por_alerta_com_cache, args.alertas),
+    ):
+        print(f"{rotulo:<40} {segundos * 1000:8.1f} ms total | "
+              f"{segundos / renders * 1e6:8.1f} µs/render | "
+              f"{segundos / args.alertas * 1000:6.2f} ms/alerta")
+    print("-" * 60)
+    print(f"⚡ Ganho total: {por_gestor_sem_cache / por_alerta_com_cache:.0f}x")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# scripts/limpar_cache_sentimento.py
+"""
+Limpeza do cache de vereditos da IA (tabela cache_sentimento)
+
+Remove as entradas gravadas há mais de N dias, de qualquer modelo ou versão
+de prompt. Entradas de versões antigas não são mais consultadas (a chave
+inclui modelo e prompt), então basta a idade para liberá-las. A aplicação
+nunca apaga o cache sozinha: agende este script (cron/systemd timer).
+
+Uso:
+    python scripts/limpar_cache_sentimento.py --dias 90
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.sentiment_cache import purgar_cache_sentimento
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove vereditos antigos do cache de sentimento')
+    parser.add_argument('--dias', type=int, default=int(os.getenv('SENTIMENTO_CACHE_RETENCAO_DIAS', 90)),
+                        help='Remove entradas gravadas há mais de N dias')
+    parser.add_argument('--bloco', type=int, default=5000, help='Linhas removidas por DELETE')
+    args = parser.parse_args()
+
+    if args.dias < 1:
+        print("❌ --dias deve ser pelo menos 1")
+        return 1
+
+    removidas = purgar_cache_sentimento(args.dias, args.bloco)
+    print(f"🧹 Cache de sentimento: {removidas} entrada(s) com mais de {args.dias} dia(s) removida(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
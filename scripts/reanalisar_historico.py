@@ -0,0 +1,294 @@
+# scripts/reanalisar_historico.py
+"""
+Reanálise em massa do histórico com o modelo/prompt atual
+
+Seleciona pesquisas pela versão da análise vigente (modelo, versão do prompt)
+e pelo período de resposta, lê em blocos por id, classifica em lote (passando
+pelo cache de vereditos) e grava em reanalises_sentimento, sem alterar
+analises_sentimento. O progresso fica em execucoes_reanalise: Ctrl+C termina
+o bloco atual e para; --retomar continua do último bloco gravado.
+
+Uso:
+    python scripts/reanalisar_historico.py --desatualizadas --de 2024-01-01
+    python scripts/reanalisar_historico.py --prompt-versao nenhuma --bloco 500
+    python scripts/reanalisar_historico.py --retomar 3
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.utils.database import execute_query, transacao
+from app.services.sentiment_analyzer import get_sentiment_analyzer, PROMPT_VERSAO
+from app.services.telemetria_sentimento import COLUNAS_TELEMETRIA, valores_telemetria
+from app.services.processamento_pesquisa import montar_respostas_pesquisas
+
+# Sinal recebido: terminar o bloco em andamento e parar
+_parar = False
+
+
+def _pedir_parada(signum, frame):
+    global _parar
+    if _parar:
+        raise KeyboardInterrupt
+    _parar = True
+    print("\n⏸️  Parada solicitada - terminando o bloco atual (Ctrl+C de novo para abortar)")
+
+
+def montar_filtros(filtros, modelo_atual):
+    """Condições SQL (sobre a análise vigente `a` e a pesquisa `p`) e parâmetros"""
+    condicoes = ["p.ia_processada = TRUE"]
+    params = []
+
+    if filtros.get('modelo'):
+        condicoes.append("a.modelo_usado = %s")
+        params.append(filtros['modelo'])
+
+    if filtros.get('prompt_versao') == 'nenhuma':
+        # Análises anteriores à telemetria
+        condicoes.append("a.prompt_versao IS NULL")
+    elif filtros.get('prompt_versao'):
+        condicoes.append("a.prompt_versao = %s")
+        params.append(filtros['prompt_versao'])
+
+    if filtros.get('desatualizadas'):
+        condicoes.append("NOT (a.modelo_usado <=> %s AND a.prompt_versao <=> %s)")
+        params.extend([modelo_atual, PROMPT_VERSAO])
+
+    if filtros.get('de'):
+        condicoes.append("p.data_resposta >= %s")
+        params.append(filtros['de'])
+
+    if filtros.get('ate'):
+        # Data final inclusiva
+        condicoes.append("p.data_resposta < %s")
+        params.append((datetime.strptime(filtros['ate'], '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d'))
+
+    return condicoes, params
+
+
+def _consulta_selecao(colunas, condicoes):
+    return f"""
+    SELECT {colunas}
+    FROM pesquisas p
+    JOIN analises_sentimento a ON a.id = (
+        SELECT MAX(a2.id) FROM analises_sentimento a2 WHERE a2.pesquisa_id = p.id
+    )
+    WHERE {' AND '.join(condicoes)}
+    """
+
+
+def contar_pendentes(filtros, modelo_atual, apos_id):
+    condicoes, params = montar_filtros(filtros, modelo_atual)
+    result = execute_query(
+        _consulta_selecao("COUNT(*) as total", condicoes + ["p.id > %s"]),
+        tuple(params + [apos_id]), fetch=True
+    )
+    return result[0]['total'] if result else 0
+
+
+def buscar_bloco(filtros, modelo_atual, apos_id, tamanho):
+    """Próximas pesquisas (em ordem de id) depois de apos_id; None em erro de banco"""
+    condicoes, params = montar_filtros(filtros, modelo_atual)
+    result = execute_query(
+        _consulta_selecao("p.id", condicoes + ["p.id > %s"]) + " ORDER BY p.id LIMIT %s",
+        tuple(params + [apos_id, tamanho]), fetch=True
+    )
+    return None if result is None else [linha['id'] for linha in result]
+
+
+def criar_execucao(rotulo, filtros, modelo_atual):
+    with transacao() as cursor:
+        cursor.execute("""
+        INSERT INTO execucoes_reanalise (rotulo, filtros, modelo_usado, prompt_versao)
+        VALUES (%s, %s, %s, %s)
+        """, (rotulo, json.dumps(filtros), modelo_atual, PROMPT_VERSAO))
+        return cursor.lastrowid
+
+
+def carregar_execucao(execucao_id):
+    result = execute_query("SELECT * FROM execucoes_reanalise WHERE id = %s", (execucao_id,), fetch=True)
+    return result[0] if result else None
+
+
+def gravar_bloco(execucao_id, resultados, ultimo_pesquisa_id, erros):
+    """Grava as reanálises do bloco e avança o ponto de retomada na mesma transação"""
+    colunas = ', '.join(COLUNAS_TELEMETRIA)
+    marcadores = ', '.join(['%s'] * len(COLUNAS_TELEMETRIA))
+
+    with transacao() as cursor:
+        for pesquisa_id, resultado in resultados:
+            # Repetir um bloco (ex.: queda antes do checkpoint) substitui a linha
+            cursor.execute(f"""
+            REPLACE INTO reanalises_sentimento
+            (execucao_id, pesquisa_id, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao,
+             detalhes_respostas, {colunas})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, {marcadores})
+            """, (
+                execucao_id,
+                pesquisa_id,
+                resultado['sentimento_geral'],
+                resultado['confianca_geral'],
+                resultado['pontuacao_hibrida'],
+                resultado['motivo_insatisfacao'],
+                json.dumps(resultado['detalhes_completos'], ensure_ascii=False, default=str)
+            ) + valores_telemetria(resultado))
+
+        cursor.execute("""
+        UPDATE execucoes_reanalise
+        SET ultimo_pesquisa_id = %s, processadas = processadas + %s, erros = erros + %s
+        WHERE id = %s
+        """, (ultimo_pesquisa_id, len(resultados), erros, execucao_id))
+
+
+def finalizar_execucao(execucao_id, status):
+    execute_query("UPDATE execucoes_reanalise SET status = %s WHERE id = %s", (status, execucao_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reanálise em massa do histórico com o modelo/prompt atual')
+    parser.add_argument('--modelo', help='Só análises feitas por este modelo (analises_sentimento.modelo_usado)')
+    parser.add_argument('--prompt-versao', help="Só análises desta versão de prompt ('nenhuma' = anteriores à telemetria)")
+    parser.add_argument('--desatualizadas', action='store_true',
+                        help='Só análises feitas por outro modelo ou versão de prompt que os atuais')
+    parser.add_argument('--de', help='Respondidas a partir de (AAAA-MM-DD)')
+    parser.add_argument('--ate', help='Respondidas até (AAAA-MM-DD, inclusive)')
+    parser.add_argument('--bloco', type=int, default=200, help='Pesquisas lidas e gravadas por bloco')
+    parser.add_argument('--concorrencia', type=int, default=None,
+                        help='Chamadas ao modelo em paralelo (padrão SENTIMENTO_CONCORRENCIA)')
+    parser.add_argument('--rotulo', help='Descrição da execução')
+    parser.add_argument('--retomar', type=int, metavar='EXECUCAO_ID', help='Continua uma execução interrompida')
+    args = parser.parse_args()
+
+    try:
+        analyzer = get_sentiment_analyzer()
+    except ValueError as e:
+        print(f"❌ ERRO: {str(e)}")
+        return 1
+    modelo_atual = analyzer.provedor.descricao
+
+    if args.retomar:
+        execucao = carregar_execucao(args.retomar)
+        if not execucao:
+            print(f"❌ Execução {args.retomar} não encontrada")
+            return 1
+        if execucao['status'] == 'concluida':
+            print(f"✅ Execução {args.retomar} já foi concluída")
+            return 0
+        if (execucao['modelo_usado'], execucao['prompt_versao']) != (modelo_atual, PROMPT_VERSAO):
+            # Misturaria resultados de versões diferentes na mesma execução
+            print(f"❌ Execução {args.retomar} usa {execucao['modelo_usado']} / prompt {execucao['prompt_versao']}; "
+                  f"o atual é {modelo_atual} / prompt {PROMPT_VERSAO}")
+            return 1
+        execucao_id = execucao['id']
+        filtros = json.loads(execucao['filtros'])
+        ultimo_id = execucao['ultimo_pesquisa_id']
+        finalizar_execucao(execucao_id, 'em_andamento')
+    else:
+        filtros = {
+            'modelo': args.modelo,
+            'prompt_versao': args.prompt_versao,
+            'desatualizadas': args.desatualizadas,
+            'de': args.de,
+            'ate': args.ate
+        }
+        execucao_id = criar_execucao(args.rotulo, filtros, modelo_atual)
+        ultimo_id = 0
+
+    total = contar_pendentes(filtros, modelo_atual, ultimo_id)
+
+    print("\n" + "=" * 60)
+    print(f"🔁 REANÁLISE DO HISTÓRICO - execução {execucao_id}")
+    print("=" * 60)
+    print(f"🤖 Modelo: {modelo_atual} | Prompt v{PROMPT_VERSAO}")
+    print(f"🔎 Filtros: {json.dumps({k: v for k, v in filtros.items() if v}, ensure_ascii=False)}")
+    print(f"📋 Pesquisas a reanalisar: {total} (a partir do id {ultimo_id})")
+    print("=" * 60)
+
+    signal.signal(signal.SIGINT, _pedir_parada)
+    signal.signal(signal.SIGTERM, _pedir_parada)
+
+    inicio = time.monotonic()
+    processadas = 0
+    erros = 0
+    chamadas_inicio = analyzer.metricas()['tokens']['chamadas']
+    ids = None
+    falha_ia = None
+
+    while not _parar:
+        ids = buscar_bloco(filtros, modelo_atual, ultimo_id, max(1, args.bloco))
+        if ids is None:
+            print("❌ Erro ao buscar o próximo bloco - execução interrompida")
+            break
+        if not ids:
+            break
+
+        respostas = montar_respostas_pesquisas(ids)
+        if respostas is None:
+            print("❌ Erro ao buscar as respostas - execução interrompida")
+            break
+
+        com_respostas = [pesquisa_id for pesquisa_id in ids if respostas.get(pesquisa_id)]
+        resultados = analyzer.calcular_pontuacao_hibrida_lote(
+            [respostas[pesquisa_id] for pesquisa_id in com_respostas],
+            concorrencia=args.concorrencia
+        )
+
+        # IA indisponível (fallback local): não gravar o veredito do léxico como se fosse do
+        # modelo atual; o checkpoint para antes da primeira pesquisa afetada e --retomar a refaz
+        falha_ia = next((pesquisa_id for pesquisa_id, resultado in zip(com_respostas, resultados)
+                         if resultado.get('reanalisar')), None)
+        if falha_ia is not None:
+            ids = [pesquisa_id for pesquisa_id in ids if pesquisa_id < falha_ia]
+            analisadas = [(pesquisa_id, resultado) for pesquisa_id, resultado in zip(com_respostas, resultados)
+                          if pesquisa_id < falha_ia]
+        else:
+            analisadas = list(zip(com_respostas, resultados))
+
+        sem_respostas = len(ids) - len(analisadas)
+        if ids:
+            gravar_bloco(execucao_id, analisadas, ids[-1], sem_respostas)
+            ultimo_id = ids[-1]
+        processadas += len(analisadas)
+        erros += sem_respostas
+
+        if falha_ia is not None:
+            print(f"❌ IA indisponível na pesquisa {falha_ia} (fallback local) - execução interrompida no id {ultimo_id}")
+            break
+
+        # Vazão e estimativa de término
+        decorrido = time.monotonic() - inicio
+        vazao = (processadas + erros) / decorrido if decorrido else 0.0
+        restantes = max(0, total - processadas - erros)
+        metricas = analyzer.metricas()
+        print(f"📦 Até id {ultimo_id}: {processadas + erros}/{total} | {vazao:.1f} pesquisas/s | "
+              f"{metricas['tokens']['chamadas'] - chamadas_inicio} chamada(s) IA | "
+              f"cache {metricas['cache']['taxa_acerto'] * 100:.0f}% | "
+              f"fim em ~{restantes / vazao / 60 if vazao else 0:.1f} min")
+
+    concluida = not _parar and falha_ia is None and ids == []
+    finalizar_execucao(execucao_id, 'concluida' if concluida else 'interrompida')
+
+    decorrido = time.monotonic() - inicio
+    print("\n" + "=" * 60)
+    print(f"{'✅ Concluída' if concluida else '⏸️  Interrompida'} - execução {execucao_id}")
+    print(f"📊 Reanalisadas: {processadas} | Sem respostas: {erros} | "
+          f"{decorrido:.1f}s ({processadas / decorrido if decorrido else 0:.1f} pesquisas/s)")
+    if not concluida:
+        print(f"▶️  Para continuar: python scripts/reanalisar_historico.py --retomar {execucao_id}")
+    print("=" * 60 + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,41 @@
 # scripts/reprocessar_pesquisas_ia.py
 """
 Script para reprocessar pesquisas que falharam na análise de IA
-Execute este script quando a chave ZHIPU_API_KEY foi adicionada ao .env
+Execute este script quando a chave ZHIPU_API_KEY (ou outro provedor) foi configurada no .env
+
+Cada processo reserva as pesquisas em blocos (lease em pesquisas.ia_lease_ate,
+SELECT ... FOR UPDATE SKIP LOCKED), então vários processos ou servidores podem
+drenar o mesmo backlog sem repetir pesquisas. Se um processo morrer, o lease
+expira e outro retoma as pesquisas dele.
+
+Com --versao-desatualizada as pesquisas classificadas por outro modelo ou
+versão de prompt são reanalisadas como em scripts/reanalisar_historico.py:
+o resultado vai para reanalises_sentimento (uma execução em execucoes_reanalise)
+e analises_sentimento não é alterada. Os painéis do gestor e do agente
+continuam lendo a análise original em analises_sentimento; a reanálise serve
+para comparar versões e não dispara alertas.
+
+Com --continuo o script fica em execução (ex.: serviço systemd/contêiner):
+verifica pendentes e análises de fallback com espera adaptativa, para de forma
+limpa no SIGTERM e mantém um arquivo de heartbeat para checagem de saúde.
+
+Uso:
+    python scripts/reprocessar_pesquisas_ia.py --processos 4
+    python scripts/reprocessar_pesquisas_ia.py --reanalisar
+    python scripts/reprocessar_pesquisas_ia.py --versao-desatualizada --processos 4
+    python scripts/reprocessar_pesquisas_ia.py --continuo --heartbeat /tmp/reprocessamento.json
+    python scripts/reprocessar_pesquisas_ia.py --verificar-heartbeat /tmp/reprocessamento.json
 """
 
+import argparse
+import json
+import multiprocessing
 import os
+import signal
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -14,183 +44,583 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 load_dotenv()
 
-from app.utils.database import execute_query
-from app.services.sentiment_analyzer import SentimentAnalyzer
-from app.services.email_service import EmailService
+from app.utils.database import execute_query, transacao
+from app.services.sentiment_analyzer import get_sentiment_analyzer, PROMPT_VERSAO
+from app.services.telemetria_sentimento import COLUNAS_TELEMETRIA, valores_telemetria
+from app.services.analise_respostas import salvar_detalhes_respostas
+from app.services.job_queue import inserir_job, gerar_worker_id
+from app.services.processamento_pesquisa import (
+    JOB_ALERTA_INSATISFACAO, montar_respostas_pesquisas, salvar_analise
+)
 
-def buscar_pesquisas_nao_processadas():
-    """Busca pesquisas que não foram processadas pela IA"""
-    query = """
-    SELECT p.id, p.respondida 
-    FROM pesquisas p
-    WHERE p.respondida = TRUE 
-    AND p.ia_processada = FALSE
-    ORDER BY p.data_resposta ASC
+LEASE_SEGUNDOS = int(os.getenv('REPROCESSAMENTO_LEASE_SEGUNDOS', 600))
+
+# Modo contínuo (--continuo)
+INTERVALO_MIN = float(os.getenv('REPROCESSAMENTO_INTERVALO_MIN_SEGUNDOS', 5))
+INTERVALO_MAX = float(os.getenv('REPROCESSAMENTO_INTERVALO_MAX_SEGUNDOS', 300))
+HEARTBEAT_SEGUNDOS = float(os.getenv('REPROCESSAMENTO_HEARTBEAT_SEGUNDOS', 30))
+HEARTBEAT_TOLERANCIA = float(os.getenv('REPROCESSAMENTO_HEARTBEAT_TOLERANCIA_SEGUNDOS', LEASE_SEGUNDOS))
+JANELA_VAZAO_SEGUNDOS = 300
+# Verificados a cada ciclo: novas pendências primeiro, depois as análises de fallback
+MODOS_CONTINUO = ('pendentes', 'reanalisar')
+
+# Sinal recebido: terminar o lote em andamento e parar
+_parar = threading.Event()
+
+# Critério de seleção de cada modo (sobre a pesquisa `p`)
+MODOS = {
+    # Nunca analisadas (e fora da fila do worker, para não processar em duplicidade)
+    'pendentes': """
+        p.respondida = TRUE
+        AND p.ia_processada = FALSE
+        AND NOT EXISTS (
+            SELECT 1 FROM fila_jobs j
+            WHERE j.tipo = 'analise_pesquisa'
+            AND j.status IN ('pendente', 'processando')
+            AND JSON_EXTRACT(j.payload, '$.pesquisa_id') = p.id
+        )
+    """,
+    # Analisadas pelo fallback local enquanto a IA estava indisponível
+    'reanalisar': """
+        p.ia_processada = TRUE
+        AND p.ia_reanalisar = TRUE
+    """,
+    # Textos livres classificados por outro modelo ou versão de prompt
+    # (e ainda sem reanálise com os atuais em reanalises_sentimento)
+    'versao_desatualizada': """
+        p.ia_processada = TRUE
+        AND EXISTS (
+            SELECT 1 FROM analises_respostas ar
+            WHERE ar.pesquisa_id = p.id
+            AND ar.tipo = 'texto_livre'
+            AND (ar.modelo_usado <> %s OR ar.prompt_versao <> %s)
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM reanalises_sentimento r
+            WHERE r.pesquisa_id = p.id
+            AND r.modelo_usado = %s AND r.prompt_versao = %s
+        )
+    """,
+}
+
+
+def _params_modo(modo):
+    if modo == 'versao_desatualizada':
+        modelo_atual = get_sentiment_analyzer().provedor.descricao
+        return [modelo_atual, PROMPT_VERSAO, modelo_atual, PROMPT_VERSAO]
+    return []
+
+
+def contar_pesquisas(modo):
+    """Tamanho do backlog (informativo)"""
+    result = execute_query(
+        f"SELECT COUNT(*) as total FROM pesquisas p WHERE {MODOS[modo]}",
+        tuple(_params_modo(modo)), fetch=True
+    )
+    return result[0]['total'] if result else 0
+
+
+def reservar_pesquisas(modo, worker_id, limite):
     """
-    result = execute_query(query, fetch=True)
-    return result if result else []
+    Reserva (lease) até `limite` pesquisas do modo para este processo
+    Pesquisas reservadas por outro processo ficam de fora até o lease expirar
+    """
+    with transacao() as cursor:
+        cursor.execute(f"""
+        SELECT p.id
+        FROM pesquisas p
+        WHERE {MODOS[modo]}
+        AND (p.ia_lease_ate IS NULL OR p.ia_lease_ate < NOW())
+        ORDER BY p.id
+        LIMIT %s
+        FOR UPDATE OF p SKIP LOCKED
+        """, _params_modo(modo) + [limite])
+
+        ids = [linha['id'] for linha in cursor.fetchall()]
 
-def buscar_respostas_pesquisa(pesquisa_id):
-    """Busca todas as respostas de uma pesquisa"""
+        if ids:
+            cursor.execute(f"""
+            UPDATE pesquisas
+            SET ia_lease_ate = DATE_ADD(NOW(), INTERVAL %s SECOND), ia_lease_dono = %s
+            WHERE id IN ({', '.join(['%s'] * len(ids))})
+            """, [LEASE_SEGUNDOS, worker_id] + ids)
+
+    return ids
+
+
+def liberar_lease(cursor, pesquisa_id, worker_id):
+    """Devolve a pesquisa (só se o lease ainda for deste processo)"""
+    cursor.execute("""
+    UPDATE pesquisas SET ia_lease_ate = NULL, ia_lease_dono = NULL
+    WHERE id = %s AND ia_lease_dono = %s
+    """, (pesquisa_id, worker_id))
+
+
+def alerta_ja_enviado(pesquisa_id):
+    """Verifica se algum alerta desta pesquisa já saiu ou está na fila/caixa de saída/resumo"""
     query = """
-    SELECT 
-        r.resposta_texto,
-        r.resposta_numerica,
-        p.texto as pergunta
-    FROM respostas r
-    JOIN perguntas p ON r.pergunta_id = p.id
-    WHERE r.pesquisa_id = %s
-    AND (r.resposta_texto IS NOT NULL OR r.resposta_numerica IS NOT NULL)
+    SELECT 1 FROM log_emails_enviados
+    WHERE pesquisa_id = %s AND enviado_com_sucesso = TRUE
+    UNION ALL
+    SELECT 1 FROM fila_jobs
+    WHERE tipo = %s AND status IN ('pendente', 'processando')
+    AND JSON_EXTRACT(payload, '$.pesquisa_id') = %s
+    UNION ALL
+    SELECT 1 FROM email_outbox
+    WHERE pesquisa_id = %s AND tipo = 'alerta_insatisfacao' AND status IN ('pendente', 'enviando')
+    UNION ALL
+    SELECT 1 FROM alertas_digest
+    WHERE pesquisa_id = %s
+    LIMIT 1
     """
-    result = execute_query(query, (pesquisa_id,), fetch=True)
-    return result if result else []
+    return bool(execute_query(query, (pesquisa_id, JOB_ALERTA_INSATISFACAO, pesquisa_id, pesquisa_id, pesquisa_id),
+                              fetch=True))
 
-def processar_pesquisa(pesquisa_id):
-    """Processa uma pesquisa com IA"""
-    try:
-        print(f"\n{'='*60}")
-        print(f"🔄 Processando pesquisa ID: {pesquisa_id}")
-        print(f"{'='*60}")
-        
-        # ✅ MARCAR COMO PROCESSADA IMEDIATAMENTE (antes de qualquer processamento)
-        query_update_imediato = """
-        UPDATE pesquisas 
-        SET ia_processada = TRUE
-        WHERE id = %s
-        """
-        execute_query(query_update_imediato, (pesquisa_id,))
-        print(f"   ✅ Pesquisa marcada como processada (proteção contra duplicatas)")
-        
-        # Buscar respostas
-        respostas = buscar_respostas_pesquisa(pesquisa_id)
-        
-        if not respostas:
-            print(f"⚠️  Nenhuma resposta encontrada para pesquisa {pesquisa_id}")
+
+def atualizar_analise(cursor, pesquisa_id, resultado_analise):
+    """Substitui a análise de fallback (modo reanalisar) pela análise da IA"""
+    cursor.execute("""
+    UPDATE analises_sentimento
+    SET resposta_consolidada = %s, sentimento = %s, confianca = %s, pontuacao_hibrida = %s,
+        motivo_insatisfacao = %s, analisado_em = NOW(), {}
+    WHERE pesquisa_id = %s
+    ORDER BY id DESC
+    LIMIT 1
+    """.format(', '.join(f"{coluna} = %s" for coluna in COLUNAS_TELEMETRIA)), (
+        resultado_analise['texto_consolidado'][:1000],
+        resultado_analise['sentimento_geral'],
+        resultado_analise['confianca_geral'],
+        resultado_analise['pontuacao_hibrida'],
+        resultado_analise['motivo_insatisfacao']
+    ) + valores_telemetria(resultado_analise) + (pesquisa_id,))
+
+    salvar_detalhes_respostas(cursor, pesquisa_id, resultado_analise)
+
+    # IA ainda indisponível: continua marcada para a próxima rodada
+    cursor.execute(
+        "UPDATE pesquisas SET ia_reanalisar = %s WHERE id = %s",
+        (bool(resultado_analise.get('reanalisar', False)), pesquisa_id)
+    )
+
+
+def gravar_reanalise(cursor, execucao_id, pesquisa_id, resultado_analise):
+    """Grava a nova versão em reanalises_sentimento (analises_sentimento fica como está)"""
+    cursor.execute(f"""
+    REPLACE INTO reanalises_sentimento
+    (execucao_id, pesquisa_id, sentimento, confianca, pontuacao_hibrida, motivo_insatisfacao,
+     detalhes_respostas, {', '.join(COLUNAS_TELEMETRIA)})
+    VALUES (%s, %s, %s, %s, %s, %s, %s, {', '.join(['%s'] * len(COLUNAS_TELEMETRIA))})
+    """, (
+        execucao_id,
+        pesquisa_id,
+        resultado_analise['sentimento_geral'],
+        resultado_analise['confianca_geral'],
+        resultado_analise['pontuacao_hibrida'],
+        resultado_analise['motivo_insatisfacao'],
+        json.dumps(resultado_analise['detalhes_completos'], ensure_ascii=False, default=str)
+    ) + valores_telemetria(resultado_analise))
+
+    cursor.execute("""
+    UPDATE execucoes_reanalise
+    SET ultimo_pesquisa_id = GREATEST(ultimo_pesquisa_id, %s), processadas = processadas + 1
+    WHERE id = %s
+    """, (pesquisa_id, execucao_id))
+
+
+def criar_execucao(modelo_atual):
+    """Execução em execucoes_reanalise que agrupa as reanálises de --versao-desatualizada"""
+    with transacao() as cursor:
+        cursor.execute("""
+        INSERT INTO execucoes_reanalise (rotulo, filtros, modelo_usado, prompt_versao)
+        VALUES (%s, %s, %s, %s)
+        """, ('reprocessar_pesquisas_ia --versao-desatualizada',
+              json.dumps({'desatualizadas': True}), modelo_atual, PROMPT_VERSAO))
+        return cursor.lastrowid
+
+
+def salvar_resultado(pesquisa_id, resultado_analise, worker_id, reanalise=False, execucao_id=None):
+    """
+    Salva a análise, devolve o lease e enfileira o alerta se necessário
+    Retorna False se nada foi gravado. Com execucao_id (--versao-desatualizada) grava só em reanalises_sentimento, sem alerta
+    (resultado de fallback, com a IA indisponível, não é gravado)
+    """
+    print(f"\n📋 Pesquisa {pesquisa_id}")
+    print(f"   📊 Sentimento: {resultado_analise['sentimento_geral']}")
+    print(f"   💯 Pontuação: {resultado_analise['pontuacao_hibrida']}")
+    print(f"   🎯 Confiança: {resultado_analise['confianca_geral']}")
+    print(f"   🚨 Deve alertar: {resultado_analise['deve_alertar']}")
+
+    job_id = None
+    if execucao_id:
+        if resultado_analise.get('reanalisar', False):
+            # IA indisponível: o veredito local não é do modelo atual; manter o lease
+            # (não reservar de novo nesta rodada) e reanalisar quando ele expirar
+            print(f"   ⏭️ IA indisponível - reanálise não gravada")
             return False
-        
-        print(f"✅ {len(respostas)} resposta(s) encontrada(s)")
-        
-        # Preparar respostas para análise
-        respostas_processamento = []
-        for resposta in respostas:
-            if resposta['resposta_texto']:
-                # Determinar tipo
-                valor = resposta['resposta_texto']
-                if valor in ['Muito Insatisfeito', 'Insatisfeito', 'Neutro', 'Satisfeito', 'Muito Satisfeito']:
-                    tipo = 'escala_satisfacao'
-                elif valor.lower() in ['sim', 'não']:
-                    tipo = 'sim_nao'
-                else:
-                    tipo = 'texto_livre'
-                
-                respostas_processamento.append({
-                    'tipo': tipo,
-                    'valor': valor,
-                    'pergunta': resposta['pergunta']
-                })
-            
-            elif resposta['resposta_numerica']:
-                respostas_processamento.append({
-                    'tipo': 'escala_numerica',
-                    'valor': str(resposta['resposta_numerica']),
-                    'pergunta': resposta['pergunta']
-                })
-        
-        # Analisar com IA
-        analyzer = SentimentAnalyzer()
-        resultado_analise = analyzer.calcular_pontuacao_hibrida(respostas_processamento)
-        
-        print(f"   📊 Sentimento: {resultado_analise['sentimento_geral']}")
-        print(f"   💯 Pontuação: {resultado_analise['pontuacao_hibrida']}")
-        print(f"   🎯 Confiança: {resultado_analise['confianca_geral']}")
-        print(f"   🚨 Deve alertar: {resultado_analise['deve_alertar']}")
-        
-        # Salvar análise
-        query_analise = """
-        INSERT INTO analises_sentimento 
-        (pesquisa_id, resposta_consolidada, sentimento, confianca, pontuacao_hibrida, 
-         motivo_insatisfacao, modelo_usado)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        execute_query(query_analise, (
-            pesquisa_id,
-            resultado_analise['texto_consolidado'][:1000],
-            resultado_analise['sentimento_geral'],
-            resultado_analise['confianca_geral'],
-            resultado_analise['pontuacao_hibrida'],
-            resultado_analise['motivo_insatisfacao'],
-            'glm-4-flash (ZHIPU AI)'
-        ))
-        
-        print(f"   ✅ Análise salva no banco")
-        
-        # Enviar email se negativo
-        if resultado_analise['deve_alertar']:
-            print(f"   🚨 Enviando alertas...")
-            email_service = EmailService()
-            resultado_email = email_service.enviar_alerta_insatisfacao(
-                pesquisa_id, 
-                resultado_analise
-            )
-            
-            if resultado_email['sucesso']:
-                print(f"   📧 {resultado_email['emails_enviados']} email(s) enviado(s)")
-            else:
-                print(f"   ❌ Erro no envio de email")
-        
-        return True
-        
+        with transacao() as cursor:
+            gravar_reanalise(cursor, execucao_id, pesquisa_id, resultado_analise)
+            liberar_lease(cursor, pesquisa_id, worker_id)
+    elif reanalise:
+        # Na reanálise, alertar só se nenhum alerta saiu antes
+        alertar = resultado_analise['deve_alertar'] and not alerta_ja_enviado(pesquisa_id)
+        with transacao() as cursor:
+            atualizar_analise(cursor, pesquisa_id, resultado_analise)
+            if alertar:
+                job_id = inserir_job(cursor, JOB_ALERTA_INSATISFACAO, {'pesquisa_id': pesquisa_id})
+            # IA ainda indisponível: manter o lease para não reservar de novo nesta rodada
+            if not resultado_analise.get('reanalisar', False):
+                liberar_lease(cursor, pesquisa_id, worker_id)
+    else:
+        # Mesma gravação do worker da fila (análise + detalhe + ia_processada + job de alerta)
+        job_id = salvar_analise(pesquisa_id, resultado_analise)
+        with transacao() as cursor:
+            liberar_lease(cursor, pesquisa_id, worker_id)
+
+    print(f"   ✅ Análise salva no banco")
+    if job_id:
+        print(f"   📥 Alerta enfileirado (job {job_id})")
+    return True
+
+
+def marcar_sem_respostas(pesquisa_id, worker_id):
+    """Pesquisa sem respostas: não há o que analisar"""
+    with transacao() as cursor:
+        cursor.execute("UPDATE pesquisas SET ia_processada = TRUE WHERE id = %s", (pesquisa_id,))
+        liberar_lease(cursor, pesquisa_id, worker_id)
+    print(f"⚠️  Nenhuma resposta encontrada para pesquisa {pesquisa_id}")
+
+
+def processar_lote(pesquisa_ids, worker_id, concorrencia=None, reanalise=False, execucao_id=None):
+    """
+    Processa um lote de pesquisas reservadas com IA
+    Os textos de todas as pesquisas do lote são classificados em chamadas em lote,
+    com até `concorrencia` chamadas ao modelo em paralelo. Pesquisas que falham
+    mantêm o lease e voltam a ficar disponíveis quando ele expira.
+
+    Returns:
+        tuple: (sucesso, erro)
+    """
+    respostas = montar_respostas_pesquisas(pesquisa_ids)
+    if respostas is None:
+        print(f"   ❌ Erro ao buscar as respostas do lote")
+        return 0, len(pesquisa_ids)
+
+    erro = 0
+    preparadas = []
+    for pesquisa_id in pesquisa_ids:
+        if respostas.get(pesquisa_id):
+            preparadas.append((pesquisa_id, respostas[pesquisa_id]))
+            continue
+        try:
+            marcar_sem_respostas(pesquisa_id, worker_id)
+        except Exception as e:
+            print(f"   ❌ Erro ao marcar pesquisa {pesquisa_id}: {str(e)}")
+        erro += 1
+
+    if not preparadas:
+        return 0, erro
+
+    # Analisar com IA (uma chamada ao modelo por lote de textos)
+    try:
+        resultados = get_sentiment_analyzer().calcular_pontuacao_hibrida_lote(
+            [respostas for _, respostas in preparadas],
+            concorrencia=concorrencia
+        )
     except Exception as e:
-        print(f"   ❌ Erro ao processar: {str(e)}")
-        # Se houve erro, marcar como NÃO processada para tentar novamente
-        query_rollback = """
-        UPDATE pesquisas 
-        SET ia_processada = FALSE
-        WHERE id = %s
-        """
+        print(f"   ❌ Erro na análise em lote: {str(e)}")
+        return 0, erro + len(preparadas)
+
+    sucesso = 0
+    for (pesquisa_id, _), resultado_analise in zip(preparadas, resultados):
         try:
-            execute_query(query_rollback, (pesquisa_id,))
-            print(f"   🔄 Pesquisa desmarcada para reprocessamento")
-        except:
-            pass
-        return False
+            if salvar_resultado(pesquisa_id, resultado_analise, worker_id, reanalise, execucao_id):
+                sucesso += 1
+            else:
+                erro += 1
+        except Exception as e:
+            print(f"   ❌ Erro ao processar: {str(e)}")
+            erro += 1
+
+    return sucesso, erro
+
+
+def reservar_e_processar(modo, worker_id, lote, concorrencia, execucao_id=None):
+    """
+    Reserva um bloco do modo e processa
+
+    Returns:
+        tuple: (reservadas, sucesso, erro)
+    """
+    ids = reservar_pesquisas(modo, worker_id, max(1, lote))
+    if not ids:
+        return 0, 0, 0
+
+    print(f"🔒 [{worker_id}] {len(ids)} pesquisa(s) reservada(s) ({modo}): {ids[0]}..{ids[-1]}")
+    sucesso, erro = processar_lote(ids, worker_id, concorrencia, reanalise=modo != 'pendentes',
+                                   execucao_id=execucao_id)
+    return len(ids), sucesso, erro
+
+
+def imprimir_metricas_ia(worker_id, sucesso, erro):
+    metricas = get_sentiment_analyzer().metricas()
+    metricas_cache = metricas['cache']
+    metricas_circuito = metricas['circuito']
+    metricas_tokens = metricas['tokens']
+    print(f"\n📊 [{worker_id}] ✅ {sucesso} | ❌ {erro}")
+    print(f"🗃️ Cache IA: {metricas_cache['taxa_acerto'] * 100:.1f}% de acerto "
+          f"({metricas_cache['hits_memoria'] + metricas_cache['hits_banco']} hit(s), {metricas_cache['misses']} miss(es))")
+    print(f"🔌 Circuito IA: {metricas_circuito['estado']} "
+          f"({metricas_circuito['aberturas']} abertura(s), {metricas_circuito['chamadas_recusadas']} chamada(s) recusada(s))")
+    print(f"🔢 Tokens IA: {metricas_tokens['prompt']} prompt / {metricas_tokens['resposta']} resposta "
+          f"em {metricas_tokens['chamadas']} chamada(s)")
+
+
+def drenar(modo, lote, concorrencia, execucao_id=None):
+    """Reserva e processa blocos até não haver mais pesquisas livres; retorna (sucesso, erro)"""
+    worker_id = gerar_worker_id()
+    sucesso = 0
+    erro = 0
+
+    while True:
+        try:
+            reservadas, sucesso_lote, erro_lote = reservar_e_processar(modo, worker_id, lote, concorrencia,
+                                                                       execucao_id)
+        except Exception as e:
+            print(f"❌ [{worker_id}] Erro ao reservar pesquisas: {str(e)}")
+            break
+
+        if not reservadas:
+            break
+
+        sucesso += sucesso_lote
+        erro += erro_lote
+
+    imprimir_metricas_ia(worker_id, sucesso, erro)
+    return sucesso, erro
+
+
+def _drenar_processo(argumentos):
+    return drenar(*argumentos)
+
+
+def _pedir_parada(signum, frame):
+    if _parar.is_set():
+        raise KeyboardInterrupt
+    _parar.set()
+    print("\n⏸️  Parada solicitada - terminando o lote atual (Ctrl+C de novo para abortar)")
+
+
+def proximo_intervalo(intervalo, reservadas, lote_cheio):
+    """
+    Espera até a próxima verificação do modo contínuo:
+    lote cheio (provável backlog) -> nenhuma; havia trabalho -> mínima;
+    ocioso -> dobra a anterior até a máxima
+    """
+    if lote_cheio:
+        return 0.0
+    if reservadas:
+        return INTERVALO_MIN
+    return min(INTERVALO_MAX, max(INTERVALO_MIN, intervalo * 2))
+
+
+def gravar_heartbeat(caminho, estado):
+    """Grava o estado do processo (JSON) de forma atômica para checagens de saúde"""
+    if not caminho:
+        return
+    estado = dict(estado, atualizado_em=datetime.now().isoformat(timespec='seconds'))
+    temporario = f"{caminho}.tmp"
+    try:
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False, indent=2, default=str)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        print(f"⚠️  Não foi possível gravar o heartbeat em {caminho}: {str(e)}")
+
+
+def verificar_heartbeat(caminho):
+    """Checagem de saúde: 0 se o heartbeat foi atualizado dentro da tolerância, 1 caso contrário"""
+    try:
+        idade = time.time() - os.path.getmtime(caminho)
+    except OSError:
+        print(f"❌ Heartbeat {caminho} não encontrado")
+        return 1
+
+    if idade > HEARTBEAT_TOLERANCIA:
+        print(f"❌ Heartbeat sem atualização há {idade:.0f}s (tolerância {HEARTBEAT_TOLERANCIA:.0f}s)")
+        return 1
+
+    print(f"✅ Heartbeat atualizado há {idade:.0f}s")
+    return 0
+
+
+def executar_continuo(lote, concorrencia, heartbeat):
+    """
+    Modo contínuo: verifica pendentes e análises de fallback em ciclos, com
+    espera adaptativa, até SIGTERM/SIGINT (termina o lote em andamento)
+    """
+    worker_id = gerar_worker_id()
+    signal.signal(signal.SIGINT, _pedir_parada)
+    signal.signal(signal.SIGTERM, _pedir_parada)
+
+    iniciado_em = datetime.now()
+    sucesso = 0
+    erro = 0
+    intervalo = INTERVALO_MIN
+    ocioso = False
+    # (instante, pesquisas) dos ciclos com trabalho na janela de vazão
+    recentes = deque()
+
+    def estado_atual(situacao, backlog, vazao):
+        metricas = get_sentiment_analyzer().metricas()
+        return {
+            'worker_id': worker_id,
+            'estado': situacao,
+            'iniciado_em': iniciado_em.isoformat(timespec='seconds'),
+            'backlog': backlog,
+            'processadas': sucesso,
+            'erros': erro,
+            'vazao_por_minuto': round(vazao, 1),
+            'intervalo_segundos': intervalo,
+            'circuito_ia': metricas['circuito']['estado'],
+            'cache_taxa_acerto': round(metricas['cache']['taxa_acerto'], 3)
+        }
+
+    while not _parar.is_set():
+        reservadas = 0
+        lote_cheio = False
+
+        for modo in MODOS_CONTINUO:
+            if _parar.is_set():
+                break
+            try:
+                reservadas_modo, sucesso_lote, erro_lote = reservar_e_processar(modo, worker_id, lote, concorrencia)
+            except Exception as e:
+                print(f"❌ [{worker_id}] Erro ao reservar pesquisas ({modo}): {str(e)}")
+                continue
+            reservadas += reservadas_modo
+            sucesso += sucesso_lote
+            erro += erro_lote
+            lote_cheio = lote_cheio or reservadas_modo >= lote
+
+        agora = time.monotonic()
+        if reservadas:
+            recentes.append((agora, reservadas))
+        while recentes and recentes[0][0] < agora - JANELA_VAZAO_SEGUNDOS:
+            recentes.popleft()
+        vazao = sum(quantidade for _, quantidade in recentes) * 60 / JANELA_VAZAO_SEGUNDOS
+
+        backlog = {modo: contar_pesquisas(modo) for modo in MODOS_CONTINUO}
+        intervalo = proximo_intervalo(intervalo, reservadas, lote_cheio)
+
+        # Log por ciclo com trabalho; ocioso só ao entrar no estado
+        if reservadas or not ocioso:
+            print(f"📈 [{worker_id}] backlog {backlog} | ✅ {sucesso} ❌ {erro} | "
+                  f"{vazao:.1f} pesquisas/min | próxima verificação em {intervalo:.0f}s")
+        ocioso = not reservadas
+
+        gravar_heartbeat(heartbeat, estado_atual('processando' if reservadas else 'ocioso', backlog, vazao))
+
+        # Espera interrompível; o heartbeat continua sendo atualizado
+        restante = intervalo
+        while restante > 0 and not _parar.is_set():
+            espera = min(restante, HEARTBEAT_SEGUNDOS)
+            _parar.wait(espera)
+            restante -= espera
+            gravar_heartbeat(heartbeat, estado_atual('ocioso', backlog, vazao))
+
+    gravar_heartbeat(heartbeat, estado_atual('encerrado', {}, 0.0))
+    imprimir_metricas_ia(worker_id, sucesso, erro)
+    return sucesso, erro
+
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Reprocessa pesquisas pendentes de análise de IA')
+    parser.add_argument('--lote', type=int, default=int(os.getenv('REPROCESSAMENTO_PESQUISAS_POR_LOTE', 50)),
+                        help='Quantidade de pesquisas reservadas e classificadas por vez')
+    parser.add_argument('--concorrencia', type=int, default=None,
+                        help='Chamadas ao modelo em paralelo por processo (padrão SENTIMENTO_CONCORRENCIA)')
+    parser.add_argument('--processos', type=int, default=int(os.getenv('REPROCESSAMENTO_PROCESSOS', 1)),
+                        help='Processos drenando o backlog em paralelo nesta máquina')
+    parser.add_argument('--reanalisar', action='store_true',
+                        help='Refaz com a IA as análises feitas pelo fallback local (IA indisponível)')
+    parser.add_argument('--versao-desatualizada', action='store_true',
+                        help='Reanalisa as pesquisas classificadas por outro modelo ou versão de prompt '
+                             '(grava em reanalises_sentimento; analises_sentimento não muda)')
+    parser.add_argument('--continuo', action='store_true',
+                        help='Fica em execução verificando pendentes e análises de fallback (ignora --reanalisar/--versao-desatualizada)')
+    parser.add_argument('--heartbeat', default=os.getenv('REPROCESSAMENTO_HEARTBEAT_ARQUIVO'),
+                        help='Arquivo JSON de heartbeat/estado do modo contínuo')
+    parser.add_argument('--verificar-heartbeat', metavar='ARQUIVO',
+                        help='Checagem de saúde: sai com 1 se o heartbeat estiver desatualizado')
+    args = parser.parse_args()
+
+    if args.verificar_heartbeat:
+        return verificar_heartbeat(args.verificar_heartbeat)
+
+    if args.continuo and args.processos > 1:
+        # Cada instância contínua tem o próprio heartbeat; os leases evitam sobreposição
+        print("❌ --continuo roda em um processo; para paralelizar, inicie mais instâncias")
+        return 1
+
+    if args.versao_desatualizada:
+        modo = 'versao_desatualizada'
+    elif args.reanalisar:
+        modo = 'reanalisar'
+    else:
+        modo = 'pendentes'
+
     print("\n" + "="*60)
     print("🤖 REPROCESSAMENTO DE PESQUISAS COM IA")
     print("="*60)
     print(f"⏰ Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     print("="*60)
-    
-    # Verificar se ZHIPU_API_KEY está configurada
-    if not os.getenv('ZHIPU_API_KEY'):
-        print("\n❌ ERRO: ZHIPU_API_KEY não encontrada no .env")
-        print("   Configure a chave antes de executar este script")
-        return
-    
-    print("✅ ZHIPU_API_KEY detectada\n")
-    
-    # Buscar pesquisas não processadas
-    pesquisas = buscar_pesquisas_nao_processadas()
-    
-    if not pesquisas:
+
+    # Verificar se o provedor de IA está configurado (ex.: ZHIPU_API_KEY)
+    try:
+        provedor = get_sentiment_analyzer().provedor
+    except ValueError as e:
+        print(f"\n❌ ERRO: {str(e)}")
+        print("   Configure o provedor antes de executar este script")
+        return 1
+
+    print(f"✅ Provedor de IA: {provedor.descricao}")
+
+    if args.continuo:
+        print(f"🔁 Modo contínuo: lotes de {args.lote}, espera de {INTERVALO_MIN:.0f}s a {INTERVALO_MAX:.0f}s"
+              + (f", heartbeat em {args.heartbeat}" if args.heartbeat else "") + "\n")
+        sucesso, erro = executar_continuo(max(1, args.lote), args.concorrencia, args.heartbeat)
+        print(f"\n🛑 Modo contínuo encerrado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')} "
+              f"(✅ {sucesso} | ❌ {erro})")
+        return 0
+
+    total = contar_pesquisas(modo)
+    if not total:
         print("✅ Nenhuma pesquisa para processar!")
         return
-    
-    print(f"📋 Encontradas {len(pesquisas)} pesquisa(s) para processar\n")
-    
-    # Processar cada pesquisa
-    sucesso = 0
-    erro = 0
-    
-    for pesquisa in pesquisas:
-        if processar_pesquisa(pesquisa['id']):
-            sucesso += 1
-        else:
-            erro += 1
-    
+
+    processos = max(1, args.processos)
+    print(f"📋 {total} pesquisa(s) para processar ({modo}) | {processos} processo(s), lotes de {args.lote}\n")
+
+    execucao_id = None
+    if modo == 'versao_desatualizada':
+        execucao_id = criar_execucao(provedor.descricao)
+        print(f"🔁 Reanálises na execução {execucao_id} (reanalises_sentimento)\n")
+
+    if processos == 1:
+        sucesso, erro = drenar(modo, args.lote, args.concorrencia, execucao_id)
+    else:
+        # Cada processo cria o próprio analisador/conexões (singleton é refeito após o fork)
+        with multiprocessing.Pool(processos) as pool:
+            parciais = pool.map(_drenar_processo, [(modo, args.lote, args.concorrencia, execucao_id)] * processos)
+        sucesso = sum(parcial[0] for parcial in parciais)
+        erro = sum(parcial[1] for parcial in parciais)
+
+    if execucao_id:
+        execute_query("""
+        UPDATE execucoes_reanalise SET status = %s, erros = erros + %s WHERE id = %s
+        """, ('concluida' if not contar_pesquisas(modo) else 'interrompida', erro, execucao_id))
+
     # Resumo
     print("\n" + "="*60)
     print("📊 RESUMO DO REPROCESSAMENTO")
@@ -200,5 +630,6 @@ def main():
     print(f"⏰ Finalizado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     print("="*60 + "\n")
 
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# scripts/servidor_sentimento_stub.py
+"""
+Servidor simulado compatível com /chat/completions da OpenAI
+Responde aos prompts do SentimentAnalyzer com o léxico local, com latência
+e erros injetáveis, para testes de carga e CI sem a API real.
+
+Uso:
+    python scripts/servidor_sentimento_stub.py --porta 8099 --latencia 0.3 --taxa-erro 0.1
+
+    SENTIMENTO_PROVEDOR=openai
+    SENTIMENTO_OPENAI_URL=http://127.0.0.1:8099/v1
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.lexico_sentimento import AnalisadorLexico
+from app.services.prompt_sentimento import estimar_tokens
+
+_ITEM_LOTE = re.compile(r'^\[(G\d+\.T\d+)\] "(.*)"$')
+_TEXTO_UNICO = re.compile(r'^Texto: "(.*)"$')
+
+_lexico = AnalisadorLexico()
+
+
+def _veredito(texto):
+    resultado = _lexico.analisar(texto)
+    return {
+        'sentimento': resultado['sentimento'],
+        'confianca': max(0.6, resultado['confianca']),
+        'resumo': 'resposta simulada'
+    }
+
+
+def responder_prompt(prompt):
+    """Monta a resposta JSON esperada pelo SentimentAnalyzer (lote ou texto único)"""
+    itens = []
+    grupos = {}
+
+    for linha in prompt.splitlines():
+        encontrado = _ITEM_LOTE.match(linha.strip())
+        if encontrado:
+            item_id, texto = encontrado.groups()
+            itens.append(dict(_veredito(texto), id=item_id))
+            grupos.setdefault(item_id.split('.')[0], []).append(texto)
+            continue
+
+        encontrado = _TEXTO_UNICO.match(linha.strip())
+        if encontrado:
+            return json.dumps(_veredito(encontrado.group(1)), ensure_ascii=False)
+
+    return json.dumps({
+        'itens': itens,
+        'grupos': [dict(_veredito(' '.join(textos)), grupo=g) for g, textos in grupos.items()]
+    }, ensure_ascii=False)
+
+
+class ConfiguracaoStub:
+    """Latência e falhas injetadas (alteráveis com o servidor no ar)"""
+
+    def __init__(self, latencia=0.0, jitter=0.0, taxa_erro=0.0, taxa_lentidao=0.0,
+                 lentidao_segundos=30.0, semente=None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erro = taxa_erro
+        self.taxa_lentidao = taxa_lentidao
+        self.lentidao_segundos = lentidao_segundos
+        self.aleatorio = random.Random(semente)
+        self.lock = threading.Lock()
+        self.requisicoes = 0
+        self.erros = 0
+
+    def sortear(self):
+        """(espera em segundos, deve falhar) para a próxima requisição"""
+        with self.lock:
+            self.requisicoes += 1
+            espera = self.latencia + self.aleatorio.uniform(0, self.jitter)
+            if self.aleatorio.random() < self.taxa_lentidao:
+                espera = self.lentidao_segundos
+            falhar = self.aleatorio.random() < self.taxa_erro
+            if falhar:
+                self.erros += 1
+            return espera, falhar
+
+
+def criar_handler(config):
+    class HandlerStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, como a API real
+
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_POST(self):
+            tamanho = int(self.headers.get('Content-Length', 0))
+            requisicao = json.loads(self.rfile.read(tamanho) or b'{}')
+
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._responder(404, {'error': {'message': 'rota não encontrada'}})
+                return
+
+            espera, falhar = config.sortear()
+            time.sleep(espera)
+
+            if falhar:
+                self._responder(503, {'error': {'message': 'falha simulada'}})
+                return
+
+            prompt = requisicao.get('messages', [{}])[-1].get('content', '')
+            conteudo = responder_prompt(prompt)
+            self._responder(200, {
+                'id': 'stub',
+                'object': 'chat.completion',
+                'model': requisicao.get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': conteudo},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {
+                    'prompt_tokens': estimar_tokens(prompt),
+                    'completion_tokens': estimar_tokens(conteudo),
+                    'total_tokens': estimar_tokens(prompt) + estimar_tokens(conteudo)
+                }
+            })
+
+    return HandlerStub
+
+
+def criar_servidor(porta=0, config=None, host='127.0.0.1'):
+    """Cria o servidor (porta 0 = livre); use .serve_forever() ou iniciar_em_thread()"""
+    config = config or ConfiguracaoStub()
+    servidor = ThreadingHTTPServer((host, porta), criar_handler(config))
+    servidor.daemon_threads = True
+    servidor.config = config
+    return servidor
+
+
+def iniciar_em_thread(servidor):
+    """Sobe o servidor em segundo plano e retorna a URL base (…/v1)"""
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    host, porta = servidor.server_address[:2]
+    return f"http://{host}:{porta}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor simulado de sentimento (compatível com OpenAI)')
+    parser.add_argument('--porta', type=int, default=8099)
+    parser.add_argument('--latencia', type=float, default=0.2, help='Latência base por requisição (s)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Latência extra aleatória (s)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fração de respostas HTTP 503')
+    parser.add_argument('--taxa-lentidao', type=float, default=0.0, help='Fração de respostas muito lentas')
+    parser.add_argument('--lentidao', type=float, default=30.0, help='Duração (s) das respostas lentas')
+    parser.add_argument('--semente', type=int, default=None)
+    args = parser.parse_args()
+
+    config = ConfiguracaoStub(args.latencia, args.jitter, args.taxa_erro,
+                              args.taxa_lentidao, args.lentidao, args.semente)
+    servidor = criar_servidor(args.porta, config)
+
+    print(f"🧪 Servidor simulado em http://127.0.0.1:{args.porta}/v1")
+    print(f"   Latência: {args.latencia}s (+{args.jitter}s) | Erros: {args.taxa_erro:.0%} | Lentidão: {args.taxa_lentidao:.0%}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n🛑 Encerrado ({config.requisicoes} requisição(ões), {config.erros} erro(s) simulado(s))")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+# scripts/servidor_smtp_stub.py
+"""
+Servidor SMTP simulado (sink): aceita qualquer login, guarda as mensagens
+recebidas e injeta latência, recusas e falhas, para testes de carga e CI sem o
+servidor de email real. Implementação mínima em asyncio (sem dependências).
+
+Uso:
+    python scripts/servidor_smtp_stub.py --porta 8025 --latencia 0.05 --taxa-erro 0.05
+
+    SMTP_SERVER=127.0.0.1
+    SMTP_PORT=8025
+    SMTP_USERNAME=stub
+    SMTP_PASSWORD=stub
+    EMAIL_REMETENTE=pesquisa@localhost
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import random
+import threading
+from collections import deque
+from datetime import datetime
+from email.parser import BytesHeaderParser
+
+
+class ConfiguracaoStubSMTP:
+    """Latência e falhas injetadas (alteráveis com o servidor no ar) e mensagens recebidas"""
+
+    def __init__(self, latencia=0.0, jitter=0.0, taxa_erro=0.0, taxa_recusa=0.0,
+                 desconectar_a_cada=0, guardar=1000, diretorio=None, semente=None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erro = taxa_erro                    # 451 no fim do DATA (falha temporária)
+        self.taxa_recusa = taxa_recusa                # 550 no RCPT (destinatário recusado)
+        self.desconectar_a_cada = desconectar_a_cada  # 421 e fecha após N mensagens na conexão
+        self.diretorio = diretorio                    # grava cada mensagem como .eml
+        self.aleatorio = random.Random(semente)
+        self.lock = threading.Lock()
+
+        self.mensagens = deque(maxlen=guardar)
+        self.conexoes = 0
+        self.recebidas = 0
+        self.erros = 0
+        self.recusas = 0
+        self.desconexoes = 0
+
+    def espera(self):
+        return self.latencia + self.aleatorio.uniform(0, self.jitter)
+
+    def sortear(self, taxa):
+        with self.lock:
+            return self.aleatorio.random() < taxa
+
+    def registrar(self, remetente, destinatarios, dados):
+        with self.lock:
+            self.recebidas += 1
+            numero = self.recebidas
+            self.mensagens.append({
+                'remetente': remetente,
+                'destinatarios': destinatarios,
+                'assunto': BytesHeaderParser().parsebytes(dados).get('Subject', ''),
+                'tamanho': len(dados),
+                'recebida_em': datetime.now()
+            })
+
+        if self.diretorio:
+            with open(os.path.join(self.diretorio, f"{numero:06d}.eml"), 'wb') as arquivo:
+                arquivo.write(dados)
+
+    def metricas(self):
+        with self.lock:
+            return {
+                'conexoes': self.conexoes,
+                'recebidas': self.recebidas,
+                'erros': self.erros,
+                'recusas': self.recusas,
+                'desconexoes': self.desconexoes
+            }
+
+
+def _endereco(argumento):
+    """'FROM:<a@b> SIZE=1' -> 'a@b'"""
+    valor = argumento.split(':', 1)[-1].strip()
+    return valor.split('>', 1)[0].lstrip('<').strip()
+
+
+async def _atender(config, reader, writer):
+    """Uma conexão SMTP (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT)"""
+
+    async def responder(*linhas):
+        writer.write(''.join(f"{linha}\r\n" for linha in linhas).encode('utf-8'))
+        await writer.drain()
+
+    async def ler_linha():
+        return (await reader.readline()).decode('utf-8', 'replace').rstrip('\r\n')
+
+    with config.lock:
+        config.conexoes += 1
+
+    remetente = None
+    destinatarios = []
+    mensagens_conexao = 0
+
+    try:
+        await responder('220 stub ESMTP pronto')
+        while True:
+            linha = await ler_linha()
+            if not linha and reader.at_eof():
+                break
+
+            verbo, _, argumento = linha.partition(' ')
+            verbo = verbo.upper()
+
+            if verbo == 'EHLO':
+                await responder('250-stub', '250-AUTH PLAIN LOGIN', '250-8BITMIME', '250-SMTPUTF8', '250 SIZE 52428800')
+            elif verbo == 'HELO':
+                await responder('250 stub')
+            elif verbo == 'AUTH':
+                mecanismo, _, inicial = argumento.partition(' ')
+                if mecanismo.upper() == 'PLAIN':
+                    if not inicial:
+                        await responder('334 ')
+                        await ler_linha()
+                elif mecanismo.upper() == 'LOGIN':
+                    if not inicial:
+                        await responder('334 ' + base64.b64encode(b'Username:').decode())
+                        await ler_linha()
+                    await responder('334 ' + base64.b64encode(b'Password:').decode())
+                    await ler_linha()
+                else:
+                    await responder('504 mecanismo não suportado')
+                    continue
+                await responder('235 autenticado')
+            elif verbo == 'MAIL':
+                remetente = _endereco(argumento)
+                destinatarios = []
+                await responder('250 OK')
+            elif verbo == 'RCPT':
+                if config.sortear(config.taxa_recusa):
+                    with config.lock:
+                        config.recusas += 1
+                    await responder('550 destinatário recusado (simulado)')
+                else:
+                    destinatarios.append(_endereco(argumento))
+                    await responder('250 OK')
+            elif verbo == 'DATA':
+                if not destinatarios:
+                    await responder('503 nenhum destinatário válido')
+                    continue
+                await responder('354 termine com <CRLF>.<CRLF>')
+
+                # Corpo inteiro até <CRLF>.<CRLF> de uma vez; desfazer o dot-stuffing
+                bruto = await reader.readuntil(b'\r\n.\r\n')
+                dados = (b'\r\n' + bruto[:-3]).replace(b'\r\n..', b'\r\n.')[2:]
+
+                await asyncio.sleep(config.espera())
+
+                if config.sortear(config.taxa_erro):
+                    with config.lock:
+                        config.erros += 1
+                    await responder('451 falha temporária (simulada)')
+                else:
+                    config.registrar(remetente, destinatarios, dados)
+                    await responder('250 OK mensagem aceita')
+
+                remetente = None
+                destinatarios = []
+                mensagens_conexao += 1
+                if config.desconectar_a_cada and mensagens_conexao >= config.desconectar_a_cada:
+                    with config.lock:
+                        config.desconexoes += 1
+                    await responder('421 limite de mensagens por conexão (simulado)')
+                    break
+            elif verbo == 'RSET':
+                remetente = None
+                destinatarios = []
+                await responder('250 OK')
+            elif verbo == 'NOOP':
+                await responder('250 OK')
+            elif verbo == 'QUIT':
+                await responder('221 tchau')
+                break
+            else:
+                await responder('502 comando não implementado')
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+class ServidorSMTPStub:
+    """Servidor em um event loop próprio; use iniciar_em_thread() em benchmarks"""
+
+    def __init__(self, porta=0, config=None, host='127.0.0.1'):
+        self.host = host
+        self.porta = porta
+        self.config = config or ConfiguracaoStubSMTP()
+        self._loop = None
+        self._servidor = None
+
+    async def _iniciar(self):
+        self._servidor = await asyncio.start_server(
+            lambda r, w: _atender(self.config, r, w), self.host, self.porta,
+            limit=64 * 1024 * 1024  # readuntil do DATA com o corpo inteiro
+        )
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self):
+        await self._iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    def iniciar_em_thread(self):
+        """Sobe o servidor em segundo plano e retorna (host, porta)"""
+        self._loop = asyncio.new_event_loop()
+        pronto = threading.Event()
+
+        def executar():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._iniciar())
+            pronto.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=executar, daemon=True).start()
+        pronto.wait()
+        return self.host, self.porta
+
+    async def _encerrar(self):
+        self._servidor.close()
+        tarefas = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    def parar(self):
+        """Encerra as conexões abertas e o event loop da thread"""
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._encerrar(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor SMTP simulado (sink)')
+    parser.add_argument('--porta', type=int, default=8025)
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latência por mensagem no DATA (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Latência extra aleatória (s)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fração de mensagens com 451 (temporária)')
+    parser.add_argument('--taxa-recusa', type=float, default=0.0, help='Fração de destinatários recusados (550)')
+    parser.add_argument('--desconectar-a-cada', type=int, default=0,
+                        help='Encerra a conexão após N mensagens (0 = nunca)')
+    parser.add_argument('--diretorio', default=None, help='Grava cada mensagem recebida como .eml')
+    parser.add_argument('--semente', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.diretorio:
+        os.makedirs(args.diretorio, exist_ok=True)
+
+    config = ConfiguracaoStubSMTP(args.latencia, args.jitter, args.taxa_erro, args.taxa_recusa,
+                                  args.desconectar_a_cada, diretorio=args.diretorio, semente=args.semente)
+    servidor = ServidorSMTPStub(args.porta, config)
+
+    print(f"🧪 Servidor SMTP simulado em 127.0.0.1:{args.porta}")
+    print(f"   Latência: {args.latencia}s (+{args.jitter}s) | Erros: {args.taxa_erro:.0%} | "
+          f"Recusas: {args.taxa_recusa:.0%} | Desconectar a cada: {args.desconectar_a_cada or '-'}")
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        print(f"\n🛑 Encerrado: {config.metricas()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# scripts/worker_emails.py
+"""
+Worker da caixa de saída de emails (alertas de insatisfação e senhas temporárias)
+Também monta os resumos (digest) de alertas quando a janela de cada gestor fecha
+e enfileira lembretes aos agentes sobre pesquisas críticas (prestes a expirar).
+Mensagens finalizadas são removidas após EMAIL_OUTBOX_RETENCAO_DIAS (verificado a cada hora).
+Execute em paralelo ao servidor web: python scripts/worker_emails.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.job_queue import gerar_worker_id
+from app.services.email_outbox import (
+    reservar_emails, concluir_lote, contar_pendentes, purgar_emails_finalizados, RETENCAO_DIAS
+)
+from app.services.email_service import EmailService
+from app.services.digest_alertas import enfileirar_resumos_vencidos
+from app.services.lembretes import enfileirar_lembretes_criticos
+
+# Limpeza de mensagens finalizadas (retenção em dias: basta uma vez por hora)
+INTERVALO_LIMPEZA_SEGUNDOS = 3600
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Worker da caixa de saída de emails')
+    parser.add_argument('--lote', type=int, default=int(os.getenv('EMAIL_OUTBOX_LOTE', 20)),
+                        help='Quantidade de emails reservados e enviados por vez (mesma sessão SMTP)')
+    parser.add_argument('--intervalo', type=float, default=float(os.getenv('EMAIL_OUTBOX_INTERVALO_SEGUNDOS', 2)),
+                        help='Espera (s) quando a caixa de saída está vazia')
+    parser.add_argument('--intervalo-resumos', type=float,
+                        default=float(os.getenv('DIGEST_VERIFICAR_SEGUNDOS', 60)),
+                        help='A cada quantos segundos verificar resumos de alertas com a janela fechada')
+    parser.add_argument('--intervalo-lembretes', type=float,
+                        default=float(os.getenv('LEMBRETE_VERIFICAR_SEGUNDOS', 600)),
+                        help='A cada quantos segundos buscar pesquisas críticas para lembrete (0 desativa)')
+    parser.add_argument('--retencao-dias', type=int, default=RETENCAO_DIAS,
+                        help='Remove emails enviados/mortos há mais de N dias (0 desativa)')
+    parser.add_argument('--uma-vez', action='store_true',
+                        help='Envia o que houver na caixa de saída e encerra')
+    args = parser.parse_args()
+
+    try:
+        email_service = EmailService()
+    except ValueError as e:
+        print(f"❌ ERRO: {str(e)}")
+        return 1
+
+    worker_id = gerar_worker_id()
+
+    print("\n" + "="*60)
+    print("📮 WORKER DA CAIXA DE SAÍDA DE EMAILS")
+    print("="*60)
+    print(f"🆔 Worker: {worker_id}")
+    print(f"📋 Pendentes: {contar_pendentes()}")
+    print(f"⏰ Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    print("="*60)
+
+    enviados_total = 0
+    falhas_total = 0
+    proxima_verificacao_resumos = 0.0
+    proxima_verificacao_lembretes = 0.0
+    proxima_limpeza = 0.0
+    try:
+        while True:
+            if time.monotonic() >= proxima_verificacao_resumos:
+                try:
+                    enfileirar_resumos_vencidos(email_service)
+                except Exception as e:
+                    print(f"❌ Erro ao montar resumos de alertas: {str(e)}")
+                proxima_verificacao_resumos = time.monotonic() + args.intervalo_resumos
+
+            if args.intervalo_lembretes > 0 and time.monotonic() >= proxima_verificacao_lembretes:
+                try:
+                    enfileirar_lembretes_criticos(email_service)
+                except Exception as e:
+                    print(f"❌ Erro ao enfileirar lembretes: {str(e)}")
+                proxima_verificacao_lembretes = time.monotonic() + args.intervalo_lembretes
+
+            if args.retencao_dias > 0 and time.monotonic() >= proxima_limpeza:
+                try:
+                    purgar_emails_finalizados(args.retencao_dias)
+                except Exception as e:
+                    print(f"❌ Erro ao limpar a caixa de saída: {str(e)}")
+                proxima_limpeza = time.monotonic() + INTERVALO_LIMPEZA_SEGUNDOS
+
+            try:
+                emails = reservar_emails(worker_id, limite=max(1, args.lote))
+            except Exception as e:
+                print(f"❌ Erro ao consultar a caixa de saída: {str(e)}")
+                emails = []
+
+            if emails:
+                enviados, falhas = email_service.enviar_emails_outbox(emails)
+                try:
+                    concluir_lote(enviados, falhas)
+                except Exception as e:
+                    # Lease expira e as mensagens voltam para a fila (Message-ID é o mesmo)
+                    print(f"❌ Erro ao registrar o lote: {str(e)}")
+                enviados_total += len(enviados)
+                falhas_total += len(falhas)
+                print(f"📧 {len(enviados)}/{len(emails)} email(s) enviado(s) | sessão SMTP: {email_service.metricas_smtp()}")
+                continue
+
+            if args.uma_vez:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        print("\n🛑 Worker interrompido")
+
+    print(f"📊 Emails enviados: {enviados_total} | Falhas: {falhas_total}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
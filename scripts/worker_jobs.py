@@ -0,0 +1,66 @@
+# scripts/worker_jobs.py
+"""
+Worker da fila de jobs (análise de IA e alertas de insatisfação)
+Execute em paralelo ao servidor web: python scripts/worker_jobs.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.job_queue import processar_jobs, gerar_worker_id
+# Importar registra os handlers de análise/alerta
+import app.services.processamento_pesquisa  # noqa: F401
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Worker da fila de jobs')
+    parser.add_argument('--lote', type=int, default=int(os.getenv('JOBS_LOTE', 5)),
+                        help='Quantidade de jobs reservados por vez')
+    parser.add_argument('--intervalo', type=float, default=float(os.getenv('JOBS_INTERVALO_SEGUNDOS', 2)),
+                        help='Espera (s) quando a fila está vazia')
+    parser.add_argument('--uma-vez', action='store_true',
+                        help='Processa o que houver na fila e encerra')
+    args = parser.parse_args()
+
+    worker_id = gerar_worker_id()
+
+    print("\n" + "="*60)
+    print("⚙️ WORKER DA FILA DE JOBS")
+    print("="*60)
+    print(f"🆔 Worker: {worker_id}")
+    print(f"⏰ Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    print("="*60)
+
+    total = 0
+    try:
+        while True:
+            try:
+                processados = processar_jobs(worker_id, limite=args.lote)
+            except Exception as e:
+                print(f"❌ Erro ao consultar a fila: {str(e)}")
+                processados = 0
+
+            total += processados
+
+            if processados == 0:
+                if args.uma_vez:
+                    break
+                time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        print("\n🛑 Worker interrompido")
+
+    print(f"📊 Jobs processados: {total}")
+
+
+if __name__ == '__main__':
+    main()